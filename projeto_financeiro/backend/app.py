@@ -5,28 +5,143 @@ Este arquivo contém todas as rotas e endpoints da API que alimenta o frontend
 """
 
 # Importações necessárias para criar a API
-from fastapi import FastAPI, HTTPException  # FastAPI para criar a API REST
+from fastapi import FastAPI, Header, HTTPException, Query, Request  # FastAPI para criar a API REST
 from fastapi.middleware.cors import CORSMiddleware  # Para permitir requisições do frontend
-from fastapi.staticfiles import StaticFiles  # Para servir arquivos estáticos
-from pydantic import BaseModel, Field  # Para validação de dados de entrada
-from typing import Optional, List  # Para tipagem de dados
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse  # Para respostas com status/cabeçalhos personalizados
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool  # Para o SQLite não bloquear as rotas async
+from pydantic import BaseModel, Field, ValidationError  # Para validação de dados de entrada
+from typing import Annotated, Any, Optional, List  # Para tipagem de dados
+from contextlib import asynccontextmanager  # Para o ciclo de vida (startup/shutdown) da API
+from datetime import datetime  # Para interpretar filtros de data
+import asyncio  # Para rodar várias projeções em paralelo
 import sqlite3  # Banco de dados SQLite (incluído no Python)
 import json  # Para manipular dados JSON
+import logging  # Para registrar erros que não viram resposta HTTP (ex.: no meio de um streaming)
+import threading  # Limite de exportações simultâneas
 
 # Importações de módulos locais
-from calc import project_investments, monte_carlo_projection  # Funções de cálculo financeiro
-from db import init_db, save_submission, get_submissions  # Funções de banco de dados
+from calc import (  # Funções de cálculo financeiro
+    project_investments, project_investments_batch, monte_carlo_projection, goal_projection, goal_projection_batch,
+    GOAL_MAX_AMOUNT,
+    monte_carlo_chunks, monte_carlo_work, merge_monte_carlo_parts, split_shards, summarize_sketch,
+)
+from quantiles import QuantileSketch  # Estimativa parcial dos percentis durante o streaming
+from cache import ResultCache, MISSING, money_key, rate_key  # Cache dos cálculos determinísticos
+from executor import ComputePool, PoolSaturated  # Pool de processos para os cálculos pesados
+from jsoncodec import FastJSONResponse, dumps, json_response  # JSON rápido (orjson) com FAST_JSON=1
+from catalog import CatalogStore  # Glossário, dicas e profissões (arquivos JSON servidos com ETag)
+from compression import CompressionMiddleware, PrecompressedStaticFiles  # gzip/Brotli nas respostas grandes
+from metrics import (  # Métricas no formato do Prometheus (GET /metrics)
+    REGISTRY, CONTENT_TYPE, MetricsMiddleware, timed, cache_collector, db_collector, compute_collector,
+)
+from profiling import RequestProfiler, ProfilingMiddleware, folded  # Perfil das requisições lentas (PROFILE=1)
+from db import (  # Funções de banco de dados
+    init_db, start_backfill, save_submission, save_submissions, get_submissions_page, iter_submission_batches, get_analytics,
+    enable_write_behind, close_pools, add_timing_hook, remove_timing_hook, WriteQueueFull, PoolTimeout, PAGE_SIZE, MAX_PAGE_SIZE,
+)
+
+logger = logging.getLogger(__name__)
 
 # Configuração do banco de dados
 import os  # Para manipular caminhos de arquivos
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Diretório atual do arquivo
-DB_PATH = os.path.join(BASE_DIR, "data.db")  # Caminho completo para o banco de dados
-if not os.path.exists(BASE_DIR):  # Se o diretório não existir
-    os.makedirs(BASE_DIR)  # Cria o diretório
-init_db(DB_PATH)  # Inicializa o banco de dados com as tabelas necessárias
+DB_PATH = os.environ.get("DB_PATH") or os.path.join(BASE_DIR, "data.db")  # Caminho do banco (DB_PATH troca, ex.: testes de carga)
+# Importar este arquivo não toca no disco: banco, catálogos e pools são preparados no lifespan ou no primeiro uso
+
+# Gravação em segundo plano (write-behind): WRITE_BEHIND=1 agrupa os INSERTs em lotes
+WRITE_BEHIND = os.environ.get("WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", "50"))  # Linhas por transação
+WRITE_BEHIND_FLUSH_MS = int(os.environ.get("WRITE_BEHIND_FLUSH_MS", "200"))  # Espera máxima antes de gravar
+WRITE_BEHIND_MAX_QUEUE = int(os.environ.get("WRITE_BEHIND_MAX_QUEUE", "1000"))  # Tamanho máximo da fila
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepara o banco e liga a fila de gravação (se configurada); ao desligar, grava o que falta e fecha as conexões"""
+    init_db(DB_PATH)  # Cria/migra as tabelas (banco já atualizado: só confere a versão)
+    start_backfill(DB_PATH)  # Preenche em segundo plano as colunas tipadas de bancos antigos
+    catalogs.preload()  # Lê e comprime o conteúdo estático em segundo plano, sem atrasar o startup
+    add_timing_hook(_observe_db)  # Tempo de cada operação do banco em db_operation_duration_seconds
+    if WRITE_BEHIND:
+        enable_write_behind(
+            DB_PATH,
+            batch_size=WRITE_BEHIND_BATCH_SIZE,
+            flush_ms=WRITE_BEHIND_FLUSH_MS,
+            max_queue=WRITE_BEHIND_MAX_QUEUE,
+        )
+    yield
+    remove_timing_hook(_observe_db)
+    compute_pool.shutdown()  # Encerra os processos de cálculo
+    close_pools()  # Esvazia a fila de gravação antes de fechar o pool
+
+
+# Cache dos resultados de projeção e metas (mesmas entradas => mesma resposta)
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "1024"))  # Resultados guardados em memória
+RESULT_CACHE_DB = os.environ.get("RESULT_CACHE_DB", "")  # Arquivo SQLite para o cache sobreviver a reinícios (opcional)
+projection_cache = ResultCache("project_investments", RESULT_CACHE_SIZE, RESULT_CACHE_DB or None)
+goal_cache = ResultCache("calculate_goal:v2", RESULT_CACHE_SIZE, RESULT_CACHE_DB or None)
+montecarlo_cache = ResultCache("monte_carlo:v2", RESULT_CACHE_SIZE, RESULT_CACHE_DB or None)  # Só simulações com seed
+
+# Pool de processos para o Monte Carlo (COMPUTE_WORKERS, COMPUTE_MAX_PENDING; criado no primeiro uso)
+compute_pool = ComputePool()
+
+# Conteúdo estático (backend/content/*.json), já em bytes e com ETag
+catalogs = CatalogStore()
+
+# Métricas internas: tempo dos cálculos (no pool ou no próprio processo), fila do pool e banco
+CALC_DURATION = REGISTRY.histogram(
+    "calc_duration_seconds", "Tempo de execução das funções de cálculo", ("function",))
+COMPUTE_QUEUE = REGISTRY.histogram(
+    "compute_queue_seconds", "Espera das tarefas no pool de cálculo (fila + envio dos dados)", ("function",))
+DB_DURATION = REGISTRY.histogram(
+    "db_operation_duration_seconds", "Tempo das operações do banco (inclui a espera por conexão)", ("operation",))
+REGISTRY.add_collector(cache_collector([projection_cache, goal_cache, montecarlo_cache]))
+REGISTRY.add_collector(db_collector())
+REGISTRY.add_collector(compute_collector(compute_pool))
+
+
+def _observe_compute(function: str, queued_s: float, run_s: float):
+    COMPUTE_QUEUE.observe(queued_s, (function,))
+    CALC_DURATION.observe(run_s, (function,))
+
+
+def _observe_db(operation: str, seconds: float):
+    DB_DURATION.observe(seconds, (operation,))
+
+
+def _timed_calc(fn, *args, **kwargs):
+    """Roda um cálculo no próprio processo (fora do pool) medindo o tempo em calc_duration_seconds"""
+    with timed(CALC_DURATION, (fn.__name__,)):
+        return fn(*args, **kwargs)
+
+
+compute_pool.add_timing_hook(_observe_compute)
+
+
+class CleanupStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse que sempre chama `cleanup` no fim: resposta completa, cliente que
+    desconectou no meio ou antes mesmo do corpo começar (quando o gerador do corpo nem
+    chega a rodar e o `finally` dele não serve)
+    """
+
+    def __init__(self, content, cleanup, **kwargs):
+        super().__init__(content, **kwargs)
+        self.cleanup = cleanup
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.cleanup()
+
+# Perfilamento opcional (PROFILE=1, PROFILE_SLOW_MS, PROFILE_DIR...; ver profiling.py)
+profiler = RequestProfiler()
+
 
 # Criação da aplicação FastAPI
-app = FastAPI(title="Plataforma de Matemática Financeira - API")
+app = FastAPI(title="Plataforma de Matemática Financeira - API", lifespan=lifespan,
+              default_response_class=FastJSONResponse)
 
 # Configuração do CORS (Cross-Origin Resource Sharing)
 # Permite que o frontend (HTML/JS) faça requisições para a API
@@ -37,6 +152,15 @@ app.add_middleware(
     allow_headers=["*"],  # Permite todos os cabeçalhos HTTP
 )
 
+# Compressão gzip/Brotli das respostas grandes (COMPRESSION, COMPRESSION_MIN_SIZE; "off" desliga)
+app.add_middleware(CompressionMiddleware)
+
+# Perfil das requisições lentas ou com o cabeçalho X-Debug-Profile (só faz algo com PROFILE=1)
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+# Contagem e latência por rota (por fora de tudo, então inclui compressão e streaming)
+app.add_middleware(MetricsMiddleware)
+
 # Modelo de dados para o formulário "Realidade Atual"
 class RealityForm(BaseModel):
     """
@@ -61,19 +185,62 @@ class FutureForm(BaseModel):
     investimento_tipo: str = Field(..., pattern="^(conservador|moderado|arriscado)$")  # Tipo: conservador, moderado ou arriscado
     tempo_anos: int = Field(..., ge=1, le=100)  # Por quantos anos vai investir (1 a 100 anos)
 
+# Limite de cenários por simulação Monte Carlo
+MC_MAX_SIMS = int(os.environ.get("MC_MAX_SIMS", "1000000"))
+# Faixas exatas guardam a matriz (cenários × anos) em float64: 1 milhão de valores = 8 MB por
+# simulação (mais as cópias de cada shard e da junção). Acima disso, só com percentiles="sketch"
+MC_BANDS_MAX_CELLS = int(os.environ.get("MC_BANDS_MAX_CELLS", "1000000"))
+
+# Modelo de dados para a simulação Monte Carlo
+class MonteCarloForm(FutureForm):
+    """
+    Mesmo formulário do futuro, com uma semente opcional para repetir a simulação
+    """
+    seed: Optional[int] = Field(default=None, ge=0)  # Mesma semente = mesmo resultado (e resposta em cache)
+    n_sims: int = Field(default=1000, ge=100, le=MC_MAX_SIMS)  # Quantidade de cenários simulados
+    percentiles: str = Field(default="exact", pattern="^(exact|sketch)$")  # "sketch" = aproximado, memória fixa
+    # Quantis das faixas ano a ano (gráfico em leque), ex.: [0.1, 0.5, 0.9]
+    bands: Optional[List[Annotated[float, Field(gt=0, lt=1)]]] = Field(default=None, min_length=1, max_length=19)
+
 # Modelo de dados para cálculo de metas financeiras
 class GoalCalculation(BaseModel):
     """
     Estrutura para calcular quanto tempo leva para atingir uma meta
     """
-    goal_amount: float = Field(..., ge=0)  # Valor da meta em reais
+    goal_amount: float = Field(..., ge=0, le=GOAL_MAX_AMOUNT)  # Valor da meta em reais (até R$ 1 trilhão)
     monthly_saving: float = Field(..., ge=0)  # Quanto consegue poupar por mês
     annual_rate: float = Field(default=0.05, ge=0, le=1)  # Taxa de juros anual (padrão 5%)
 
+class GoalBatchItem(GoalCalculation):
+    """Meta da lista: sem o teto no modelo, uma meta grande demais vira erro só dela (não 422 da lista toda)"""
+    goal_amount: float = Field(..., ge=0)
+
+# Modelo de dados para calcular várias metas de uma vez (listas de exercícios)
+class GoalBatch(BaseModel):
+    """
+    Lista de metas para o professor preparar uma folha de exercícios
+    """
+    goals: List[GoalBatchItem] = Field(..., max_length=1000)  # Até 1000 metas por chamada
+
 # =============================================================================
 # ENDPOINTS DA API (ROTAS QUE O FRONTEND PODE ACESSAR)
 # =============================================================================
 
+@app.exception_handler(PoolSaturated)
+def compute_pool_saturated(request, exc: PoolSaturated):
+    """Pool de cálculo lotado: responde na hora com 503 em vez de deixar a requisição esperando"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
+
+@app.exception_handler(WriteQueueFull)
+def write_queue_full(request, exc: WriteQueueFull):
+    """Fila de gravação cheia: pede para o cliente tentar de novo em vez de perder o dado"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.exception_handler(PoolTimeout)
+def db_pool_timeout(request, exc: PoolTimeout):
+    """Todas as conexões do banco ocupadas por POOL_TIMEOUT segundos: 503 em vez de erro 500"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "2"})
+
 @app.post('/api/submit_reality')
 def submit_reality(payload: RealityForm):
     """
@@ -84,117 +251,383 @@ def submit_reality(payload: RealityForm):
     save_submission(DB_PATH, 'reality', payload.dict())  # Salva no banco de dados
     return {"status": "ok", "message": "Realidade salva com sucesso"}
 
+# Taxas de retorno anuais para cada tipo de investimento: 5%, 8% e 12%
+INVESTMENT_RATES = {"conservador": 0.05, "moderado": 0.08, "arriscado": 0.12}
+BATCH_MAX_ITEMS = 200  # Máximo de formulários por chamada em lote
+
 @app.post('/api/submit_future')
-def submit_future(payload: FutureForm):
+async def submit_future(payload: FutureForm):
     """
     Endpoint principal para calcular projeções de investimento
     Recebe: dados do formulário "Futuro Profissional"  
     Retorna: projeções para os 3 tipos de investimento (conservador, moderado, arriscado)
     """
-    # Define as taxas de retorno anuais para cada tipo de investimento
-    rates = {"conservador": 0.05, "moderado": 0.08, "arriscado": 0.12}  # 5%, 8% e 12%
+    rates = INVESTMENT_RATES
     results = {}  # Dicionário para armazenar os resultados
-    for k, r in rates.items():
-        proj = project_investments(monthly=payload.poupanca_mensal, years=payload.tempo_anos, annual_return=r)
-        results[k] = proj
+    monthly = money_key(payload.poupanca_mensal)  # Mesma chave para 100, 100.0, 100.001...
+    keys = {k: (monthly, payload.tempo_anos, rate_key(r)) for k, r in rates.items()}
+    for k, key in keys.items():
+        results[k] = await projection_cache.alookup(key)
+    for k in [k for k, value in results.items() if value is MISSING]:
+        # Fórmula fechada: microssegundos, então roda aqui mesmo (o pool de processos fica para o Monte Carlo)
+        results[k] = _timed_calc(project_investments, monthly=monthly, years=payload.tempo_anos, annual_return=rates[k])
+        await projection_cache.astore(keys[k], results[k])
     
-    save_submission(DB_PATH, 'future', payload.dict())
-    return {"status": "ok", "projections": results}
+    await run_in_threadpool(save_submission, DB_PATH, 'future', payload.dict())
+    return json_response({"status": "ok", "projections": results})
+
+@app.post('/api/batch/submit_future')
+async def batch_submit_future(items: List[Any]):
+    """
+    Versão em lote do submit_future para a turma inteira:
+    valida cada formulário separadamente, calcula todas as projeções numa só conta
+    vetorizada e grava tudo numa única transação
+    """
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Máximo de {BATCH_MAX_ITEMS} formulários por lote")
+
+    results = [None] * len(items)
+    forms, positions = [], []
+    for i, item in enumerate(items):
+        try:
+            forms.append(FutureForm(**item))
+            positions.append(i)
+        except (ValidationError, TypeError) as e:
+            errors = e.errors() if isinstance(e, ValidationError) else [{"loc": [], "msg": str(e), "type": "type_error"}]
+            results[i] = {
+                "status": "error",
+                "errors": [{"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]} for err in errors],
+            }
+
+    if forms:  # Lote vazio (ou só com erros) não passa pelo pool nem pelo banco
+        # Até BATCH_MAX_ITEMS × 3 taxas numa conta só (dezenas de ms): no threadpool, não no pool de processos
+        projections = await run_in_threadpool(
+            _timed_calc, project_investments_batch,
+            [money_key(f.poupanca_mensal) for f in forms],
+            [f.tempo_anos for f in forms],
+            list(INVESTMENT_RATES.values()),
+        )
+        for i, per_rate in zip(positions, projections):
+            results[i] = {"status": "ok", "projections": dict(zip(INVESTMENT_RATES, per_rate))}
+        await run_in_threadpool(save_submissions, DB_PATH, 'future', [f.dict() for f in forms])
+    return {
+        "status": "ok",
+        "count": len(items),
+        "ok": len(forms),
+        "errors": len(items) - len(forms),
+        "results": results,
+    }
+
+async def _run_monte_carlo(monthly: float, years: int, mu: float, sigma: float, n_sims: int, seed: Optional[int],
+                           percentiles: str = "exact", bands: Optional[List[float]] = None):
+    """Roda a simulação no pool; simulações grandes são divididas entre os processos e depois juntadas"""
+    chunks = monte_carlo_chunks(n_sims, seed)
+    if len(chunks) == 1:
+        return await compute_pool.run(
+            monte_carlo_projection, monthly=monthly, years=years, mu=mu, sigma=sigma, n_sims=n_sims, seed=seed,
+            percentiles=percentiles, bands=bands
+        )
+    shards = split_shards(chunks, max(1, compute_pool.workers))
+    work = monte_carlo_work(percentiles, bands)
+    parts = await asyncio.gather(*(
+        compute_pool.run(work, monthly, years, mu, sigma, shard) for shard in shards
+    ))
+    return await run_in_threadpool(_timed_calc, merge_monte_carlo_parts, parts, sigma, percentiles, bands)
+
+def _mc_cache_key(payload: MonteCarloForm, mu: float, sigma: float):
+    """Chave do cache do Monte Carlo (None sem semente: resultado aleatório, nada a guardar)"""
+    if payload.seed is None:
+        return None
+    return (
+        payload.poupanca_mensal, payload.tempo_anos, mu, sigma, payload.n_sims, payload.seed, payload.percentiles,
+        tuple(payload.bands) if payload.bands else None,
+    )
+
+def _check_mc_bands(payload: MonteCarloForm):
+    if payload.bands and payload.percentiles == "exact" and \
+            payload.n_sims * (payload.tempo_anos + 1) > MC_BANDS_MAX_CELLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"bands exatas limitadas a {MC_BANDS_MAX_CELLS} valores (n_sims × anos); use percentiles=\"sketch\"",
+        )
 
 @app.post('/api/simulate_montecarlo')
-def simulate_mc(payload: FutureForm):
-    """Simulação Monte Carlo para investimentos arriscados"""
+async def simulate_mc(payload: MonteCarloForm):
+    """Simulação Monte Carlo para investimentos arriscados (roda no pool de processos)"""
+    mu, sigma, n_sims = 0.12, 0.25, payload.n_sims
+    bands = payload.bands
+    _check_mc_bands(payload)
+    key = _mc_cache_key(payload, mu, sigma)
+    sims = await montecarlo_cache.alookup(key) if key is not None else MISSING
+    if sims is MISSING:
+        try:
+            sims = await _run_monte_carlo(
+                payload.poupanca_mensal, payload.tempo_anos, mu, sigma, n_sims, payload.seed, payload.percentiles,
+                bands
+            )
+        except PoolSaturated:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        if key is not None:
+            await montecarlo_cache.astore(key, sims)
+    return {"status": "ok", "montecarlo": sims}
+
+async def _monte_carlo_events(monthly: float, years: int, mu: float, sigma: float, n_sims: int,
+                              seed: Optional[int], percentiles: str = "exact", bands: Optional[List[float]] = None,
+                              first=None, key=None):
+    """
+    Roda a simulação pedaço por pedaço (os mesmos pedaços de _run_monte_carlo) e vai
+    produzindo eventos: um "progress" com percentis parciais a cada pedaço pronto e,
+    no fim, o "result" idêntico ao da rota normal. Se o cliente desconectar, o
+    gerador é fechado e os pedaços que ainda não começaram são cancelados.
+    """
+    chunks = monte_carlo_chunks(n_sims, seed)
+    work = monte_carlo_work(percentiles, bands)
+    window = max(1, compute_pool.workers)  # Pedaços em andamento ao mesmo tempo
+    tasks = [first or asyncio.ensure_future(compute_pool.run(work, monthly, years, mu, sigma, [chunks[0]]))]
+    next_chunk = 1
+    parts, partial, done = [], QuantileSketch(chunk_size=chunks[0][0]), 0
     try:
-        sims = monte_carlo_projection(
-            monthly=payload.poupanca_mensal, 
-            years=payload.tempo_anos, 
-            mu=0.12, 
-            sigma=0.25, 
-            n_sims=1000
-        )
-        return {"status": "ok", "montecarlo": sims}
+        for index, (size, _) in enumerate(chunks):
+            while next_chunk < len(chunks) and len(tasks) - index < window:
+                tasks.append(asyncio.ensure_future(
+                    compute_pool.run(work, monthly, years, mu, sigma, [chunks[next_chunk]])
+                ))
+                next_chunk += 1
+            part = await tasks[index]
+            done += size
+            if percentiles == "sketch":
+                # Sketches combinados na mesma ordem de merge_monte_carlo_parts
+                if parts:
+                    if bands:
+                        for mine, theirs in zip(parts[0], part):
+                            mine.merge(theirs)
+                    else:
+                        parts[0].merge(part)
+                else:
+                    parts.append(part)
+                estimate = parts[0][-1] if bands else parts[0]
+            else:
+                parts.append(part)
+                partial.add(part[:, -1] if bands else part)
+                estimate = partial
+            yield {"event": "progress", "done": done, "n_sims": n_sims, "parcial": summarize_sketch(estimate, sigma)}
+        sims = await run_in_threadpool(_timed_calc, merge_monte_carlo_parts, parts, sigma, percentiles, bands)
+    except PoolSaturated as e:
+        yield {"event": "error", "detail": str(e), "retry_after": e.retry_after}
+        return
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        # O status 200 já foi enviado: o erro vira um evento em vez de cortar a conexão no meio
+        logger.exception("falha no Monte Carlo em streaming")
+        yield {"event": "error", "detail": str(e)}
+        return
+    finally:
+        for task in tasks:
+            task.cancel()
+    if key is not None:
+        await montecarlo_cache.astore(key, sims)
+    yield {"event": "result", "montecarlo": sims}
+
+@app.post('/api/simulate_montecarlo/stream')
+async def simulate_mc_stream(payload: MonteCarloForm, request: Request):
+    """
+    Monte Carlo com progresso: NDJSON (uma linha por evento) ou, com
+    Accept: text/event-stream, Server-Sent Events. O primeiro pedaço já traz
+    uma estimativa dos percentis; os próximos vão refinando até o resultado final.
+    """
+    mu, sigma = 0.12, 0.25
+    _check_mc_bands(payload)
+    key = _mc_cache_key(payload, mu, sigma)
+    sims = await montecarlo_cache.alookup(key) if key is not None else MISSING
+    args = (payload.poupanca_mensal, payload.tempo_anos, mu, sigma, payload.n_sims, payload.seed,
+            payload.percentiles, payload.bands)
+
+    first = None
+    if sims is MISSING:
+        # O primeiro pedaço começa antes da resposta: pool lotado ainda vira 503 + Retry-After.
+        # Se o cliente sumir antes do corpo começar, o cleanup da resposta cancela esse pedaço.
+        work = monte_carlo_work(payload.percentiles, payload.bands)
+        first_chunk = monte_carlo_chunks(payload.n_sims, payload.seed)[:1]
+        first = asyncio.ensure_future(compute_pool.run(work, *args[:4], first_chunk))
+        await asyncio.sleep(0)
+        if first.done() and isinstance(first.exception(), PoolSaturated):
+            raise first.exception()
+
+    async def events():
+        if sims is not MISSING:
+            yield {"event": "result", "montecarlo": sims}
+            return
+        async for event in _monte_carlo_events(*args, first=first, key=key):
+            yield event
+
+    def cleanup():
+        if first is not None:
+            first.cancel()  # Libera a vaga no pool (já terminado: só recolhe a exceção, se houver)
+            if first.done() and not first.cancelled():
+                first.exception()
+
+    if "text/event-stream" in request.headers.get("accept", ""):
+        lines = (f"event: {e['event']}\ndata: {dumps(e)}\n\n" async for e in events())
+        return CleanupStreamingResponse(lines, cleanup, media_type="text/event-stream",
+                                        headers={"Cache-Control": "no-cache"})
+    lines = (dumps(e) + "\n" async for e in events())
+    return CleanupStreamingResponse(lines, cleanup, media_type="application/x-ndjson")
+
+def _normalize_datetime(value: Optional[str], field: str) -> Optional[str]:
+    """Converte '2025-01-15' ou '2025-01-15T14:30' para o formato de created_at no banco"""
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{field} inválido: use o formato AAAA-MM-DD[THH:MM:SS]")
+
 
 @app.get('/api/submissions')
-def list_submissions():
-    """Lista todas as submissões salvas"""
-    data = get_submissions(DB_PATH)
-    return {"count": len(data), "data": data}
+def list_submissions(
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),  # Itens por página
+    cursor: Optional[str] = None,  # Valor de next_cursor da página anterior
+    kind: Optional[str] = Query(None, pattern="^(reality|future)$"),  # Filtra pelo tipo de formulário
+    since: Optional[str] = None,  # Data/hora inicial (inclusiva)
+    until: Optional[str] = None,  # Data/hora final (exclusiva)
+    nome: Optional[str] = None,  # Nome exato do estudante
+    investimento_tipo: Optional[str] = Query(None, pattern="^(conservador|moderado|arriscado)$"),
+):
+    """Lista as submissões salvas, da mais recente para a mais antiga, página por página"""
+    try:
+        page = get_submissions_page(
+            DB_PATH, limit=limit, cursor=cursor, kind=kind,
+            since=_normalize_datetime(since, "since"), until=_normalize_datetime(until, "until"),
+            nome=nome, investimento_tipo=investimento_tipo,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response({"count": len(page["data"]), "data": page["data"], "next_cursor": page["next_cursor"]})
+
+
+# Exportações NDJSON ao mesmo tempo (cada uma com a sua conexão de leitura, fora do pool)
+EXPORT_MAX_CONCURRENT = int(os.environ.get("EXPORT_MAX_CONCURRENT", "4"))
+_export_slots = threading.BoundedSemaphore(EXPORT_MAX_CONCURRENT)
+
+@app.get('/api/submissions/stream')
+def stream_submissions(
+    kind: Optional[str] = Query(None, pattern="^(reality|future)$"),
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    nome: Optional[str] = None,
+    investimento_tipo: Optional[str] = Query(None, pattern="^(conservador|moderado|arriscado)$"),
+):
+    """
+    Exporta todas as submissões em NDJSON (uma linha JSON por submissão), com memória constante.
+    A leitura usa uma conexão própria, então um download lento não segura o banco da API;
+    acima de EXPORT_MAX_CONCURRENT exportações ao mesmo tempo, responde 503.
+    """
+    since, until = _normalize_datetime(since, "since"), _normalize_datetime(until, "until")
+    if not _export_slots.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Muitas exportações ao mesmo tempo, tente de novo em instantes",
+                            headers={"Retry-After": "5"})
+    batches = iter_submission_batches(
+        DB_PATH, kind=kind, since=since, until=until, nome=nome, investimento_tipo=investimento_tipo,
+    )
+    # Um pedaço por fetchmany: uma ida ao threadpool e um envio a cada STREAM_CHUNK_SIZE linhas
+    chunks = ("".join(dumps(row) + "\n" for row in batch) for batch in batches)
+
+    def cleanup():
+        batches.close()  # Terminou ou o cliente desconectou: fecha a conexão de leitura na hora
+        _export_slots.release()
+
+    return CleanupStreamingResponse(iterate_in_threadpool(chunks), cleanup, media_type="application/x-ndjson")
+
+@app.get('/api/analytics')
+def analytics():
+    """Estatísticas da turma para o painel do professor (agregadas no banco, sem baixar as submissões)"""
+    return get_analytics(DB_PATH)
 
 @app.get('/api/glossary')
-def get_glossary():
-    """Retorna glossário de termos financeiros para educação"""
-    glossary = {
-        "Juros Compostos": "Juros calculados sobre o valor inicial mais os juros já acumulados. É o 'juro sobre juro' que faz seu dinheiro crescer mais rápido!",
-        "CDI": "Certificado de Depósito Interbancário - taxa de referência do mercado financeiro brasileiro.",
-        "Poupança": "Investimento de baixo risco com rendimento menor, mas garantido pelo governo.",
-        "Ações": "Participação em empresas. Maior potencial de retorno, mas também maior risco.",
-        "Inflação": "Aumento geral dos preços que reduz o poder de compra do seu dinheiro ao longo do tempo.",
-        "Diversificação": "Estratégia de espalhar investimentos para reduzir riscos - 'não colocar todos os ovos numa cesta'.",
-        "Renda Fixa": "Investimentos com rentabilidade previsível, como CDB, Tesouro Direto.",
-        "Renda Variável": "Investimentos com rentabilidade que varia conforme o mercado, como ações e fundos.",
-        "Reserva de Emergência": "Dinheiro guardado para situações imprevistas, equivalente a 3-6 meses de gastos.",
-        "Meta Financeira": "Objetivo específico que você quer alcançar, como comprar algo ou juntar uma quantia."
-    }
-    return glossary
+def get_glossary(request: Request):
+    """Retorna glossário de termos financeiros para educação (content/glossary.json)"""
+    return catalogs.get("glossary").response(request)
 
 @app.get('/api/tips')
-def get_financial_tips():
-    """Retorna dicas práticas de educação financeira"""
-    tips = [
-        "📊 Anote todos os seus gastos por uma semana para entender para onde vai seu dinheiro",
-        "⏰ Antes de comprar algo, espere 24 horas e pergunte: 'Eu realmente preciso disso?'",
-        "💰 Guarde pelo menos R$ 1 por dia - em um ano serão R$ 365!",
-        "🔍 Compare preços antes de comprar - use aplicativos ou pesquise em várias lojas",
-        "🎯 Defina uma meta de economia mensal, mesmo que pequena",
-        "🤔 Aprenda a diferença entre 'querer' e 'precisar'",
-        "📈 Comece a investir cedo, mesmo com pouco dinheiro - o tempo é seu maior aliado!",
-        "📝 Evite compras por impulso - faça uma lista antes de sair de casa",
-        "🏦 Abra uma conta poupança e automatize a transferência mensal",
-        "📚 Leia sobre finanças pelo menos 15 minutos por semana"
-    ]
-    return {"tips": tips}
+def get_financial_tips(request: Request):
+    """Retorna dicas práticas de educação financeira (content/tips.json)"""
+    return catalogs.get("tips").response(request)
 
 @app.post('/api/calculate_goal')
 def calculate_goal(payload: GoalCalculation):
     """Calcula quanto tempo levará para atingir uma meta financeira"""
-    if payload.monthly_saving <= 0:
+    goal = money_key(payload.goal_amount)
+    monthly = money_key(payload.monthly_saving)
+    if monthly <= 0:
         raise HTTPException(status_code=400, detail="Valor mensal deve ser maior que zero")
     
-    monthly_rate = payload.annual_rate / 12
-    months = 0
-    accumulated = 0
-    
-    while accumulated < payload.goal_amount and months < 600:  # limite de 50 anos
-        accumulated = accumulated * (1 + monthly_rate) + payload.monthly_saving
-        months += 1
-    
-    years = months / 12
-    return {
-        "months_needed": months,
-        "years_needed": round(years, 1),
-        "total_invested": payload.monthly_saving * months,
-        "interest_earned": round(accumulated - (payload.monthly_saving * months), 2),
-        "final_amount": round(accumulated, 2)
-    }
+    rate = rate_key(payload.annual_rate)
+    return goal_cache.get_or_compute(
+        (goal, monthly, rate),
+        lambda: _timed_calc(goal_projection, goal, monthly, rate),
+    )
+
+@app.post('/api/calculate_goal/batch')
+def calculate_goal_batch(payload: GoalBatch):
+    """Calcula várias metas de uma vez; metas inválidas recebem um erro próprio sem derrubar as outras"""
+    valid = [i for i, g in enumerate(payload.goals) if money_key(g.monthly_saving) > 0]
+    solved = _timed_calc(goal_projection_batch, [
+        (money_key(payload.goals[i].goal_amount), money_key(payload.goals[i].monthly_saving),
+         rate_key(payload.goals[i].annual_rate))
+        for i in valid
+    ])
+    results = [{"error": "Valor mensal deve ser maior que zero"} for _ in payload.goals]
+    for i, result in zip(valid, solved):
+        results[i] = result
+    return {"status": "ok", "results": results}
 
 @app.get('/api/professions')
-def get_professions_info():
-    """Retorna informações sobre profissões e salários médios"""
-    professions = {
-        "Médico": {"salary_range": "8000-25000", "education": "Graduação + Residência"},
-        "Engenheiro": {"salary_range": "5000-15000", "education": "Graduação"},
-        "Professor": {"salary_range": "2000-8000", "education": "Graduação + Licenciatura"},
-        "Programador": {"salary_range": "3000-12000", "education": "Graduação ou Cursos Técnicos"},
-        "Enfermeiro": {"salary_range": "3000-8000", "education": "Graduação"},
-        "Advogado": {"salary_range": "3000-20000", "education": "Graduação + OAB"},
-        "Designer": {"salary_range": "2500-10000", "education": "Graduação ou Cursos"},
-        "Administrador": {"salary_range": "3000-12000", "education": "Graduação"},
-        "Psicólogo": {"salary_range": "2500-8000", "education": "Graduação + CRP"},
-        "Dentista": {"salary_range": "4000-15000", "education": "Graduação + CRO"}
-    }
-    return professions
+def get_professions_info(request: Request):
+    """Retorna informações sobre profissões e salários médios (content/professions.json)"""
+    return catalogs.get("professions").response(request)
+
+@app.get('/metrics', include_in_schema=False)
+def prometheus_metrics():
+    """Métricas da API no formato de texto do Prometheus (requisições, cálculos, banco, caches e pools)"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+def _check_profiling(token: Optional[str]):
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Perfilamento desligado (inicie com PROFILE=1)")
+    if not profiler.authorized(token):
+        raise HTTPException(status_code=403, detail="X-Profile-Token inválido")
+
+@app.get('/admin/profiles', include_in_schema=False)
+def list_profiles(x_profile_token: Optional[str] = Header(None)):
+    """Perfis guardados (requisições lentas ou com X-Debug-Profile), do mais novo para o mais antigo"""
+    _check_profiling(x_profile_token)
+    profiles = profiler.store.list()
+    return {"count": len(profiles), "data": profiles}
+
+@app.get('/admin/profiles/{profile_id}', include_in_schema=False)
+def download_profile(
+    profile_id: str,
+    format: str = Query("json", pattern="^(json|folded|pstats)$"),  # folded: flame graph; pstats: cProfile do cálculo
+    x_profile_token: Optional[str] = Header(None),
+):
+    """Baixa um perfil guardado"""
+    _check_profiling(x_profile_token)
+    try:
+        path = profiler.store.path(profile_id, ".prof" if format == "pstats" else ".json")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Perfil não encontrado (o buffer guarda só os mais recentes)")
+    if format == "folded":
+        return Response(folded(profiler.store.load(profile_id)), media_type="text/plain")
+    media_type = "application/octet-stream" if format == "pstats" else "application/json"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+# Frontend servido pela própria API (usa app.js.gz/.br quando gerados com: python compression.py ../frontend)
+FRONTEND_DIR = os.path.join(BASE_DIR, "..", "frontend")
+if os.path.isdir(FRONTEND_DIR):
+    app.mount("/", PrecompressedStaticFiles(directory=FRONTEND_DIR, html=True), name="frontend")
 
 if __name__ == '__main__':
     import uvicorn
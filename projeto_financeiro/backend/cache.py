@@ -0,0 +1,194 @@
+# backend/cache.py
+"""
+Cache de resultados para os cálculos determinísticos da API.
+
+Os endpoints de projeção são funções puras de poucos números (mensal, anos,
+taxa...), e numa sala de aula quase todo mundo digita os mesmos valores
+redondos. Aqui fica um LRU em memória com limite de tamanho e contadores de
+acerto/erro/despejo, e opcionalmente uma segunda camada em SQLite que
+sobrevive a reinícios do servidor.
+
+Os valores guardados são compartilhados entre as requisições: quem lê do
+cache não deve modificá-los. As rotas async usam alookup/astore, que levam o
+acesso ao SQLite para uma thread (o loop de eventos nunca espera pelo disco).
+"""
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+
+from db import get_pool
+
+MISSING = object()
+
+DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS result_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at DATETIME DEFAULT (datetime('now','localtime'))
+);
+"""
+
+
+class LRUCache:
+    """LRU em memória, seguro para várias threads, com contadores."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SQLiteCache:
+    """Camada em disco: guarda os resultados como JSON numa tabela SQLite."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._ready = False  # Tabela criada no primeiro uso, não na importação do app
+
+    def _connection(self):
+        pool = get_pool(self.path)
+        if not self._ready:
+            with pool.connection() as conn:
+                conn.executescript(DISK_SCHEMA)
+                conn.commit()
+            self._ready = True
+        return pool.connection()
+
+    def get(self, key: str, default=None):
+        with self._connection() as conn:
+            row = conn.execute('SELECT value FROM result_cache WHERE key = ?', (key,)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value):
+        with self._connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO result_cache (key, value) VALUES (?,?)',
+                         (key, json.dumps(value, ensure_ascii=False)))
+            conn.commit()
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM result_cache')
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._connection() as conn:
+            size = conn.execute('SELECT COUNT(*) FROM result_cache').fetchone()[0]
+        with self._lock:
+            return {"path": self.path, "size": size, "hits": self.hits, "misses": self.misses}
+
+
+class ResultCache:
+    """Memória (LRU) na frente e, se configurado, SQLite atrás."""
+
+    def __init__(self, name: str, maxsize: int = 1024, disk_path: str = None):
+        self.name = name
+        self.memory = LRUCache(maxsize)
+        self.disk = SQLiteCache(disk_path) if disk_path else None
+
+    def _disk_key(self, key: tuple) -> str:
+        return json.dumps([self.name, *key])
+
+    def _lookup_disk(self, key: tuple):
+        value = self.disk.get(self._disk_key(key), MISSING)
+        if value is not MISSING:
+            self.memory.set(key, value)
+        return value
+
+    def lookup(self, key: tuple):
+        """Valor guardado para `key`, ou MISSING (para quem calcula de forma assíncrona)."""
+        value = self.memory.get(key, MISSING)
+        if value is MISSING and self.disk is not None:
+            value = self._lookup_disk(key)
+        return value
+
+    async def alookup(self, key: tuple):
+        """lookup para rotas async: acerto na memória volta na hora, o SQLite é lido numa thread."""
+        value = self.memory.get(key, MISSING)
+        if value is MISSING and self.disk is not None:
+            value = await asyncio.to_thread(self._lookup_disk, key)
+        return value
+
+    def store(self, key: tuple, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(self._disk_key(key), value)
+
+    async def astore(self, key: tuple, value):
+        """store para rotas async: o INSERT + COMMIT no SQLite roda numa thread."""
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, self._disk_key(key), value)
+
+    def get_or_compute(self, key: tuple, compute):
+        value = self.lookup(key)
+        if value is MISSING:
+            value = compute()
+            self.store(key, value)
+        return value
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        out = {"name": self.name, "memory": self.memory.stats()}
+        if self.disk is not None:
+            out["disk"] = self.disk.stats()
+        return out
+
+
+def money_key(value: float) -> float:
+    """Normaliza valores em reais para a chave (100, 100.0 e 100.004 viram a mesma)."""
+    return round(float(value), 2)
+
+
+def rate_key(value: float) -> float:
+    return round(float(value), 6)
@@ -17,12 +17,38 @@ Este código ensina que MATEMÁTICA = PODER FINANCEIRO! 🚀
 """
 
 # Importações necessárias
-from typing import List, Dict  # Para definir que tipo de dados as funções retornam
-import math  # Funções matemáticas avançadas (não usado diretamente aqui)
+from typing import List, Dict, Optional  # Para definir que tipo de dados as funções retornam
+import logging  # Narração educativa das contas (só aparece no modo verbose)
+import os  # Quantos processadores existem (para dividir o Monte Carlo)
+import math  # Logaritmos e arredondamento para cima no cálculo de metas
 import random  # Para gerar números aleatórios nas simulações de risco
+import sys  # Saída do modo educativo e opções de linha de comando (--verbose)
 
+import numpy as np  # Vetores numéricos: roda milhares de simulações de uma só vez
 
-def compound_monthly(initial: float, monthly: float, annual_rate: float, years: int) -> List[float]:
+from quantiles import QuantileSketch  # Percentis aproximados em memória fixa
+
+# 📢 As explicações passo a passo vão para o logger em nível DEBUG.
+# Na API elas ficam desligadas (custo zero); no modo educativo aparecem no terminal.
+logger = logging.getLogger(__name__)
+
+
+def enable_educational_output(stream=None) -> None:
+    """
+    🎓 Liga o modo "verbose/educativo": mostra toda a narração dos cálculos
+    no terminal, do jeito que o aluno lê (sem data, nível ou nome do logger).
+    """
+    if any(getattr(h, "_calc_educational", False) for h in logger.handlers):
+        return
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler._calc_educational = True
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+
+
+def compound_monthly(initial: float, monthly: float, annual_rate: float, years: int,
+                     engine: str = "closed") -> List[float]:
     """
     📈 FUNÇÃO MÁGICA DOS JUROS COMPOSTOS! ✨
     
@@ -34,6 +60,13 @@ def compound_monthly(initial: float, monthly: float, annual_rate: float, years:
     - monthly: Quanto você consegue guardar TODO MÊS (R$)
     - annual_rate: Quanto % seu dinheiro rende por ANO (ex: 0.10 = 10%)
     - years: Por quantos ANOS você vai fazer isso
+    - engine: como fazer a conta
+        "closed" = fórmula fechada da anuidade, um passo por ano (padrão)
+        "numpy"  = fórmula fechada vetorizada, todos os anos de uma vez
+        "loop"   = versão original, mês a mês (referência)
+      "closed" e "numpy" fazem as contas em outra ordem: a partir de uns R$ 10
+      milhões de saldo, um ano pode sair 1 centavo diferente do "loop" (o
+      arredondamento cai do outro lado do meio centavo)
     
     📊 RETORNA: Uma lista com seu saldo acumulado a cada ano
     
@@ -41,41 +74,111 @@ def compound_monthly(initial: float, monthly: float, annual_rate: float, years:
     Mesmo guardando apenas R$ 50 por mês, depois de 10 anos você pode ter 
     muito mais que R$ 6.000 (50 x 12 x 10) por causa dos JUROS COMPOSTOS!
     """
+    logger.debug("💡 SIMULAÇÃO INICIADA:")
+    logger.debug("   📊 Valor inicial: R$ %.2f", initial)
+    logger.debug("   💸 Aporte mensal: R$ %.2f", monthly)
+    logger.debug("   📈 Taxa anual: %.1f%%", annual_rate*100)
+    logger.debug("   ⏰ Período: %s anos", years)
+
+    if engine == "closed":
+        balances = compound_monthly_closed(initial, monthly, annual_rate, years)
+    elif engine == "numpy":
+        balances = compound_monthly_vectorized(initial, monthly, annual_rate, years)
+    elif engine == "loop":
+        balances = compound_monthly_loop(initial, monthly, annual_rate, years)
+    else:
+        raise ValueError(f"engine desconhecido: {engine!r} (use 'closed', 'numpy' ou 'loop')")
+
+    # 📅 Uma linha por ano: só montamos a narração se alguém for ler
+    if logger.isEnabledFor(logging.DEBUG):
+        for y, balance in enumerate(balances):
+            if y == 0:
+                logger.debug("📅 Ano %s: R$ %.2f (valor inicial)", y, balance)
+            else:
+                logger.debug("📅 Ano %s: R$ %.2f", y, balance)
+
+    final = balances[-1]
+    logger.debug("🎉 RESULTADO FINAL: R$ %.2f", final)
+    logger.debug("💰 Você investiu: R$ %.2f", (initial + monthly * years * 12))
+    logger.debug("📈 Os juros renderam: R$ %.2f", (final - initial - monthly * years * 12))
+    logger.debug("=" * 50)
+    
+    return balances
+
+
+def _annuity_year_factors(annual_rate: float):
+    """
+    🧮 Fatores de UM ANO (12 meses) de juros compostos com depósito mensal:
+    - growth: quanto o saldo multiplica em 12 meses = (1 + m) ** 12
+    - annuity: quanto valem 12 depósitos de R$ 1 no fim do ano = (growth - 1) / m
+    """
+    monthly_rate = annual_rate / 12.0
+    growth = (1 + monthly_rate) ** 12
+    if monthly_rate == 0:
+        return growth, 12.0
+    return growth, (growth - 1) / monthly_rate
+
+
+def compound_monthly_closed(initial: float, monthly: float, annual_rate: float, years: int) -> List[float]:
+    """
+    ⚡ Juros compostos pela fórmula fechada da anuidade.
+
+    Em vez de repetir 12 meses por ano, aplica o fator anual:
+        saldo_ano_seguinte = saldo * growth + mensal * annuity
+    São só `years` passos. Antes do arredondamento a diferença para a versão mês a
+    mês é da ordem de 1e-14 do saldo, então os saldos em centavos são iguais até
+    uns R$ 10 milhões; acima disso podem diferir em no máximo 1 centavo.
+    """
+    growth, annuity = _annuity_year_factors(annual_rate)
+    deposit = monthly * annuity
+    balances = []
+    balance = initial
+    for _ in range(years + 1):
+        balances.append(round(balance, 2))
+        balance = balance * growth + deposit
+    return balances
+
+
+def compound_monthly_vectorized(initial: float, monthly: float, annual_rate: float, years: int) -> List[float]:
+    """
+    ⚡ Juros compostos pela fórmula fechada, calculando todos os anos de uma vez (NumPy).
+
+    saldo(y) = inicial * growth**y + mensal * annuity * (growth**y - 1) / (growth - 1)
+    Mesma tolerância de compound_monthly_closed (até 1 centavo acima de ~R$ 10 milhões).
+    """
+    growth, annuity = _annuity_year_factors(annual_rate)
+    year_index = np.arange(years + 1)
+    growth_y = growth ** year_index
+    if growth == 1.0:
+        deposits = monthly * annuity * year_index
+    else:
+        deposits = monthly * annuity * (growth_y - 1) / (growth - 1)
+    return [round(float(b), 2) for b in initial * growth_y + deposits]
+
+
+def compound_monthly_loop(initial: float, monthly: float, annual_rate: float, years: int) -> List[float]:
+    """
+    🐢 Versão original, mês a mês - mantida como referência para os testes de paridade.
+    """
     balances = []  # 📝 Lista onde vamos guardar o saldo de cada ano
     monthly_rate = annual_rate / 12.0  # 🔢 Taxa anual ÷ 12 = taxa mensal
     balance = initial  # 💰 Começamos com o valor inicial
     
-    print(f"💡 SIMULAÇÃO INICIADA:")
-    print(f"   📊 Valor inicial: R$ {initial:.2f}")
-    print(f"   💸 Aporte mensal: R$ {monthly:.2f}")  
-    print(f"   📈 Taxa anual: {annual_rate*100:.1f}%")
-    print(f"   ⏰ Período: {years} anos")
-    print()
-    
     # 🔄 Para cada ano (incluindo o ano 0 = situação inicial)
     for y in range(years + 1):
         balances.append(round(balance, 2))  # ✅ Guarda o saldo atual
         
-        if y == 0:
-            print(f"📅 Ano {y}: R$ {balance:.2f} (valor inicial)")
-        else:
-            print(f"📅 Ano {y}: R$ {balance:.2f}")
-        
         # 🗓️ Simula os 12 meses do ano atual
         for month in range(12):
             # 🧮 FÓRMULA DOS JUROS COMPOSTOS:
             # Novo saldo = (Saldo atual × (1 + juros)) + depósito mensal
             balance = balance * (1 + monthly_rate) + monthly
-            
-    print(f"🎉 RESULTADO FINAL: R$ {balance:.2f}")
-    print(f"💰 Você investiu: R$ {(initial + monthly * years * 12):.2f}")
-    print(f"📈 Os juros renderam: R$ {(balance - initial - monthly * years * 12):.2f}")
-    print("="*50)
     
     return balances
 
 
-def project_investments(monthly: float, years: int, annual_return: float, initial: float = 0.0) -> Dict:
+def project_investments(monthly: float, years: int, annual_return: float, initial: float = 0.0,
+                        engine: str = "closed") -> Dict:
     """
     🔮 MÁQUINA DO TEMPO FINANCEIRA! ⏰
     
@@ -87,6 +190,7 @@ def project_investments(monthly: float, years: int, annual_return: float, initia
     - years: Por quantos anos (ex: 5, 10, 20 anos)
     - annual_return: Taxa de retorno anual esperada (ex: 0.05 = 5% ao ano)
     - initial: Dinheiro que você já tem hoje (padrão = R$ 0)
+    - engine: como calcular os saldos (veja compound_monthly)
     
     📦 RETORNA: Um "pacote" com:
     - years: Lista dos anos (0, 1, 2, 3...)
@@ -97,7 +201,7 @@ def project_investments(monthly: float, years: int, annual_return: float, initia
     Compare diferentes taxas! Veja como 5% vs 10% ao ano fazem ENORME diferença!
     """
     # 🧮 Chama a função de juros compostos para fazer os cálculos
-    balances = compound_monthly(initial, monthly, annual_return, years)
+    balances = compound_monthly(initial, monthly, annual_return, years, engine=engine)
     
     # 📦 Organiza os dados em um "pacote" organizado
     result = {
@@ -106,18 +210,373 @@ def project_investments(monthly: float, years: int, annual_return: float, initia
         "final": balances[-1]  # Último valor da lista = valor final
     }
     
-    print(f"📋 RESUMO DA PROJEÇÃO:")
-    print(f"   🎯 Investimento mensal: R$ {monthly}")
-    print(f"   📅 Período: {years} anos") 
-    print(f"   📈 Taxa anual: {annual_return*100}%")
-    print(f"   💰 Resultado final: R$ {result['final']:.2f}")
+    logger.debug("📋 RESUMO DA PROJEÇÃO:")
+    logger.debug("   🎯 Investimento mensal: R$ %s", monthly)
+    logger.debug("   📅 Período: %s anos", years)
+    logger.debug("   📈 Taxa anual: %s%%", annual_return*100)
+    logger.debug("   💰 Resultado final: R$ %.2f", result['final'])
     
     return result
 
 
-def monte_carlo_projection(monthly: float, years: int, mu: float = 0.12, sigma: float = 0.25, n_sims: int = 1000):
+def project_investments_batch(monthlies, years, annual_returns, initial: float = 0.0) -> List[List[Dict]]:
+    """
+    🏫 PROJEÇÕES DA TURMA INTEIRA DE UMA VEZ!
+
+    Calcula, numa única conta vetorizada, a projeção de cada aluno (`monthlies[i]`
+    por mês durante `years[i]` anos) para cada taxa de `annual_returns`. Monta uma
+    matriz (alunos × taxas × anos) com a fórmula fechada da anuidade e depois
+    recorta o prazo de cada aluno.
+
+    📦 RETORNA: uma lista por aluno, com um dicionário por taxa no mesmo formato
+    de project_investments (years, balances, final).
+    """
+    monthlies = np.asarray(monthlies, dtype=float)
+    years = [int(y) for y in years]
+    if len(years) == 0:
+        return []
+    factors = [_annuity_year_factors(r) for r in annual_returns]
+    growth = np.array([g for g, _ in factors])[None, :, None]   # (1, taxas, 1)
+    annuity = np.array([a for _, a in factors])[None, :, None]
+    year_index = np.arange(max(years) + 1)[None, None, :]       # (1, 1, anos)
+    growth_y = growth ** year_index
+    zero_rate = growth == 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        steps = np.where(zero_rate, year_index, (growth_y - 1) / np.where(zero_rate, 1.0, growth - 1))
+    # Mesma ordem das operações de compound_monthly_vectorized (mensal × anuidade × passos)
+    balances = initial * growth_y + (monthlies[:, None, None] * annuity) * steps  # (alunos, taxas, anos)
+
+    out = []
+    for i, n_years in enumerate(years):
+        per_rate = []
+        for j in range(len(factors)):
+            row = [round(float(b), 2) for b in balances[i, j, :n_years + 1]]
+            per_rate.append({"years": list(range(0, n_years + 1)), "balances": row, "final": row[-1]})
+        out.append(per_rate)
+    return out
+
+
+def monte_carlo_projection(monthly: float, years: int, mu: float = 0.12, sigma: float = 0.25, n_sims: int = 1000,
+                           engine: str = "numpy", seed: Optional[int] = None, percentiles: str = "exact",
+                           bands: Optional[List[float]] = None):
     """
     🎲 SIMULADOR DE RISCO - MONTE CARLO! 🎯
+
+    Escolhe o "motor" da simulação:
+    - engine="numpy": versão vetorizada (rápida), usada pela API
+    - engine="sharded": versão vetorizada dividida entre vários processos
+    - engine="python": versão original, mês a mês, mantida como referência
+      para conferir os resultados estatisticamente
+
+    Os três motores devolvem o mesmo dicionário (p10, p50, p90, media...).
+
+    seed: "semente" do sorteio. Com a mesma semente, a simulação sai sempre igual
+    (ótimo para repetir a demonstração em aula). Cada chamada usa seu próprio
+    gerador, sem mexer no `random` global.
+
+    percentiles: "exact" (padrão) ou "sketch" (aproximado, memória fixa; só nos
+    motores numpy/sharded).
+
+    bands: lista de quantis (ex.: [0.1, 0.5, 0.9]) para devolver também as
+    faixas de percentis de cada ano, em "bands" (só nos motores numpy/sharded).
+    """
+    if engine == "numpy":
+        return monte_carlo_projection_numpy(monthly, years, mu=mu, sigma=sigma, n_sims=n_sims, seed=seed,
+                                            percentiles=percentiles, bands=bands)
+    if engine == "sharded":
+        return monte_carlo_projection_sharded(monthly, years, mu=mu, sigma=sigma, n_sims=n_sims, seed=seed,
+                                              percentiles=percentiles, bands=bands)
+    if engine == "python":
+        if bands:
+            raise ValueError("bands só está disponível nos motores 'numpy' e 'sharded'")
+        return monte_carlo_projection_reference(monthly, years, mu=mu, sigma=sigma, n_sims=n_sims, seed=seed)
+    raise ValueError(f"engine desconhecido: {engine!r} (use 'numpy', 'sharded' ou 'python')")
+
+
+def _annual_factors(annual_returns):
+    """
+    🧮 Junta os 12 meses de um ano em uma única conta.
+
+    Com taxa mensal m = r / 12 aplicada 12 vezes:
+    - crescimento do saldo no ano: (1 + m) ** 12
+    - valor dos 12 depósitos de R$ 1 no fim do ano: ((1 + m) ** 12 - 1) / m
+      (quando m = 0, são simplesmente 12 depósitos)
+
+    Assim: saldo_fim = saldo_inicio * crescimento + mensal * anuidade
+    """
+    monthly_rates = np.asarray(annual_returns, dtype=float) / 12.0
+    growth = (1.0 + monthly_rates) ** 12
+    # Evita divisão por zero quando a taxa do ano é exatamente 0%
+    safe_rates = np.where(monthly_rates == 0.0, 1.0, monthly_rates)
+    annuity = np.where(monthly_rates == 0.0, 12.0, (growth - 1.0) / safe_rates)
+    return growth, annuity
+
+
+# 🧩 As simulações são sorteadas em pedaços de tamanho fixo, cada um com sua própria
+# "sub-semente" (SeedSequence.spawn). Assim o resultado de uma semente não depende
+# de rodar tudo num processo só ou dividido entre vários.
+MC_CHUNK_SIZE = 10_000
+
+
+def monte_carlo_chunks(n_sims: int, seed: Optional[int] = None, chunk_size: int = MC_CHUNK_SIZE):
+    """🧩 Divide n_sims em pedaços [(quantidade, semente_do_pedaço), ...], na ordem fixa."""
+    sizes = [chunk_size] * (n_sims // chunk_size)
+    if n_sims % chunk_size:
+        sizes.append(n_sims % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    return list(zip(sizes, seeds))
+
+
+def _simulate_chunk(monthly: float, years: int, mu: float, sigma: float, size: int, chunk_seed,
+                    year_balances: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    ⚡ Avança um pedaço de simulações, um ano por vez, e devolve os saldos finais.
+
+    Se `year_balances` (matriz (size, anos + 1)) for passada, o saldo de cada
+    simulação no fim de cada ano é copiado para ela - os meses nunca são guardados.
+    """
+    rng = np.random.default_rng(chunk_seed)
+    returns = rng.normal(mu, sigma, size=(size, years))  # 🎲 Um retorno por simulação e por ano
+    growth, annuity = _annual_factors(returns)
+    balances = np.zeros(size)  # 💰 Todas as simulações começam do zero
+    for year in range(years):
+        balances = balances * growth[:, year] + monthly * annuity[:, year]
+        if year_balances is not None:
+            year_balances[:, year + 1] = balances
+    return balances
+
+
+def monte_carlo_finals(monthly: float, years: int, mu: float, sigma: float, chunks) -> np.ndarray:
+    """
+    ⚡ Saldos finais de uma lista de pedaços, em ordem.
+
+    Para cada pedaço sorteia a matriz (simulações, anos) de retornos anuais e
+    avança todas as simulações juntas, um ano por vez, com o fator de crescimento
+    anual + anuidade (sem o laço dos 12 meses). Roda bem dentro de um processo
+    separado: tudo que recebe e devolve pode ser enviado entre processos.
+    """
+    parts = [_simulate_chunk(monthly, years, mu, sigma, size, chunk_seed) for size, chunk_seed in chunks]
+    return np.concatenate(parts) if parts else np.zeros(0)
+
+
+def monte_carlo_year_balances(monthly: float, years: int, mu: float, sigma: float, chunks) -> np.ndarray:
+    """
+    📅 Mesma simulação de monte_carlo_finals, guardando o saldo no fim de cada ano.
+
+    Devolve a matriz (simulações, anos + 1): a coluna 0 é o início (zero) e a
+    última coluna são exatamente os saldos finais de monte_carlo_finals.
+    """
+    out = np.zeros((sum(size for size, _ in chunks), years + 1))
+    start = 0
+    for size, chunk_seed in chunks:
+        _simulate_chunk(monthly, years, mu, sigma, size, chunk_seed, year_balances=out[start:start + size])
+        start += size
+    return out
+
+
+def monte_carlo_sketch(monthly: float, years: int, mu: float, sigma: float, chunks) -> QuantileSketch:
+    """
+    🧮 Igual a monte_carlo_finals, mas sem guardar os saldos: cada pedaço vai
+    direto para um sketch de percentis (memória fixa, veja quantiles.py).
+    """
+    sketch = QuantileSketch(chunk_size=MC_CHUNK_SIZE)
+    for chunk in chunks:
+        sketch.add(monte_carlo_finals(monthly, years, mu, sigma, [chunk]))
+    return sketch
+
+
+def monte_carlo_year_sketches(monthly: float, years: int, mu: float, sigma: float, chunks) -> List[QuantileSketch]:
+    """🧮 Um sketch de percentis por ano (índice 0 = início); só um pedaço fica na memória por vez."""
+    sketches = [QuantileSketch(chunk_size=MC_CHUNK_SIZE) for _ in range(years + 1)]
+    for chunk in chunks:
+        block = monte_carlo_year_balances(monthly, years, mu, sigma, [chunk])
+        for year, sketch in enumerate(sketches):
+            sketch.add(block[:, year])
+    return sketches
+
+
+def _monte_carlo_result(n_sims: int, p10: float, p50: float, p90: float, media: float, sigma: float) -> Dict:
+    logger.debug("📊 RESULTADOS DA SIMULAÇÃO MONTE CARLO:")
+    logger.debug("   📉 Cenário Pessimista (10%%): R$ %.2f", p10)
+    logger.debug("   📊 Cenário Provável (50%%): R$ %.2f", p50)
+    logger.debug("   📈 Cenário Otimista (90%%): R$ %.2f", p90)
+    logger.debug("=" * 60)
+
+    return {
+        "n_sims": n_sims,
+        "p10": round(p10, 2),
+        "p50": round(p50, 2),
+        "p90": round(p90, 2),
+        "media": round(media, 2),
+        "volatilidade_usada": sigma
+    }
+
+
+def summarize_sketch(sketch: QuantileSketch, sigma: float) -> Dict:
+    """📊 Percentis aproximados (erro de posto ≤ 2/k) e média exata a partir do sketch."""
+    p10, p50, p90 = sketch.quantiles([0.1, 0.5, 0.9])
+    return _monte_carlo_result(sketch.count, p10, p50, p90, sketch.mean(), sigma)
+
+
+def summarize_monte_carlo(finals: np.ndarray, sigma: float) -> Dict:
+    """
+    📊 Percentis e média dos saldos finais (mesmo formato da versão de referência).
+
+    Usa np.partition: só coloca no lugar certo os 3 postos que interessam (tempo
+    linear), em vez de ordenar tudo - o resultado é o mesmo da ordenação completa.
+    """
+    n_sims = len(finals)
+    ranks = [int(0.1 * n_sims), int(0.5 * n_sims), int(0.9 * n_sims)]
+    selected = np.partition(finals, ranks)
+    p10, p50, p90 = (float(selected[r]) for r in ranks)
+    return _monte_carlo_result(n_sims, p10, p50, p90, float(finals.mean()), sigma)
+
+
+def band_label(q: float) -> str:
+    """0.1 -> "p10", 0.025 -> "p2.5"."""
+    return f"p{q * 100:g}"
+
+
+def check_bands(bands) -> List[float]:
+    """Confere a lista de quantis das faixas: cada um entre 0 e 1 (exclusivo)."""
+    bands = [float(q) for q in bands]
+    if not bands or any(not 0.0 < q < 1.0 for q in bands):
+        raise ValueError("bands: informe quantis entre 0 e 1 (exclusivo), por exemplo [0.1, 0.5, 0.9]")
+    return bands
+
+
+def percentile_bands(year_balances: np.ndarray, bands: List[float]) -> Dict:
+    """
+    📈 Faixas de percentis ano a ano a partir da matriz (simulações, anos + 1).
+
+    Um único np.partition por coluna (axis=0) seleciona todos os postos pedidos,
+    com a mesma convenção de summarize_monte_carlo (posto int(q · n)).
+    """
+    n_sims = year_balances.shape[0]
+    ranks = sorted({int(q * n_sims) for q in bands})
+    selected = np.partition(year_balances, ranks, axis=0)
+    return {
+        "years": list(range(year_balances.shape[1])),
+        "percentis": {band_label(q): [round(float(v), 2) for v in selected[int(q * n_sims)]] for q in bands},
+    }
+
+
+def sketch_bands(sketches: List[QuantileSketch], bands: List[float]) -> Dict:
+    """📈 Faixas de percentis ano a ano a partir de um sketch por ano (aproximadas)."""
+    per_year = [sketch.quantiles(bands) for sketch in sketches]
+    return {
+        "years": list(range(len(sketches))),
+        "percentis": {band_label(q): [round(values[i], 2) for values in per_year] for i, q in enumerate(bands)},
+    }
+
+
+def monte_carlo_work(percentiles: str = "exact", bands: Optional[List[float]] = None):
+    """
+    🧩 Função que simula uma lista de pedaços, conforme o que a resposta precisa:
+    saldos finais ou sketch, e - com faixas - o mesmo guardando cada ano.
+    """
+    if percentiles not in ("exact", "sketch"):
+        raise ValueError(f"percentiles desconhecido: {percentiles!r} (use 'exact' ou 'sketch')")
+    if bands:
+        check_bands(bands)
+        return monte_carlo_year_sketches if percentiles == "sketch" else monte_carlo_year_balances
+    return monte_carlo_sketch if percentiles == "sketch" else monte_carlo_finals
+
+
+def merge_monte_carlo_parts(parts, sigma: float, percentiles: str = "exact",
+                            bands: Optional[List[float]] = None) -> Dict:
+    """📊 Junta, na ordem, os resultados de monte_carlo_work de cada pedaço/processo e resume."""
+    if bands:
+        bands = check_bands(bands)
+    if percentiles == "sketch":
+        merged = parts[0]
+        for other in parts[1:]:
+            if bands:
+                for mine, theirs in zip(merged, other):
+                    mine.merge(theirs)
+            else:
+                merged.merge(other)
+        if not bands:
+            return summarize_sketch(merged, sigma)
+        result = summarize_sketch(merged[-1], sigma)
+        result["bands"] = sketch_bands(merged, bands)
+        return result
+    merged = np.concatenate(parts)
+    if not bands:
+        return summarize_monte_carlo(merged, sigma)
+    result = summarize_monte_carlo(np.ascontiguousarray(merged[:, -1]), sigma)
+    result["bands"] = percentile_bands(merged, bands)
+    return result
+
+
+def monte_carlo_projection_numpy(monthly: float, years: int, mu: float = 0.12, sigma: float = 0.25,
+                                 n_sims: int = 1000, seed: Optional[int] = None, percentiles: str = "exact",
+                                 bands: Optional[List[float]] = None):
+    """
+    ⚡ MONTE CARLO VETORIZADO (num processo só)
+
+    Sorteia os retornos anuais em matrizes (simulações, anos), pedaço por pedaço.
+    - percentiles="exact": junta os saldos finais e seleciona os percentis exatos
+    - percentiles="sketch": não guarda os saldos; percentis aproximados em memória
+      fixa (erro de posto ≤ 2/k, veja quantiles.py) - para milhões de cenários
+    - bands=[0.1, 0.5, 0.9, ...]: inclui também as faixas de percentis de cada
+      ano ("gráfico em leque"), calculadas na mesma passada
+    """
+    logger.debug("🎲 INICIANDO SIMULAÇÃO MONTE CARLO (vetorizada)!")
+    logger.debug("   🔢 Número de simulações: %s", n_sims)
+    logger.debug("   📊 Retorno médio esperado: %.1f%% ao ano", mu*100)
+    logger.debug("   ⚡ Volatilidade (risco): %.1f%%", sigma*100)
+
+    work = monte_carlo_work(percentiles, bands)
+    part = work(monthly, years, mu, sigma, monte_carlo_chunks(n_sims, seed))
+    return merge_monte_carlo_parts([part], sigma, percentiles, bands)
+
+
+def split_shards(chunks, n_shards: int):
+    """🧩 Reparte os pedaços em até n_shards grupos contíguos (mantendo a ordem)."""
+    n_shards = max(1, min(n_shards, len(chunks)))
+    step, extra = divmod(len(chunks), n_shards)
+    shards, start = [], 0
+    for i in range(n_shards):
+        end = start + step + (1 if i < extra else 0)
+        shards.append(chunks[start:end])
+        start = end
+    return shards
+
+
+def monte_carlo_projection_sharded(monthly: float, years: int, mu: float = 0.12, sigma: float = 0.25,
+                                   n_sims: int = 1000, seed: Optional[int] = None,
+                                   workers: Optional[int] = None, executor=None, percentiles: str = "exact",
+                                   bands: Optional[List[float]] = None):
+    """
+    🚀 MONTE CARLO EM VÁRIOS PROCESSOS
+
+    Divide os pedaços de simulações entre processos (`executor`, ou um
+    ProcessPoolExecutor próprio com `workers` processos) e junta os saldos finais
+    na ordem original. Com a mesma semente, p10/p50/p90 e média são idênticos
+    aos de monte_carlo_projection_numpy. Com percentiles="sketch" cada processo
+    devolve só o seu sketch de percentis, e os sketches são combinados.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    shards = split_shards(monte_carlo_chunks(n_sims, seed), workers or os.cpu_count() or 1)
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=len(shards))
+    work = monte_carlo_work(percentiles, bands)
+    try:
+        futures = [executor.submit(work, monthly, years, mu, sigma, shard) for shard in shards]
+        parts = [f.result() for f in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return merge_monte_carlo_parts(parts, sigma, percentiles, bands)
+
+
+def monte_carlo_projection_reference(monthly: float, years: int, mu: float = 0.12, sigma: float = 0.25,
+                                     n_sims: int = 1000, seed: Optional[int] = None):
+    """
+    🎲 SIMULADOR DE RISCO - MONTE CARLO (versão de referência) 🎯
     
     Esta é a função mais AVANÇADA! Ela simula milhares de cenários diferentes
     para mostrar que investimentos arriscados podem dar resultados muito variados.
@@ -132,6 +591,7 @@ def monte_carlo_projection(monthly: float, years: int, mu: float = 0.12, sigma:
     - mu: Retorno médio esperado por ano (ex: 0.12 = 12% ao ano)
     - sigma: "Risco" ou volatilidade (ex: 0.25 = pode variar ±25%)
     - n_sims: Quantas simulações fazer (padrão = 1000 cenários!)
+    - seed: Semente do sorteio (mesma semente = mesmos cenários)
     
     📊 RETORNA: Três cenários possíveis:
     - p10: Cenário PESSIMISTA (só 10% das vezes fica pior que isso)
@@ -143,13 +603,14 @@ def monte_carlo_projection(monthly: float, years: int, mu: float = 0.12, sigma:
     Por isso é importante diversificar (não colocar tudo no mesmo lugar).
     """
     
-    print(f"🎲 INICIANDO SIMULAÇÃO MONTE CARLO!")
-    print(f"   🔢 Número de simulações: {n_sims}")
-    print(f"   📊 Retorno médio esperado: {mu*100:.1f}% ao ano")
-    print(f"   ⚡ Volatilidade (risco): {sigma*100:.1f}%")
-    print()
+    logger.debug("🎲 INICIANDO SIMULAÇÃO MONTE CARLO!")
+    logger.debug("   🔢 Número de simulações: %s", n_sims)
+    logger.debug("   📊 Retorno médio esperado: %.1f%% ao ano", mu*100)
+    logger.debug("   ⚡ Volatilidade (risco): %.1f%%", sigma*100)
     
+    rng = random.Random(seed)  # 🎲 Gerador só desta simulação (não altera o random global)
     finals = []  # 📝 Lista para guardar o resultado final de cada simulação
+    narrate = logger.isEnabledFor(logging.DEBUG)
     
     # 🔄 Roda milhares de simulações com diferentes cenários
     for simulation in range(n_sims):
@@ -159,7 +620,7 @@ def monte_carlo_projection(monthly: float, years: int, mu: float = 0.12, sigma:
         for year in range(years):
             # 🎲 GERA UM RESULTADO ALEATÓRIO para este ano
             # Baseado na média (mu) e risco (sigma)
-            r = random.normalvariate(mu, sigma)  # 📊 Retorno anual aleatório
+            r = rng.normalvariate(mu, sigma)  # 📊 Retorno anual aleatório
             monthly_rate = r / 12.0  # 🔢 Converte para taxa mensal
             
             # 📅 Aplica este resultado durante os 12 meses do ano
@@ -169,8 +630,8 @@ def monte_carlo_projection(monthly: float, years: int, mu: float = 0.12, sigma:
         finals.append(balance)  # ✅ Guarda o resultado final desta simulação
         
         # 📊 Progresso a cada 100 simulações
-        if (simulation + 1) % 100 == 0:
-            print(f"   ⏳ Progresso: {simulation + 1}/{n_sims} simulações concluídas")
+        if narrate and (simulation + 1) % 100 == 0:
+            logger.debug("   ⏳ Progresso: %s/%s simulações concluídas", simulation + 1, n_sims)
     
     # 📊 ANÁLISE DOS RESULTADOS
     finals_sorted = sorted(finals)  # 📈 Ordena do menor para o maior
@@ -180,17 +641,15 @@ def monte_carlo_projection(monthly: float, years: int, mu: float = 0.12, sigma:
     p50 = finals_sorted[int(0.5 * len(finals_sorted))]   # 📊 Cenário mediano (mais provável)
     p90 = finals_sorted[int(0.9 * len(finals_sorted))]   # 📈 10% melhor cenário
     
-    print()
-    print(f"📊 RESULTADOS DA SIMULAÇÃO MONTE CARLO:")
-    print(f"   📉 Cenário Pessimista (10%): R$ {p10:.2f}")
-    print(f"   📊 Cenário Provável (50%): R$ {p50:.2f}")  
-    print(f"   📈 Cenário Otimista (90%): R$ {p90:.2f}")
-    print()
-    print(f"💡 INTERPRETAÇÃO:")
-    print(f"   • Em 90% dos casos, você terá PELO MENOS R$ {p10:.2f}")
-    print(f"   • O resultado mais comum é em torno de R$ {p50:.2f}")
-    print(f"   • Em 10% dos casos, você pode ter MAIS DE R$ {p90:.2f}")
-    print("="*60)
+    logger.debug("📊 RESULTADOS DA SIMULAÇÃO MONTE CARLO:")
+    logger.debug("   📉 Cenário Pessimista (10%%): R$ %.2f", p10)
+    logger.debug("   📊 Cenário Provável (50%%): R$ %.2f", p50)
+    logger.debug("   📈 Cenário Otimista (90%%): R$ %.2f", p90)
+    logger.debug("💡 INTERPRETAÇÃO:")
+    logger.debug("   • Em 90%% dos casos, você terá PELO MENOS R$ %.2f", p10)
+    logger.debug("   • O resultado mais comum é em torno de R$ %.2f", p50)
+    logger.debug("   • Em 10%% dos casos, você pode ter MAIS DE R$ %.2f", p90)
+    logger.debug("=" * 60)
     
     # 📦 Retorna os resultados organizados
     return {
@@ -203,30 +662,187 @@ def monte_carlo_projection(monthly: float, years: int, mu: float = 0.12, sigma:
     }
 
 
+def _goal_result(months: int, monthly_saving: float, accumulated: float) -> Dict:
+    years = months / 12
+    return {
+        "months_needed": months,
+        "years_needed": round(years, 1),
+        "total_invested": monthly_saving * months,
+        "interest_earned": round(accumulated - (monthly_saving * months), 2),
+        "final_amount": round(accumulated, 2)
+    }
+
+
+# Folga absoluta (meio centavo) para comparar o saldo da fórmula com a meta: a fórmula
+# fechada erra nas últimas casas do float, e sem a folga um empate exato (ex.: meta = 1
+# depósito) seria contado como "ainda não chegou". Em reais, e não relativa à meta: numa
+# meta de R$ 1 trilhão uma folga relativa de 1e-10 já seria R$ 100 a menos.
+GOAL_TOLERANCE = 0.005
+
+# Maior meta aceita (R$ 1 trilhão): acima disso as contas em float perdem os centavos
+GOAL_MAX_AMOUNT = 1e12
+
+
+def _saved_after(months: int, monthly_saving: float, monthly_rate: float) -> float:
+    """💰 Saldo depois de `months` depósitos (fórmula da anuidade: P × ((1 + m)ⁿ − 1) / m)."""
+    if monthly_rate == 0:
+        return monthly_saving * months
+    # expm1/log1p em vez de (1 + m) ** n: não perde precisão com taxas muito pequenas
+    return monthly_saving * math.expm1(months * math.log1p(monthly_rate)) / monthly_rate
+
+
+NO_SAVING = "monthly_saving deve ser maior que zero para atingir a meta"
+
+
+def _check_goal(goal_amount: float, monthly_saving: float, annual_rate: float) -> Optional[str]:
+    """Motivo para não dar para calcular a meta (None se está tudo certo)."""
+    if not all(map(math.isfinite, (goal_amount, monthly_saving, annual_rate))):
+        return "valores precisam ser números finitos"
+    if goal_amount > GOAL_MAX_AMOUNT:
+        return f"meta acima do máximo de R$ {GOAL_MAX_AMOUNT:,.0f}".replace(",", ".")
+    return None
+
+
+def _goal_months(goal_amount: float, monthly_saving: float, monthly_rate: float, estimate: float) -> int:
+    """
+    Menor número de meses com saldo >= meta (meta > 0, mensal > 0), partindo da
+    estimativa dos logaritmos. Usada pela versão simples e pela em lote, para que as
+    duas deem sempre o mesmo número.
+    """
+    if monthly_rate == 0:
+        goal_cents, saving_cents = round(goal_amount * 100), round(monthly_saving * 100)
+        if saving_cents > 0:
+            return max(1, -(-goal_cents // saving_cents))  # Sem juros: teto exato, em centavos inteiros
+    months = max(1, math.ceil(estimate))
+    # 🔧 Correção para o mês inteiro exato (arredondamentos do logaritmo: um ou dois passos)
+    target = goal_amount - GOAL_TOLERANCE
+    while _saved_after(months, monthly_saving, monthly_rate) < target:
+        months += 1
+    while months > 1 and _saved_after(months - 1, monthly_saving, monthly_rate) >= target:
+        months -= 1
+    return months
+
+
+def goal_projection(goal_amount: float, monthly_saving: float, annual_rate: float = 0.05,
+                    max_months: Optional[int] = None) -> Dict:
+    """
+    🎯 CALCULADORA DE METAS!
+
+    Quanto tempo leva para juntar `goal_amount` guardando `monthly_saving` por mês
+    com juros de `annual_rate` ao ano?
+
+    Em vez de somar mês a mês, resolve a fórmula da anuidade com logaritmos:
+        meses = log(1 + meta × m / P) / log(1 + m)
+    e depois confere o mês inteiro vizinho (com meio centavo de folga). Sem juros a
+    conta é exata, em centavos: teto(meta / mensal). Funciona para qualquer prazo e
+    metas até GOAL_MAX_AMOUNT; `max_months` (opcional) limita o prazo como a versão
+    antiga fazia (600 meses = 50 anos).
+
+    📦 RETORNA: meses e anos necessários, total investido, juros ganhos e valor final
+    """
+    monthly_rate = annual_rate / 12
+    problem = _check_goal(goal_amount, monthly_saving, annual_rate)
+    if problem:
+        raise ValueError(problem)
+    if goal_amount <= 0:
+        months = 0
+    elif monthly_saving <= 0:
+        if max_months is None:
+            raise ValueError(NO_SAVING)
+        months = max_months
+    else:
+        if monthly_rate == 0:
+            estimate = goal_amount / monthly_saving
+        else:
+            estimate = math.log1p(goal_amount * monthly_rate / monthly_saving) / math.log1p(monthly_rate)
+        months = _goal_months(goal_amount, monthly_saving, monthly_rate, estimate)
+    if max_months is not None:
+        months = min(months, max_months)
+    return _goal_result(months, monthly_saving, _saved_after(months, monthly_saving, monthly_rate))
+
+
+def goal_projection_batch(goals) -> List[Dict]:
+    """
+    📚 Várias metas de uma vez (ex.: uma lista de exercícios para a turma).
+
+    `goals` é uma lista de (meta, mensal, taxa_anual). Os logaritmos são feitos
+    juntos, em vetores NumPy; a correção do mês é a mesma de goal_projection.
+    Uma meta que não dá para calcular vira {"error": motivo} sem derrubar as outras.
+    """
+    if len(goals) == 0:
+        return []
+    table = np.asarray(goals, dtype=float).reshape(-1, 3)
+    goal, saving, rate = table[:, 0], table[:, 1], table[:, 2] / 12
+
+    safe_saving = np.where(saving > 0, saving, 1.0)
+    safe_rate = np.where(rate == 0, 1.0, rate)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        estimate = np.where(
+            rate == 0,
+            goal / safe_saving,
+            np.log1p(goal * rate / safe_saving) / np.log1p(safe_rate),
+        )
+
+    results = []
+    for g, p, m, (_, _, annual), e in zip(goal.tolist(), saving.tolist(), rate.tolist(), table.tolist(),
+                                          estimate.tolist()):
+        problem = _check_goal(g, p, annual) or (NO_SAVING if g > 0 and p <= 0 else None)
+        if problem:
+            results.append({"error": problem})
+            continue
+        months = _goal_months(g, p, m, e) if g > 0 else 0
+        results.append(_goal_result(months, p, _saved_after(months, p, m)))
+    return results
+
+
+def goal_projection_loop(goal_amount: float, monthly_saving: float, annual_rate: float = 0.05,
+                         max_months: int = 600) -> Dict:
+    """
+    🐢 Versão original, mês a mês (até `max_months`) - referência para os testes.
+    """
+    monthly_rate = annual_rate / 12
+    months = 0
+    accumulated = 0
+
+    while accumulated < goal_amount and months < max_months:
+        accumulated = accumulated * (1 + monthly_rate) + monthly_saving
+        months += 1
+
+    return _goal_result(months, monthly_saving, accumulated)
+
+
 # 🧪 FUNÇÃO DE TESTE - Para verificar se tudo funciona!
-def test_calculations():
+def test_calculations(verbose: bool = False):
     """
     🧪 LABORATÓRIO DE TESTES! 
     
     Esta função testa se nossos cálculos estão funcionando corretamente.
     É como um "laboratório" onde testamos nossas fórmulas matemáticas.
+
+    verbose=True liga o modo educativo e mostra a narração de cada conta.
     """
+    if verbose:
+        enable_educational_output()
+
     print("🧪 TESTANDO OS CÁLCULOS FINANCEIROS...")
     print()
     
     # Teste 1: Juros compostos básicos
     print("📋 TESTE 1: Guardando R$ 100/mês por 5 anos a 8% ao ano")
     resultado = project_investments(monthly=100, years=5, annual_return=0.08)
+    print(f"   💰 Resultado final: R$ {resultado['final']:.2f}")
     print()
     
     # Teste 2: Simulação Monte Carlo  
     print("📋 TESTE 2: Simulação de risco com ações (12% ± 25%)")
-    monte_carlo_projection(monthly=100, years=5, mu=0.12, sigma=0.25, n_sims=100)
+    mc = monte_carlo_projection(monthly=100, years=5, mu=0.12, sigma=0.25, n_sims=100)
+    print(f"   🎲 p10 R$ {mc['p10']:.2f} | p50 R$ {mc['p50']:.2f} | p90 R$ {mc['p90']:.2f}")
     print()
     
     print("✅ TESTES CONCLUÍDOS! Tudo funcionando perfeitamente! 🎉")
 
 
 # 🚀 Se este arquivo for executado diretamente, roda os testes
+# (use "python calc.py --verbose" para ver a explicação passo a passo)
 if __name__ == "__main__":
-    test_calculations()
\ No newline at end of file
+    test_calculations(verbose="--verbose" in sys.argv[1:] or "-v" in sys.argv[1:])
@@ -0,0 +1,107 @@
+# backend/catalog.py
+"""
+Conteúdo estático da plataforma (glossário, dicas, profissões).
+
+Os textos ficam em arquivos JSON na pasta content/. Cada arquivo é lido e
+convertido para bytes uma única vez; a resposta já sai pronta, com um ETag
+forte (hash do conteúdo) e Cache-Control. Quando o navegador manda de volta o
+ETag em If-None-Match, a API responde 304 sem corpo. As versões gzip/Brotli
+também são geradas uma vez só, no carregamento.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from fastapi import Request, Response
+
+from compression import choose_encoding, compress_variants
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content")
+CATALOG_MAX_AGE = int(os.environ.get("CATALOG_MAX_AGE", "3600"))  # Segundos que o navegador pode reusar sem perguntar
+
+
+class Catalog:
+    """Um arquivo de conteúdo já serializado: corpo em bytes + ETag."""
+
+    def __init__(self, name: str, data):
+        self.name = name
+        self.data = data
+        # Mesmo formato do JSON que o FastAPI gerava antes (UTF-8, sem espaços)
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.variants = compress_variants(self.body)  # {"identity": ..., "gzip": ..., "br": ...}
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        # Cada versão comprimida é outra representação: ETag forte próprio
+        self.etags = {encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+                      for encoding in self.variants}
+        self.etag = self.etags["identity"]
+
+    @classmethod
+    def from_file(cls, path: str) -> "Catalog":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(os.path.splitext(os.path.basename(path))[0], data)
+
+    def matches(self, if_none_match: str, encoding: str = "identity") -> bool:
+        """If-None-Match usa comparação fraca: W/"x" e "x" contam como o mesmo ETag.
+
+        Só vale o ETag da variante que seria enviada: quem tem a cópia gzip em cache
+        e agora pede sem compressão (ou vice-versa) recebe o corpo, não um 304.
+        """
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        etag = self.etags[encoding]
+        return "*" in tags or any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+    def response(self, request: Request) -> Response:
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""),
+                                   [name for name in self.variants if name != "identity"]) or "identity"
+        headers = {
+            "ETag": self.etags[encoding],
+            "Cache-Control": f"public, max-age={CATALOG_MAX_AGE}",
+            "Vary": "Accept-Encoding",
+        }
+        if self.matches(request.headers.get("if-none-match", ""), encoding):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(self.variants[encoding], media_type="application/json", headers=headers)
+
+
+class CatalogStore:
+    """Todos os catálogos de uma pasta, carregados uma vez (em segundo plano no startup ou no primeiro uso)."""
+
+    def __init__(self, directory: str = CONTENT_DIR):
+        self.directory = directory
+        self._catalogs = {}
+        self._lock = threading.Lock()
+
+    def _read_all(self) -> dict:
+        catalogs = {}
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith(".json"):
+                catalog = Catalog.from_file(os.path.join(self.directory, filename))
+                catalogs[catalog.name] = catalog
+        return catalogs
+
+    def load_all(self) -> None:
+        catalogs = self._read_all()
+        with self._lock:
+            self._catalogs = catalogs
+
+    def _ensure(self, name: str = None):
+        with self._lock:  # Uma leitura por vez: quem chega durante a carga espera por ela em vez de repetir
+            if not self._catalogs or (name is not None and name not in self._catalogs):
+                self._catalogs = self._read_all()
+
+    def preload(self) -> threading.Thread:
+        """Lê e comprime os catálogos numa thread, sem atrasar o startup."""
+        thread = threading.Thread(target=self._ensure, name="catalog-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def get(self, name: str) -> Catalog:
+        if name not in self._catalogs:
+            self._ensure(name)
+        return self._catalogs[name]
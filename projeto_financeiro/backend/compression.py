@@ -0,0 +1,236 @@
+# backend/compression.py
+"""
+Compressão das respostas (gzip e, se o pacote `brotli` estiver instalado, Brotli).
+
+- CompressionMiddleware comprime na hora as respostas grandes (submissões,
+  projeções ano a ano...) para quem manda Accept-Encoding. Respostas menores
+  que COMPRESSION_MIN_SIZE saem como estão: comprimir poucos bytes só gasta CPU.
+- compress_variants gera de antemão as versões comprimidas de um corpo fixo
+  (usado pelos catálogos em catalog.py).
+- PrecompressedStaticFiles serve app.js.gz / app.js.br quando existem ao lado
+  do arquivo original (gerados com: python compression.py ../frontend).
+"""
+import gzip
+import os
+import sys
+import zlib
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli  # Opcional: pip install brotli
+except ImportError:
+    brotli = None
+
+# COMPRESSION="br,gzip" (ordem de preferência do servidor); "off" desliga o middleware
+COMPRESSION = os.environ.get("COMPRESSION", "br,gzip")
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))  # Bytes
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))  # Na hora; os arquivos pré-comprimidos usam 11
+THREAD_MIN_SIZE = 128 * 1024  # Corpos maiores que isso são comprimidos fora do event loop
+
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+PRECOMPRESS_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt")
+# Já comprimidos ou precisam chegar sem buffer (SSE)
+EXCLUDED_TYPES = ("image/", "video/", "audio/", "font/woff", "application/gzip", "application/zip",
+                  "text/event-stream")
+
+
+def available_encodings(setting: str = COMPRESSION) -> list:
+    """Codificações ligadas na configuração e suportadas nesta instalação, na ordem de preferência."""
+    if setting.strip().lower() in ("", "off", "0", "none"):
+        return []
+    wanted = [name.strip().lower() for name in setting.split(",")]
+    return [name for name in wanted if name == "gzip" or (name == "br" and brotli is not None)]
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """Melhor codificação de `available` aceita pelo cliente (pelo q de Accept-Encoding), ou None."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for name in available:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int = None) -> bytes:
+    """Comprime um corpo completo (deterministicamente: o gzip sai sem data)."""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9 if level is None else level, mtime=0)
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if level is None else level)
+    raise ValueError(f"codificação desconhecida: {encoding!r}")
+
+
+def compress_variants(body: bytes) -> dict:
+    """{"identity": body, "gzip": ..., "br": ...} com as codificações ligadas e disponíveis."""
+    variants = {"identity": body}
+    for encoding in available_encodings():
+        variants[encoding] = compress(body, encoding)
+    return variants
+
+
+class _StreamCompressor:
+    """Compressor incremental: cada pedaço sai "fechado" (sync flush) para o streaming não travar."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compressão com tamanho mínimo (gzip e Brotli)."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, encodings=None,
+                 gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings() if encodings is None else list(encodings)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start["headers"])
+                media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+                if ("content-encoding" in headers or start["status"] in (204, 206, 304)
+                        or media_type.startswith(EXCLUDED_TYPES)
+                        or (not more_body and len(body) < self.minimum_size)):
+                    passthrough = True
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                compressor = _StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                payload = await self._compress(compressor, body, not more_body)
+                if not more_body:
+                    headers["Content-Length"] = str(len(payload))
+                await send(start)
+                start = None
+            else:
+                payload = await self._compress(compressor, body, not more_body)
+            await send({"type": "http.response.body", "body": payload, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    async def _compress(compressor: _StreamCompressor, body: bytes, final: bool) -> bytes:
+        if len(body) >= THREAD_MIN_SIZE:
+            return await run_in_threadpool(compressor.compress, body, final)
+        return compressor.compress(body, final)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles que prefere arquivo.br / arquivo.gz (mais novos que o original) quando o cliente aceita."""
+
+    def __init__(self, *args, encodings=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.encodings = available_encodings() if encodings is None else list(encodings)
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if not isinstance(response, FileResponse) or response.status_code != 200:
+            return response
+        request_headers = Headers(scope=scope)
+        original = os.stat(response.path)
+        candidates = list(self.encodings)
+        while candidates:
+            encoding = choose_encoding(request_headers.get("accept-encoding", ""), candidates)
+            if encoding is None:
+                break
+            candidates.remove(encoding)
+            variant = response.path + SUFFIXES[encoding]
+            try:
+                stat_result = os.stat(variant)
+            except FileNotFoundError:
+                continue
+            if stat_result.st_mtime < original.st_mtime:
+                continue  # Versão comprimida desatualizada: melhor servir o original
+            compressed = FileResponse(variant, stat_result=stat_result, media_type=response.media_type,
+                                      headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+            if self.is_not_modified(compressed.headers, request_headers):
+                return NotModifiedResponse(compressed.headers)
+            return compressed
+        if self.encodings:
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+def precompress_directory(directory: str, minimum_size: int = COMPRESSION_MIN_SIZE) -> list:
+    """Gera arquivo.gz (e arquivo.br) para os arquivos de texto da pasta. Devolve os arquivos criados."""
+    written = []
+    for root, _, files in os.walk(directory):
+        for filename in sorted(files):
+            if not filename.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(root, filename)
+            with open(path, "rb") as f:
+                body = f.read()
+            if len(body) < minimum_size:
+                continue
+            for encoding in available_encodings("br,gzip"):
+                with open(path + SUFFIXES[encoding], "wb") as f:
+                    f.write(compress(body, encoding))
+                written.append(path + SUFFIXES[encoding])
+    return written
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                                                                  "frontend")
+    for path in precompress_directory(target):
+        print(f"✅ {path}")
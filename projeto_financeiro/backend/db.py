@@ -1,6 +1,18 @@
 # backend/db.py
 import sqlite3
-import json
+import base64
+import functools
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import jsoncodec
+
+logger = logging.getLogger(__name__)
 
 
 SCHEMA = """
@@ -10,36 +22,724 @@ CREATE TABLE IF NOT EXISTS submissions (
     payload TEXT,
     created_at DATETIME DEFAULT (datetime('now','localtime'))
 );
+CREATE INDEX IF NOT EXISTS idx_submissions_created ON submissions (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_submissions_kind_created ON submissions (kind, created_at, id);
 """
 
+POOL_SIZE = 8
+POOL_TIMEOUT = 30.0
+STATEMENT_CACHE_SIZE = 128
 
-def init_db(path: str = './data.db'):
-    conn = sqlite3.connect(path)
-    c = conn.cursor()
-    c.executescript(SCHEMA)
-    conn.commit()
-    conn.close()
+WRITE_BEHIND_BATCH_SIZE = 50
+WRITE_BEHIND_FLUSH_MS = 200
+WRITE_BEHIND_MAX_QUEUE = 1000
+WRITE_BEHIND_PUT_TIMEOUT = 5.0
+WRITE_BEHIND_RETRY_BASE = 0.05      # Espera da 1ª nova tentativa (dobra a cada falha, até RETRY_MAX)
+WRITE_BEHIND_RETRY_MAX = 1.0
+WRITE_BEHIND_CLOSE_TIMEOUT = 10.0   # Espera máxima para gravar o resto da fila ao desligar
+DEAD_LETTER_SUFFIX = '.dead-letter.jsonl'  # Ao desligar com o banco fora do ar, o resto da fila vai para cá
 
+# Colunas tipadas extraídas do payload (migração 2), na ordem do INSERT
+SUBMISSION_COLUMNS = (
+    ('nome', 'TEXT', str),
+    ('idade', 'INTEGER', int),
+    ('investimento_tipo', 'TEXT', str),
+    ('poupanca_mensal', 'REAL', float),
+    ('tempo_anos', 'INTEGER', int),
+)
 
-def save_submission(path: str, kind: str, payload: dict):
-    conn = sqlite3.connect(path)
-    c = conn.cursor()
-    c.execute('INSERT INTO submissions (kind, payload) VALUES (?,?)', (kind, json.dumps(payload, ensure_ascii=False)))
-    conn.commit()
-    conn.close()
-
-
-def get_submissions(path: str):
-    conn = sqlite3.connect(path)
-    c = conn.cursor()
-    c.execute('SELECT id, kind, payload, created_at FROM submissions ORDER BY created_at DESC')
-    rows = c.fetchall()
-    conn.close()
-    out = []
-    for r in rows:
+INSERT_SUBMISSION = (
+    'INSERT INTO submissions (kind, payload, ' + ', '.join(c for c, _, _ in SUBMISSION_COLUMNS) + ') '
+    'VALUES (?,?' + ',?' * len(SUBMISSION_COLUMNS) + ')'
+)
+
+# Cada migração leva o banco da versão (índice + 1) para a seguinte; a versão fica em PRAGMA user_version
+MIGRATIONS = [
+    # 1: tabela base (SCHEMA)
+    SCHEMA,
+    # 2: colunas tipadas + índices para consultas de professores sem decodificar o JSON
+    ''.join(f'ALTER TABLE submissions ADD COLUMN {c} {t};\n' for c, t, _ in SUBMISSION_COLUMNS) + """
+    CREATE INDEX IF NOT EXISTS idx_submissions_nome ON submissions (nome);
+    CREATE INDEX IF NOT EXISTS idx_submissions_investimento ON submissions (investimento_tipo, created_at, id);
+    CREATE TABLE IF NOT EXISTS schema_meta (key TEXT PRIMARY KEY, value TEXT);
+    INSERT OR REPLACE INTO schema_meta (key, value)
+        SELECT 'backfill_v2_max_id', COALESCE(MAX(id), 0) FROM submissions;
+    INSERT OR REPLACE INTO schema_meta (key, value) VALUES ('backfill_v2_last_id', '0');
+    """,
+    # 3: tabelas de resumo para /api/analytics, mantidas por triggers a cada INSERT/UPDATE/DELETE
+    """
+    CREATE TABLE IF NOT EXISTS analytics_kind (kind TEXT PRIMARY KEY, n INTEGER NOT NULL);
+    CREATE TABLE IF NOT EXISTS analytics_investimento (investimento_tipo TEXT PRIMARY KEY, n INTEGER NOT NULL);
+    CREATE TABLE IF NOT EXISTS analytics_totals (metric TEXT PRIMARY KEY, n INTEGER NOT NULL, total REAL NOT NULL);
+    CREATE TABLE IF NOT EXISTS analytics_hourly (bucket TEXT PRIMARY KEY, n INTEGER NOT NULL);
+
+    INSERT INTO analytics_kind (kind, n)
+        SELECT COALESCE(kind, ''), COUNT(*) FROM submissions GROUP BY 1;
+    INSERT INTO analytics_investimento (investimento_tipo, n)
+        SELECT investimento_tipo, COUNT(*) FROM submissions WHERE investimento_tipo IS NOT NULL GROUP BY 1;
+    INSERT INTO analytics_totals (metric, n, total)
+        SELECT 'poupanca_mensal', COUNT(poupanca_mensal), COALESCE(SUM(poupanca_mensal), 0) FROM submissions;
+    INSERT INTO analytics_totals (metric, n, total)
+        SELECT 'tempo_anos', COUNT(tempo_anos), COALESCE(SUM(tempo_anos), 0) FROM submissions;
+    INSERT INTO analytics_hourly (bucket, n)
+        SELECT substr(created_at, 1, 13), COUNT(*) FROM submissions WHERE created_at IS NOT NULL GROUP BY 1;
+
+    CREATE TRIGGER IF NOT EXISTS trg_analytics_insert AFTER INSERT ON submissions
+    BEGIN
+        INSERT INTO analytics_kind (kind, n) VALUES (COALESCE(NEW.kind, ''), 1)
+            ON CONFLICT (kind) DO UPDATE SET n = n + 1;
+        INSERT INTO analytics_investimento (investimento_tipo, n)
+            SELECT NEW.investimento_tipo, 1 WHERE NEW.investimento_tipo IS NOT NULL
+            ON CONFLICT (investimento_tipo) DO UPDATE SET n = n + 1;
+        UPDATE analytics_totals SET n = n + 1, total = total + NEW.poupanca_mensal
+            WHERE metric = 'poupanca_mensal' AND NEW.poupanca_mensal IS NOT NULL;
+        UPDATE analytics_totals SET n = n + 1, total = total + NEW.tempo_anos
+            WHERE metric = 'tempo_anos' AND NEW.tempo_anos IS NOT NULL;
+        INSERT INTO analytics_hourly (bucket, n)
+            SELECT substr(NEW.created_at, 1, 13), 1 WHERE NEW.created_at IS NOT NULL
+            ON CONFLICT (bucket) DO UPDATE SET n = n + 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_analytics_update
+    AFTER UPDATE OF investimento_tipo, poupanca_mensal, tempo_anos ON submissions
+    BEGIN
+        UPDATE analytics_investimento SET n = n - 1 WHERE investimento_tipo = OLD.investimento_tipo;
+        INSERT INTO analytics_investimento (investimento_tipo, n)
+            SELECT NEW.investimento_tipo, 1 WHERE NEW.investimento_tipo IS NOT NULL
+            ON CONFLICT (investimento_tipo) DO UPDATE SET n = n + 1;
+        UPDATE analytics_totals SET n = n - 1, total = total - OLD.poupanca_mensal
+            WHERE metric = 'poupanca_mensal' AND OLD.poupanca_mensal IS NOT NULL;
+        UPDATE analytics_totals SET n = n + 1, total = total + NEW.poupanca_mensal
+            WHERE metric = 'poupanca_mensal' AND NEW.poupanca_mensal IS NOT NULL;
+        UPDATE analytics_totals SET n = n - 1, total = total - OLD.tempo_anos
+            WHERE metric = 'tempo_anos' AND OLD.tempo_anos IS NOT NULL;
+        UPDATE analytics_totals SET n = n + 1, total = total + NEW.tempo_anos
+            WHERE metric = 'tempo_anos' AND NEW.tempo_anos IS NOT NULL;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_analytics_delete AFTER DELETE ON submissions
+    BEGIN
+        UPDATE analytics_kind SET n = n - 1 WHERE kind = COALESCE(OLD.kind, '');
+        UPDATE analytics_investimento SET n = n - 1 WHERE investimento_tipo = OLD.investimento_tipo;
+        UPDATE analytics_totals SET n = n - 1, total = total - OLD.poupanca_mensal
+            WHERE metric = 'poupanca_mensal' AND OLD.poupanca_mensal IS NOT NULL;
+        UPDATE analytics_totals SET n = n - 1, total = total - OLD.tempo_anos
+            WHERE metric = 'tempo_anos' AND OLD.tempo_anos IS NOT NULL;
+        UPDATE analytics_hourly SET n = n - 1 WHERE bucket = substr(OLD.created_at, 1, 13);
+    END;
+    """,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+BACKFILL_CHUNK_SIZE = 500
+BACKFILL_PAUSE = 0.05
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 500
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class WriteQueueFull(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Pool limitado de conexões SQLite reaproveitadas entre requisições.
+
+    Cada conexão é aberta uma única vez em modo WAL com synchronous=NORMAL, e o
+    sqlite3 mantém o cache de statements preparados por conexão, então os
+    INSERT/SELECT repetidos não são recompilados. Pode ser usado a partir do
+    threadpool do FastAPI (check_same_thread=False; uma conexão por vez por thread).
+    """
+
+    def __init__(self, path: str, max_size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._acquired = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _get(self) -> sqlite3.Connection:
         try:
-            payload = json.loads(r[2])
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.max_size:
+                self._created += 1
+                create = True
+            else:
+                self._waits += 1
+                create = False
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        start = time.perf_counter()
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"nenhuma conexão livre em {self.timeout}s ({self.path})")
+        finally:
+            with self._lock:
+                self._wait_seconds += time.perf_counter() - start
+
+    @contextmanager
+    def connection(self):
+        if self._closed:
+            raise RuntimeError("pool fechado")
+        conn = self._get()
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+        try:
+            yield conn
         except Exception:
-            payload = r[2]
-        out.append({"id": r[0], "kind": r[1], "payload": payload, "created_at": r[3]})
-    return out
\ No newline at end of file
+            conn.rollback()
+            raise
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "path": self.path,
+                "max_size": self.max_size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "acquired_total": self._acquired,
+                "waits_total": self._waits,
+                "wait_seconds_total": self._wait_seconds,
+            }
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path: str) -> ConnectionPool:
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(path)
+            if pool is None:
+                pool = _pools[path] = ConnectionPool(path)
+    return pool
+
+
+def pool_metrics() -> list:
+    return [pool.metrics() for pool in list(_pools.values())]
+
+
+def close_pools():
+    disable_write_behind()
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+# Observadores do tempo de cada operação: hook(operação, segundos), ex.: métricas da API
+_timing_hooks = []
+
+
+def add_timing_hook(hook):
+    _timing_hooks.append(hook)
+
+
+def remove_timing_hook(hook):
+    if hook in _timing_hooks:
+        _timing_hooks.remove(hook)
+
+
+def _timed(operation: str):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _timing_hooks:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                for hook in list(_timing_hooks):
+                    hook(operation, elapsed)
+        return wrapper
+    return decorator
+
+
+class SubmissionWriter:
+    """Fila de gravação em segundo plano (write-behind) para as submissões.
+
+    As requisições só enfileiram a linha; uma thread grava tudo em uma única
+    transação a cada `batch_size` linhas ou `flush_ms` milissegundos. A fila é
+    limitada: quando enche, `submit` espera (backpressure) e, passado
+    `put_timeout`, levanta WriteQueueFull (a API responde 503) em vez de descartar dados.
+    Um lote que falha é tentado de novo, com espera crescente (até
+    WRITE_BEHIND_RETRY_MAX), enquanto o writer estiver aberto: com o banco fora do
+    ar a fila enche e os novos pedidos recebem 503, mas nada se perde.
+    `close()` grava o que ainda estiver na fila antes de parar, esperando no máximo
+    `timeout`; se o banco não voltar a tempo, as linhas restantes vão para o arquivo
+    <banco>.dead-letter.jsonl (uma submissão por linha, para regravar depois).
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str, batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+                 flush_ms: int = WRITE_BEHIND_FLUSH_MS, max_queue: int = WRITE_BEHIND_MAX_QUEUE,
+                 put_timeout: float = WRITE_BEHIND_PUT_TIMEOUT):
+        self.path = path
+        self.dead_letter_path = path + DEAD_LETTER_SUFFIX
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000.0
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._flushed = threading.Condition()
+        self._enqueued = 0
+        self._written = 0
+        self._batches = 0
+        self._errors = 0
+        self._dead_lettered = 0
+        self._closed = False
+        self._give_up = threading.Event()  # Ligado por close() quando o prazo acaba
+        self._thread = threading.Thread(target=self._run, name=f"submission-writer:{path}", daemon=True)
+        self._thread.start()
+
+    def submit(self, kind: str, payload: dict):
+        if self._closed:
+            raise RuntimeError("writer fechado")
+        row = _submission_row(kind, payload)
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            raise WriteQueueFull(f"fila de gravação cheia ({self._queue.maxsize} itens)")
+        with self._flushed:
+            self._enqueued += 1
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            item = self._queue.get()
+            if item is self._STOP:
+                stopping = True
+            else:
+                batch.append(item)
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            if stopping:
+                # Esvazia o que sobrou na fila antes de encerrar
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not self._STOP:
+                        batch.append(item)
+            if batch:
+                self._write(batch)
+
+    @_timed('write_behind_batch')
+    def _write(self, batch):
+        attempt = 0
+        while True:
+            try:
+                with get_pool(self.path).connection() as conn:
+                    conn.executemany(INSERT_SUBMISSION, batch)
+                    conn.commit()
+                break
+            except Exception as exc:
+                # Mantém o lote e tenta de novo: a fila limitada segura os produtores (503)
+                with self._flushed:
+                    self._errors += 1
+                if attempt == 0:
+                    logger.warning("write-behind: falha ao gravar %d submissões (%s), tentando de novo",
+                                   len(batch), self.path, exc_info=exc)
+                if self._give_up.wait(min(WRITE_BEHIND_RETRY_MAX, WRITE_BEHIND_RETRY_BASE * 2 ** attempt)):
+                    self._dead_letter(batch, exc)
+                    return
+                attempt += 1
+        with self._flushed:
+            self._written += len(batch)
+            self._batches += 1
+            self._flushed.notify_all()
+
+    def _dead_letter(self, batch, exc):
+        """Desligando com o banco fora do ar: guarda as linhas num arquivo em vez de perdê-las."""
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            for kind, payload, *_ in batch:
+                f.write(jsoncodec.dumps({"kind": kind, "payload": jsoncodec.loads(payload)}) + '\n')
+        logger.error("write-behind: %d submissões guardadas em %s (banco indisponível ao desligar)",
+                     len(batch), self.dead_letter_path, exc_info=exc)
+        with self._flushed:
+            self._dead_lettered += len(batch)
+            self._flushed.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Espera até tudo que já foi enfileirado estar gravado no banco (ou no dead-letter)."""
+        with self._flushed:
+            target = self._enqueued
+            return self._flushed.wait_for(lambda: self._written + self._dead_lettered >= target, timeout=timeout)
+
+    def close(self, timeout: float = WRITE_BEHIND_CLOSE_TIMEOUT):
+        if self._closed:
+            return
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+            stop_queued = True
+        except queue.Full:
+            stop_queued = False
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        if self._thread.is_alive():
+            # O banco não voltou a tempo: o que falta vai para o dead-letter em vez de ficar só na memória
+            self._give_up.set()
+            try:
+                if not stop_queued:
+                    self._queue.put(self._STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("write-behind: %d submissões ainda na fila ao desligar (%s)", self._queue.qsize(), self.path)
+
+    def metrics(self) -> dict:
+        with self._flushed:
+            return {
+                "path": self.path,
+                "queued": self._queue.qsize(),
+                "max_queue": self._queue.maxsize,
+                "enqueued_total": self._enqueued,
+                "written_total": self._written,
+                "batches_total": self._batches,
+                "errors_total": self._errors,
+                "dead_letter_total": self._dead_lettered,
+            }
+
+
+_writers = {}
+
+
+def enable_write_behind(path: str, **options) -> SubmissionWriter:
+    with _pools_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = SubmissionWriter(path, **options)
+    return writer
+
+
+def disable_write_behind(path: str = None, timeout: float = WRITE_BEHIND_CLOSE_TIMEOUT):
+    with _pools_lock:
+        paths = [path] if path is not None else list(_writers)
+        writers = [_writers.pop(p) for p in paths if p in _writers]
+    for writer in writers:
+        writer.close(timeout)
+
+
+def writer_metrics() -> list:
+    return [writer.metrics() for writer in list(_writers.values())]
+
+
+def _submission_row(kind: str, payload: dict) -> tuple:
+    values = []
+    for column, _, cast in SUBMISSION_COLUMNS:
+        value = payload.get(column) if isinstance(payload, dict) else None
+        try:
+            values.append(cast(value) if value is not None else None)
+        except (TypeError, ValueError):
+            values.append(None)
+    return (kind, jsoncodec.dumps(payload), *values)
+
+
+def _statements(script: str):
+    """Divide um script SQL em comandos (os BEGIN ... END dos triggers ficam inteiros)."""
+    statement = ''
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            yield statement
+            statement = ''
+    if statement.strip():
+        yield statement
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Aplica as migrações pendentes, cada uma na sua transação BEGIN IMMEDIATE.
+
+    Vários workers podem subir juntos no mesmo banco: a trava de escrita vem antes
+    de reler a versão, então só um aplica cada passo e os outros o pulam.
+    (Bancos antigos, sem versão, passam pela 1: o SCHEMA só usa IF NOT EXISTS.)
+    """
+    start = conn.execute('PRAGMA user_version').fetchone()[0]
+    for number in range(start + 1, SCHEMA_VERSION + 1):
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute('PRAGMA user_version').fetchone()[0] < number:
+                # executescript faria COMMIT antes de começar: um comando por vez, dentro da transação
+                for statement in _statements(MIGRATIONS[number - 1]):
+                    conn.execute(statement)
+                conn.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return SCHEMA_VERSION
+
+
+def init_db(path: str = './data.db'):
+    with get_pool(path).connection() as conn:
+        if conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION:
+            return  # Banco já atualizado: só uma leitura de PRAGMA (caso comum ao reiniciar um worker)
+        migrate(conn)
+
+
+def backfill_submission_columns(path: str, chunk_size: int = BACKFILL_CHUNK_SIZE, pause: float = BACKFILL_PAUSE) -> int:
+    """Preenche as colunas tipadas das linhas antigas, um pedaço por transação.
+
+    Cada pedaço é uma transação curta (o WAL deixa as leituras seguirem) e há uma
+    pausa entre pedaços para os INSERTs da API passarem na frente. O progresso fica
+    em schema_meta, então o job pode ser interrompido e retomado. Retorna quantas
+    linhas foram processadas nesta execução.
+    """
+    columns = ', '.join(
+        f"{c} = CAST(json_extract(payload, '$.{c}') AS {t})" for c, t, _ in SUBMISSION_COLUMNS
+    )
+    pool = get_pool(path)
+    with pool.connection() as conn:
+        meta = dict(conn.execute(
+            "SELECT key, value FROM schema_meta WHERE key LIKE 'backfill_v2_%'").fetchall())
+    last_id, max_id = int(meta.get('backfill_v2_last_id', 0)), int(meta.get('backfill_v2_max_id', 0))
+    done = 0
+    while last_id < max_id and not pool._closed:
+        upper = min(last_id + chunk_size, max_id)
+        with pool.connection() as conn:
+            cur = conn.execute(
+                f'UPDATE submissions SET {columns} WHERE id > ? AND id <= ? AND json_valid(payload)',
+                (last_id, upper))
+            conn.execute("UPDATE schema_meta SET value = ? WHERE key = 'backfill_v2_last_id'", (str(upper),))
+            conn.commit()
+        done += cur.rowcount
+        last_id = upper
+        if pause:
+            time.sleep(pause)
+    return done
+
+
+def start_backfill(path: str, **options) -> threading.Thread:
+    thread = threading.Thread(
+        target=backfill_submission_columns, args=(path,), kwargs=options,
+        name=f"submission-backfill:{path}", daemon=True)
+    thread.start()
+    return thread
+
+
+@_timed('save_submission')
+def save_submission(path: str, kind: str, payload: dict):
+    writer = _writers.get(path)
+    if writer is not None:
+        writer.submit(kind, payload)
+        return
+    with get_pool(path).connection() as conn:
+        conn.execute(INSERT_SUBMISSION, _submission_row(kind, payload))
+        conn.commit()
+
+
+@_timed('save_submissions')
+def save_submissions(path: str, kind: str, payloads: list):
+    """Grava várias submissões numa única transação (um único commit/fsync)."""
+    writer = _writers.get(path)
+    if writer is not None:
+        for payload in payloads:
+            writer.submit(kind, payload)
+        return
+    rows = [_submission_row(kind, payload) for payload in payloads]
+    with get_pool(path).connection() as conn:
+        conn.executemany(INSERT_SUBMISSION, rows)
+        conn.commit()
+
+
+@_timed('get_analytics')
+def get_analytics(path: str) -> dict:
+    """Estatísticas da turma lidas das tabelas de resumo (custo independe do tamanho de submissions)."""
+    with get_pool(path).connection() as conn:
+        by_kind = dict(conn.execute('SELECT kind, n FROM analytics_kind WHERE n > 0 ORDER BY kind').fetchall())
+        by_investimento = dict(conn.execute(
+            'SELECT investimento_tipo, n FROM analytics_investimento WHERE n > 0 ORDER BY investimento_tipo').fetchall())
+        totals = {metric: (n, total) for metric, n, total in conn.execute(
+            'SELECT metric, n, total FROM analytics_totals').fetchall()}
+        by_day = dict(conn.execute(
+            'SELECT substr(bucket, 1, 10), SUM(n) FROM analytics_hourly GROUP BY 1 HAVING SUM(n) > 0 ORDER BY 1'
+        ).fetchall())
+        by_hour = dict(conn.execute(
+            'SELECT substr(bucket, 12, 2), SUM(n) FROM analytics_hourly GROUP BY 1 HAVING SUM(n) > 0 ORDER BY 1'
+        ).fetchall())
+
+    def average(metric):
+        n, total = totals.get(metric, (0, 0.0))
+        return round(total / n, 2) if n else None
+
+    return {
+        "total": sum(by_kind.values()),
+        "by_kind": by_kind,
+        "by_investimento_tipo": by_investimento,
+        "avg_poupanca_mensal": average('poupanca_mensal'),
+        "avg_tempo_anos": average('tempo_anos'),
+        "by_day": by_day,
+        "by_hour": by_hour,
+    }
+
+
+def encode_cursor(created_at: str, row_id: int) -> str:
+    raw = f"{created_at}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit('|', 1)
+        return created_at, int(row_id)
+    except Exception:
+        raise ValueError(f"cursor inválido: {cursor!r}")
+
+
+def _submission_query(kind: str = None, since: str = None, until: str = None, after=None,
+                      nome: str = None, investimento_tipo: str = None):
+    # `since` é inclusivo e `until` exclusivo, no formato de created_at ('YYYY-MM-DD HH:MM:SS')
+    where, params = [], []
+    for column, value in (('kind', kind), ('nome', nome), ('investimento_tipo', investimento_tipo)):
+        if value is not None:
+            where.append(f'{column} = ?')
+            params.append(value)
+    if since is not None:
+        where.append('created_at >= ?')
+        params.append(since)
+    if until is not None:
+        where.append('created_at < ?')
+        params.append(until)
+    if after is not None:
+        where.append('(created_at, id) < (?, ?)')
+        params.extend(after)
+    sql = 'SELECT id, kind, payload, created_at FROM submissions'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += ' ORDER BY created_at DESC, id DESC'
+    return sql, params
+
+
+def _row_to_dict(r):
+    try:
+        payload = jsoncodec.loads(r[2])
+    except Exception:
+        payload = r[2]
+    return {"id": r[0], "kind": r[1], "payload": payload, "created_at": r[3]}
+
+
+@_timed('get_submissions')
+def get_submissions(path: str, kind: str = None, since: str = None, until: str = None, **filters):
+    sql, params = _submission_query(kind, since, until, **filters)
+    with get_pool(path).connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [_row_to_dict(r) for r in rows]
+
+
+@_timed('get_submissions_page')
+def get_submissions_page(path: str, limit: int = PAGE_SIZE, cursor: str = None,
+                         kind: str = None, since: str = None, until: str = None, **filters) -> dict:
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after = decode_cursor(cursor) if cursor else None
+    sql, params = _submission_query(kind, since, until, after, **filters)
+    with get_pool(path).connection() as conn:
+        rows = conn.execute(sql + ' LIMIT ?', params + [limit + 1]).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1][3], rows[-1][0]) if has_more else None
+    return {"data": [_row_to_dict(r) for r in rows], "next_cursor": next_cursor}
+
+
+def _read_only_connection(path: str) -> sqlite3.Connection:
+    """Conexão só de leitura, fora do pool: uma exportação lenta não prende as POOL_SIZE conexões da API."""
+    return sqlite3.connect(f'file:{quote(os.path.abspath(path))}?mode=ro', uri=True,
+                           timeout=POOL_TIMEOUT, check_same_thread=False)
+
+
+def iter_submission_batches(path: str, kind: str = None, since: str = None, until: str = None,
+                            chunk_size: int = STREAM_CHUNK_SIZE, **filters):
+    """Submissões em listas de até `chunk_size` (uma por fetchmany).
+
+    Usa uma conexão própria (só leitura), aberta na primeira leitura e fechada assim
+    que a leitura termina ou o gerador é fechado (close()); quem para no meio deve
+    fechar o gerador em vez de esperar o coletor de lixo.
+    """
+    sql, params = _submission_query(kind, since, until, **filters)
+    conn = _read_only_connection(path)
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [_row_to_dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def iter_submissions(path: str, kind: str = None, since: str = None, until: str = None,
+                     chunk_size: int = STREAM_CHUNK_SIZE, **filters):
+    batches = iter_submission_batches(path, kind, since, until, chunk_size, **filters)
+    try:
+        for batch in batches:
+            yield from batch
+    finally:
+        batches.close()
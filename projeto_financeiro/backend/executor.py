@@ -0,0 +1,124 @@
+# backend/executor.py
+"""
+Pool de processos para os cálculos pesados da API (Monte Carlo).
+
+As rotas async mandam a conta para processos separados, então o GIL de uma
+simulação longa não trava as rotas baratas (glossário, dicas...). A fila é
+limitada: com o pool lotado, `run` levanta PoolSaturated na hora e a API
+responde 503 + Retry-After, em vez de acumular latência sem limite.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+COMPUTE_WORKERS = int(os.environ.get("COMPUTE_WORKERS", str(min(4, os.cpu_count() or 1))))
+COMPUTE_MAX_PENDING = int(os.environ.get("COMPUTE_MAX_PENDING", "40"))  # Uma turma (~30-40 alunos) clicando junto
+COMPUTE_RETRY_AFTER = int(os.environ.get("COMPUTE_RETRY_AFTER", "2"))
+
+# Quando a requisição está sendo perfilada (profiling.py), recebe (nome, segundos, estatísticas do cProfile)
+# de cada tarefa, medidas dentro do processo de cálculo
+compute_profiles = contextvars.ContextVar("compute_profiles", default=None)
+
+
+class PoolSaturated(Exception):
+    def __init__(self, pending: int, retry_after: int = COMPUTE_RETRY_AFTER):
+        super().__init__(f"servidor ocupado: {pending} cálculos na fila, tente novamente em {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _timed_call(fn, args, kwargs, profile=False):
+    # Roda no processo de cálculo: devolve também quanto a função levou lá dentro (e o cProfile, se pedido)
+    if profile:
+        import cProfile  # Só quando a requisição está sendo perfilada
+    profiler = cProfile.Profile() if profile else None
+    start = time.perf_counter()
+    result = profiler.runcall(fn, *args, **kwargs) if profiler else fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    if profiler is None:
+        return result, elapsed, None
+    profiler.create_stats()
+    return result, elapsed, profiler.stats
+
+
+class ComputePool:
+    """ProcessPoolExecutor criado sob demanda, com limite de tarefas pendentes.
+
+    workers=0 roda as tarefas numa thread do próprio processo (útil em testes
+    e em máquinas onde criar processos é caro).
+
+    Com algum hook registrado (`add_timing_hook`), cada tarefa concluída chama
+    hook(nome_da_função, segundos_na_fila, segundos_calculando); a "fila" inclui
+    a espera por um processo livre e o envio dos argumentos/resultado.
+    """
+
+    def __init__(self, workers: int = COMPUTE_WORKERS, max_pending: int = COMPUTE_MAX_PENDING,
+                 retry_after: int = COMPUTE_RETRY_AFTER):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timing_hooks = []
+
+    def add_timing_hook(self, hook):
+        self._timing_hooks.append(hook)
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.workers > 0:
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="compute")
+        return self._executor
+
+    async def run(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PoolSaturated(self._pending, self.retry_after)
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            profiles = compute_profiles.get()
+            if not self._timing_hooks and profiles is None:
+                return await loop.run_in_executor(self._get_executor(), partial(fn, *args, **kwargs))
+            submitted = time.perf_counter()
+            result, run_s, stats = await loop.run_in_executor(
+                self._get_executor(), partial(_timed_call, fn, args, kwargs, profiles is not None))
+            queued_s = max(0.0, time.perf_counter() - submitted - run_s)
+            name = getattr(fn, "__name__", type(fn).__name__)
+            for hook in self._timing_hooks:
+                hook(name, queued_s, run_s)
+            if profiles is not None:
+                profiles.append((name, run_s, stats))
+            return result
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed_total": self._completed,
+                "rejected_total": self._rejected,
+                "started": self._executor is not None,
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,79 @@
+# backend/jsoncodec.py
+"""
+Serialização JSON usada pela API (respostas) e pelo banco (payload das submissões).
+
+Por padrão usa o `json` da biblioteca padrão. Com FAST_JSON=1 e o pacote
+`orjson` instalado, usa o orjson (bem mais rápido). Os dois caminhos geram o
+mesmo JSON, byte a byte: UTF-8 sem escapar acentos, compacto (sem espaços) e
+NaN/Infinito como null (o que o orjson faz; JSON não tem esses valores).
+
+FastJSONResponse serve como resposta padrão do FastAPI; as rotas quentes
+devolvem json_response(...) direto, o que pula também o jsonable_encoder
+(só vale para conteúdo que já é dict/list/str/número/None).
+"""
+import json
+import math
+import os
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # Opcional: pip install orjson
+except ImportError:
+    orjson = None
+
+FAST_JSON = os.environ.get("FAST_JSON", "0") == "1"
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson is not None else 0
+
+
+def fast_enabled() -> bool:
+    return FAST_JSON and orjson is not None
+
+
+def _finite(obj):
+    """Cópia com NaN/Infinito trocados por None (só usada quando o json recusa o objeto)."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _stdlib_dumps(obj) -> str:
+    try:
+        return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    except ValueError:  # Tem NaN/Infinito: raro, então só aqui percorre o objeto
+        return json.dumps(_finite(obj), ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def dumps(obj) -> str:
+    """Texto JSON (para o banco e para linhas NDJSON/SSE)."""
+    if fast_enabled():
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode("utf-8")
+    return _stdlib_dumps(obj)
+
+
+def dumps_bytes(obj) -> bytes:
+    """Corpo de resposta compacto, no mesmo formato do JSONResponse do FastAPI."""
+    if fast_enabled():
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+    return _stdlib_dumps(obj).encode("utf-8")
+
+
+def loads(data):
+    if fast_enabled():
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps_bytes(content)
+
+
+def json_response(content, status_code: int = 200, headers: dict = None) -> FastJSONResponse:
+    """Resposta pronta: o FastAPI não passa o conteúdo pelo jsonable_encoder."""
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
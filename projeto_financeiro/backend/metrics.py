@@ -0,0 +1,339 @@
+# backend/metrics.py
+"""
+Métricas da API no formato de texto do Prometheus (GET /metrics).
+
+Sem dependências extras: contadores, gauges e histogramas com rótulos ficam na
+memória do processo (com vários workers do uvicorn, cada processo tem os seus).
+O que já é contado em outros módulos (caches, pool de conexões, fila de
+gravação, pool de cálculo) entra por coletores, lidos só na hora do scrape.
+
+- MetricsMiddleware: requisições por rota/status, latência e requisições em andamento
+- timed(histograma, rótulos): mede um trecho de código
+- cache_collector / db_collector / compute_collector: estatísticas já existentes
+
+Uso com um scraper local:
+    curl http://localhost:8000/metrics
+"""
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from starlette.routing import Match, Mount
+
+import db
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos: de 1 ms (rotas de conteúdo) a 10 s (Monte Carlo grande)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ROUTE_CACHE_SIZE = 1024
+UNMATCHED_ROUTE = "<sem rota>"  # Rótulo único para caminhos desconhecidos (não explode a cardinalidade)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _check(self, labels: tuple) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} espera os rótulos {self.labelnames}, recebeu {labels!r}")
+        return labels
+
+    def value(self, labels: tuple = ()):
+        with self._lock:
+            return self._values.get(tuple(labels), 0)
+
+    def samples(self):
+        """(sufixo, pares de rótulos, valor) de cada série."""
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield "", list(zip(self.labelnames, labels)), value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        labels = self._check(tuple(labels))
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: tuple = ()):
+        labels = self._check(tuple(labels))
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: tuple = ()):
+        labels = self._check(tuple(labels))
+        index = bisect_left(self.buckets, value)  # Limites inclusivos (le = "menor ou igual")
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def value(self, labels: tuple = ()):
+        """(contagem, soma) da série."""
+        with self._lock:
+            series = self._values.get(tuple(labels))
+            return (sum(series[0]), series[1]) if series else (0, 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        for labels, (counts, total) in items:
+            pairs = list(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                yield "_bucket", pairs + [("le", _format_value(float(bound)))], cumulative
+            yield "_sum", pairs, total
+            yield "_count", pairs, cumulative
+
+
+class Registry:
+    """Conjunto de métricas e coletores de um processo, renderizados em texto."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def _add(self, metric):
+        # Mesmo nome => mesma métrica (ex.: o middleware recriado junto com a pilha do app)
+        for existing in self._metrics:
+            if existing.name == metric.name:
+                if existing.kind != metric.kind or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"métrica {metric.name} já registrada com outro tipo/rótulos")
+                return existing
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collect):
+        """`collect()` devolve [(nome, tipo, ajuda, [(rótulos: dict, valor), ...]), ...] na hora do scrape."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, pairs, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(pairs)} {_format_value(value)}")
+        for collect in self._collectors:
+            try:
+                families = list(collect())
+            except Exception:
+                continue  # Um coletor com problema não derruba o scrape inteiro
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels.items()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+@contextmanager
+def timed(histogram: Histogram, labels: tuple = ()):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, labels)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: conta as requisições por método/rota/status e mede a latência.
+
+    O rótulo `route` é o caminho declarado na rota (ex.: /api/calculate_goal),
+    nunca a URL crua; arquivos do frontend ficam todos em "/{path}". A latência
+    vai até o último pedaço do corpo, então inclui streaming e compressão.
+    """
+
+    def __init__(self, app, registry: Registry = REGISTRY):
+        self.app = app
+        self.requests = registry.counter(
+            "http_requests_total", "Requisições HTTP atendidas", ("method", "route", "status"))
+        self.duration = registry.histogram(
+            "http_request_duration_seconds", "Tempo total de resposta das requisições HTTP", ("method", "route"))
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight", "Requisições HTTP em andamento", ("method", "route"))
+        self._routes = {}
+
+    def _route_label(self, scope) -> str:
+        key = (scope["method"], scope["path"])
+        label = self._routes.get(key)
+        if label is not None:
+            return label
+        label, partial = UNMATCHED_ROUTE, None
+        router = getattr(scope.get("app"), "router", None)
+        for route in getattr(router, "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                label = route.path + "/{path}" if isinstance(route, Mount) else route.path
+                break
+            if match == Match.PARTIAL and partial is None:
+                partial = route.path  # Caminho certo, método errado (405)
+        else:
+            if partial is not None:
+                label = partial
+        if len(self._routes) < ROUTE_CACHE_SIZE:
+            self._routes[key] = label
+        return label
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        labels = (method, self._route_label(scope))
+        status = 500  # Se a aplicação falhar antes de responder
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight.inc(labels)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.duration.observe(time.perf_counter() - start, labels)
+            self.in_flight.dec(labels)
+            self.requests.inc((*labels, str(status)))
+
+
+# ---------------------------------------------------------------------------
+# Coletores das estatísticas que os outros módulos já mantêm
+# ---------------------------------------------------------------------------
+
+def cache_collector(caches):
+    """Acertos, falhas, tamanho e remoções de cada ResultCache (memória e disco)."""
+    def collect():
+        hits, misses, sizes, evictions = [], [], [], []
+        for cache in caches:
+            stats = cache.stats()
+            for layer in ("memory", "disk"):
+                if layer not in stats:
+                    continue
+                labels = {"cache": cache.name, "layer": layer}
+                hits.append((labels, stats[layer]["hits"]))
+                misses.append((labels, stats[layer]["misses"]))
+                sizes.append((labels, stats[layer]["size"]))
+                if "evictions" in stats[layer]:
+                    evictions.append((labels, stats[layer]["evictions"]))
+        return [
+            ("result_cache_hits_total", "counter", "Acertos do cache de resultados", hits),
+            ("result_cache_misses_total", "counter", "Falhas do cache de resultados", misses),
+            ("result_cache_size", "gauge", "Entradas guardadas no cache de resultados", sizes),
+            ("result_cache_evictions_total", "counter", "Entradas removidas do cache em memória (LRU)", evictions),
+        ]
+    return collect
+
+
+def db_collector():
+    """Pools de conexões SQLite e filas de gravação (write-behind) abertos neste processo."""
+    def collect():
+        pools, writers = db.pool_metrics(), db.writer_metrics()
+        families = [
+            ("db_pool_connections", "gauge", "Conexões SQLite do pool por estado",
+             [({"path": p["path"], "state": state}, p[state]) for p in pools for state in ("in_use", "idle")]),
+            ("db_pool_max_size", "gauge", "Tamanho máximo do pool de conexões",
+             [({"path": p["path"]}, p["max_size"]) for p in pools]),
+            ("db_pool_acquired_total", "counter", "Conexões entregues pelo pool",
+             [({"path": p["path"]}, p["acquired_total"]) for p in pools]),
+            ("db_pool_waits_total", "counter", "Vezes em que foi preciso esperar por uma conexão livre",
+             [({"path": p["path"]}, p["waits_total"]) for p in pools]),
+            ("db_pool_wait_seconds_total", "counter", "Tempo total esperando por uma conexão livre",
+             [({"path": p["path"]}, p["wait_seconds_total"]) for p in pools]),
+        ]
+        for key, kind, help in (
+            ("queued", "gauge", "Linhas na fila de gravação"),
+            ("enqueued_total", "counter", "Linhas enfileiradas para gravação"),
+            ("written_total", "counter", "Linhas gravadas pela fila"),
+            ("batches_total", "counter", "Transações (lotes) gravadas pela fila"),
+            ("errors_total", "counter", "Falhas ao gravar um lote (o lote é tentado de novo)"),
+            ("dead_letter_total", "counter", "Linhas guardadas no arquivo dead-letter (banco fora do ar ao desligar)"),
+        ):
+            families.append((f"write_behind_{key}", kind, help, [({"path": w["path"]}, w[key]) for w in writers]))
+        return families
+    return collect
+
+
+def compute_collector(pool):
+    """Ocupação do pool de processos de cálculo."""
+    def collect():
+        stats = pool.metrics()
+        return [
+            ("compute_pool_workers", "gauge", "Processos de cálculo (0 = thread no próprio processo)",
+             [({}, stats["workers"])]),
+            ("compute_pool_pending", "gauge", "Cálculos em andamento ou na fila", [({}, stats["pending"])]),
+            ("compute_pool_max_pending", "gauge", "Limite de cálculos pendentes antes do 503",
+             [({}, stats["max_pending"])]),
+            ("compute_pool_completed_total", "counter", "Cálculos concluídos", [({}, stats["completed_total"])]),
+            ("compute_pool_rejected_total", "counter", "Cálculos recusados com o pool lotado",
+             [({}, stats["rejected_total"])]),
+        ]
+    return collect
@@ -0,0 +1,318 @@
+# backend/profiling.py
+"""
+Perfilamento opcional das requisições lentas (PROFILE=1).
+
+Desligado por padrão. Ligado, cada requisição é acompanhada por:
+
+- um amostrador estatístico: a cada PROFILE_INTERVAL_MS uma thread anota a pilha
+  de todas as threads do processo (loop async, threadpool do FastAPI, fila de
+  gravação), no formato "folded" dos flame graphs;
+- o cProfile dentro do processo de cálculo, para cada tarefa do ComputePool
+  (é lá que roda o Monte Carlo).
+
+Só é guardado o perfil das requisições que passaram de PROFILE_SLOW_MS ou que
+vieram com o cabeçalho X-Debug-Profile (que também devolve X-Profile-Id). As
+amostras são do processo inteiro: requisições simultâneas aparecem juntas.
+
+Os perfis ficam em PROFILE_DIR, num buffer circular de PROFILE_MAX_FILES
+arquivos (os mais antigos são apagados):
+    <id>.json   resumo, pilhas amostradas e as funções mais caras do cálculo
+    <id>.prof   estatísticas do cProfile (python -m pstats <id>.prof, snakeviz...)
+
+Rotas de administração (com PROFILE_TOKEN definido, exigem o cabeçalho X-Profile-Token):
+    GET /admin/profiles                       lista os perfis guardados
+    GET /admin/profiles/<id>                  baixa o JSON
+    GET /admin/profiles/<id>?format=folded    pilhas para flamegraph.pl / speedscope
+    GET /admin/profiles/<id>?format=pstats    arquivo .prof
+
+Exemplo:
+    PROFILE=1 PROFILE_SLOW_MS=500 python app.py
+    curl -H "X-Debug-Profile: 1" -X POST localhost:8000/api/simulate_montecarlo -d @form.json
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from starlette.concurrency import run_in_threadpool
+
+from executor import compute_profiles
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PROFILE = os.environ.get("PROFILE", "0") == "1"
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "1000"))  # 0 = só com o cabeçalho
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR") or os.path.join(BASE_DIR, "profiles")
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", "50"))
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_HEADER = "x-debug-profile"
+
+MAX_STACK_DEPTH = 128
+MAX_STACKS = 500      # Pilhas distintas guardadas no JSON (as mais frequentes)
+TOP_FUNCTIONS = 50    # Funções do cProfile resumidas no JSON
+
+# Pilhas que terminam aqui são threads paradas esperando trabalho: não entram nas amostras
+IDLE_FRAMES = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get")}
+
+PROFILE_ID = re.compile(r"^\d{13}-\d+-\d+$")
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Session:
+    def __init__(self):
+        self.stacks = Counter()
+        self.samples = 0
+        self.compute = []  # (função, segundos, estatísticas do cProfile) de cada tarefa do ComputePool
+
+
+class StackSampler:
+    """Thread que amostra as pilhas enquanto houver alguma sessão aberta (e para sozinha depois)."""
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000.0
+        self._sessions = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self) -> _Session:
+        session = _Session()
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+        return session
+
+    def stop(self, session: _Session):
+        with self._lock:
+            self._sessions.discard(session)
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            stacks = self.sample(exclude=own)
+            with self._lock:  # Sessão encerrada (stop) não recebe mais amostras
+                if not self._sessions:
+                    self._thread = None
+                    return
+                for session in self._sessions:
+                    session.stacks.update(stacks)
+                    session.samples += 1
+            time.sleep(self.interval)
+
+    @staticmethod
+    def sample(exclude: int = None) -> list:
+        """Pilha "folded" (raiz;...;folha) de cada thread ocupada neste instante."""
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == exclude:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                continue
+            names = []
+            while frame is not None and len(names) < MAX_STACK_DEPTH:
+                names.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            stacks.append(";".join(reversed(names)))
+        return stacks
+
+
+class _StatsHolder:
+    # pstats.Stats aceita qualquer objeto com create_stats() e .stats (como um cProfile.Profile)
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def merge_compute_stats(compute):
+    """Junta o cProfile de todas as tarefas de cálculo da requisição em um pstats.Stats (None se não houve nenhuma)."""
+    import pstats  # Só com PROFILE=1: fica fora do startup
+    merged = None
+    for _, _, stats in compute:
+        if merged is None:
+            merged = pstats.Stats(_StatsHolder(stats))
+        else:
+            merged.add(_StatsHolder(stats))
+    return merged
+
+
+def top_functions(stats, limit: int = TOP_FUNCTIONS) -> list:
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {"function": f"{func} ({os.path.basename(filename)}:{line})", "ncalls": nc,
+         "tottime_s": round(tt, 6), "cumtime_s": round(ct, 6)}
+        for (filename, line, func), (cc, nc, tt, ct, callers) in rows
+    ]
+
+
+class ProfileStore:
+    """Buffer circular de perfis em disco: guarda no máximo `max_files` (apaga os mais antigos)."""
+
+    def __init__(self, directory: str = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def new_id(self) -> str:
+        # Milissegundos com largura fixa: a ordem alfabética é a ordem de criação (pid evita colisão entre workers)
+        with self._lock:
+            self._seq += 1
+            return f"{int(time.time() * 1000):013d}-{os.getpid()}-{self._seq}"
+
+    def path(self, profile_id: str, ext: str = ".json") -> str:
+        if not PROFILE_ID.match(profile_id):
+            raise ValueError(f"id de perfil inválido: {profile_id!r}")
+        return os.path.join(self.directory, profile_id + ext)
+
+    def save(self, profile: dict, stats=None):
+        os.makedirs(self.directory, exist_ok=True)
+        if stats is not None:
+            stats.dump_stats(self.path(profile["id"], ".prof"))
+        target = self.path(profile["id"])
+        with open(target + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(profile, f, ensure_ascii=False)
+        os.replace(target + ".tmp", target)  # Quem lista nunca vê um JSON pela metade
+        self.prune()
+
+    def ids(self) -> list:
+        """Ids guardados, do mais novo para o mais antigo."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted((n[:-5] for n in names if n.endswith(".json") and PROFILE_ID.match(n[:-5])), reverse=True)
+
+    def prune(self):
+        with self._lock:
+            for profile_id in self.ids()[self.max_files:]:
+                for ext in (".json", ".prof"):
+                    try:
+                        os.remove(self.path(profile_id, ext))
+                    except FileNotFoundError:
+                        pass
+
+    def load(self, profile_id: str) -> dict:
+        with open(self.path(profile_id), encoding="utf-8") as f:
+            return json.load(f)
+
+    def list(self) -> list:
+        out = []
+        for profile_id in self.ids():
+            try:
+                profile = self.load(profile_id)
+            except (FileNotFoundError, ValueError):
+                continue  # Apagado pelo buffer circular enquanto listávamos
+            summary = {k: v for k, v in profile.items() if k not in ("sampler", "compute")}
+            summary["samples"] = profile["sampler"]["samples"]
+            summary["pstats"] = os.path.exists(self.path(profile_id, ".prof"))
+            out.append(summary)
+        return out
+
+
+def folded(profile: dict) -> str:
+    """Pilhas no formato "raiz;...;folha contagem" (flamegraph.pl, speedscope, inferno)."""
+    return "".join(f"{stack} {count}\n" for stack, count in profile["sampler"]["stacks"])
+
+
+class RequestProfiler:
+    """Configuração do perfilamento; `enabled` pode ser trocado em tempo de execução."""
+
+    def __init__(self, enabled: bool = PROFILE, slow_ms: float = PROFILE_SLOW_MS,
+                 interval_ms: float = PROFILE_INTERVAL_MS, store: ProfileStore = None, token: str = PROFILE_TOKEN):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.token = token
+        self.sampler = StackSampler(interval_ms)
+        self.store = store or ProfileStore()
+
+    def requested(self, headers: dict) -> bool:
+        value = headers.get(PROFILE_HEADER)
+        if not value:
+            return False
+        return value == self.token if self.token else True
+
+    def authorized(self, token: str) -> bool:
+        return not self.token or token == self.token
+
+    def build(self, profile_id: str, scope, status: int, duration_s: float, reason: str, session: _Session):
+        stats = merge_compute_stats(session.compute)
+        profile = {
+            "id": profile_id,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": status,
+            "duration_ms": round(duration_s * 1000, 3),
+            "reason": reason,
+            "pid": os.getpid(),
+            "sampler": {
+                "interval_ms": self.sampler.interval * 1000,
+                "samples": session.samples,
+                "stacks": session.stacks.most_common(MAX_STACKS),
+            },
+            "compute": {
+                "tasks": [{"function": name, "run_ms": round(run_s * 1000, 3)} for name, run_s, _ in session.compute],
+                "top": top_functions(stats) if stats is not None else [],
+            },
+        }
+        return profile, stats
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI que perfila as requisições quando `profiler.enabled` (ver docstring do módulo)."""
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler
+        if scope["type"] != "http" or not profiler.enabled or scope["path"].startswith("/admin/profiles"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        forced = profiler.requested(headers)
+        if not forced and profiler.slow_ms <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = profiler.store.new_id()
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if forced:
+                    message = {**message, "headers": [*message.get("headers", []),
+                                                      (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        session = profiler.sampler.start()
+        token = compute_profiles.set(session.compute)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration = time.perf_counter() - start
+            compute_profiles.reset(token)
+            profiler.sampler.stop(session)
+            slow = profiler.slow_ms > 0 and duration * 1000 >= profiler.slow_ms
+            if forced or slow:
+                profile, stats = profiler.build(profile_id, scope, status, duration,
+                                                "header" if forced else "slow", session)
+                await run_in_threadpool(profiler.store.save, profile, stats)
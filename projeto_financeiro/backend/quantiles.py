@@ -0,0 +1,101 @@
+# backend/quantiles.py
+"""
+Percentis aproximados em memória fixa (sketch "merge & reduce" de Munro-Paterson).
+
+Serve para o Monte Carlo com milhões de cenários: os saldos finais chegam em
+pedaços (chunks) de tamanho fixo `chunk_size`, e em vez de guardar todos eles,
+cada pedaço vira `k` pontos ordenados com o mesmo peso. Dois resumos do mesmo
+nível são fundidos e reduzidos de volta a `k` pontos (um sim, um não), com o
+dobro do peso, como num contador binário.
+
+Garantia de erro: o posto (rank) devolvido para qualquer quantil fica a no
+máximo 2·n/k posições do posto exato, ou seja, erro relativo de posto ≤ 2/k
+(com k = 2048, no máximo 0,1% dos cenários). A memória é O(k · log(n / chunk_size))
+mais um pedaço incompleto guardado sem resumo.
+
+Os sketches são combináveis (`merge`), então cada processo pode resumir os seus
+pedaços e o processo principal só junta os resumos.
+"""
+import numpy as np
+
+SKETCH_K = 2048
+
+
+class QuantileSketch:
+
+    def __init__(self, k: int = SKETCH_K, chunk_size: int = None):
+        self.k = k
+        self.chunk_size = chunk_size
+        self.levels = []              # levels[i]: k valores ordenados com peso (chunk_size / k) · 2**i, ou None
+        self.partial = np.zeros(0)    # valores exatos (peso 1) de pedaços que não tinham chunk_size
+        self.count = 0
+        self.total = 0.0
+
+    def _compact(self, values: np.ndarray) -> np.ndarray:
+        """Pedaço completo (ordenado) -> k pontos em postos igualmente espaçados."""
+        positions = ((np.arange(self.k) + 0.5) * len(values) / self.k).astype(np.int64)
+        return values[positions]
+
+    def _carry(self, level: int, points: np.ndarray):
+        while True:
+            if level == len(self.levels):
+                self.levels.append(None)
+            if self.levels[level] is None:
+                self.levels[level] = points
+                return
+            merged = np.sort(np.concatenate([self.levels[level], points]), kind="mergesort")
+            self.levels[level] = None
+            # Alterna o deslocamento entre níveis para não puxar sempre para o mesmo lado
+            points = merged[level % 2::2]
+            level += 1
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        self.count += len(values)
+        self.total += float(values.sum())
+        if self.chunk_size is None:
+            self.chunk_size = len(values)
+        if len(values) == self.chunk_size and len(values) >= self.k:
+            self._carry(0, self._compact(np.sort(values)))
+        else:
+            self.partial = np.concatenate([self.partial, values])
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if self.chunk_size is None:
+            self.chunk_size = other.chunk_size
+        if other.levels and (other.k != self.k or other.chunk_size != self.chunk_size):
+            raise ValueError("sketches com k ou chunk_size diferentes não podem ser combinados")
+        for level, points in enumerate(other.levels):
+            if points is not None:
+                self._carry(level, points)
+        self.partial = np.concatenate([self.partial, other.partial])
+        self.count += other.count
+        self.total += other.total
+        return self
+
+    def _weighted_points(self):
+        values, weights = [self.partial], [np.ones(len(self.partial))]
+        for level, points in enumerate(self.levels):
+            if points is not None:
+                values.append(points)
+                weights.append(np.full(len(points), self.chunk_size / self.k * 2 ** level))
+        values = np.concatenate(values)
+        weights = np.concatenate(weights)
+        order = np.argsort(values, kind="mergesort")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs) -> list:
+        """Valor no posto int(q · n) (mesma convenção de sorted(finals)[int(q · n)])."""
+        values, cumulative = self._weighted_points()
+        out = []
+        for q in qs:
+            rank = int(q * self.count)
+            index = int(np.searchsorted(cumulative, rank, side="right"))
+            out.append(float(values[min(index, len(values) - 1)]))
+        return out
+
+    def mean(self) -> float:
+        return self.total / self.count
+
+    def nbytes(self) -> int:
+        return self.partial.nbytes + sum(p.nbytes for p in self.levels if p is not None)
@@ -2,7 +2,11 @@
 # -*- coding: utf-8 -*-
 """
 Script para iniciar o servidor da aplicação
+
+Uso: python run_server.py [--port 8000] [--workers 1]
+(o tempo de startup é medido por benchmarks/startup.py)
 """
+import argparse
 import uvicorn
 import os
 import sys
@@ -11,21 +15,30 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inicia o servidor da aplicação")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", "1")),
+                        help="processos do uvicorn (cada um importa o app e roda o próprio lifespan)")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("  🚀 INICIANDO SERVIDOR - MEU FUTURO FINANCEIRO")
     print("=" * 60)
     print()
-    print("📍 Servidor será iniciado em: http://localhost:8000")
+    print(f"📍 Servidor será iniciado em: http://localhost:{args.port}")
     print("📁 Abra o frontend em: ../frontend/index.html")
     print()
     print("⚠️  Pressione CTRL+C para parar o servidor")
     print("=" * 60)
     print()
-    
+
     uvicorn.run(
         "app:app",
-        host="0.0.0.0",
-        port=8000,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
         reload=False,
         log_level="info"
     )
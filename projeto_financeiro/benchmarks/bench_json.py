@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark da serialização JSON por requisição.
+
+Mede só a parte de transformar o resultado em bytes, para respostas típicas de
+/api/submissions (página de 100 submissões) e /api/submit_future (3 taxas × 30
+anos), e o codec do payload no banco:
+
+- antes:          dict -> jsonable_encoder -> JSONResponse (caminho padrão do FastAPI)
+- json_response:  dict -> FastJSONResponse direto (sem jsonable_encoder), json da stdlib
+- orjson:         o mesmo com FAST_JSON=1 (se o orjson estiver instalado)
+
+Uso: python benchmarks/bench_json.py [--repeat 2000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import jsoncodec
+from calc import project_investments
+from jsoncodec import FastJSONResponse
+
+
+def submissions_page(n: int = 100) -> dict:
+    rows = []
+    for i in range(n):
+        payload = {"nome": f"Estudante {i}", "idade": 14, "profissao_dos_sonhos": "Programador",
+                   "faixa_salarial": 8000.0, "poupanca_mensal": 150.0 + i, "investimento_tipo": "moderado",
+                   "tempo_anos": 30}
+        rows.append({"id": 10_000 - i, "kind": "future", "payload": payload, "created_at": "2025-03-10 14:30:00"})
+    return {"count": n, "data": rows, "next_cursor": "MjAyNS0wMy0xMCAxNDozMDowMHw5OTAx"}
+
+
+def submit_future_response(years: int = 30) -> dict:
+    rates = {"conservador": 0.05, "moderado": 0.08, "arriscado": 0.12}
+    return {"status": "ok",
+            "projections": {k: project_investments(monthly=150, years=years, annual_return=r) for k, r in rates.items()}}
+
+
+def _per_call_us(fn, repeat: int) -> float:
+    """Melhor de 5 rodadas, em microssegundos por chamada."""
+    return min(timeit.repeat(fn, number=repeat, repeat=5)) / repeat * 1e6
+
+
+def run(repeat: int) -> dict:
+    cases = {"/api/submissions": submissions_page(), "/api/submit_future": submit_future_response()}
+    results = {}
+    for route, content in cases.items():
+        jsoncodec.FAST_JSON = False
+        timings = {
+            "antes": _per_call_us(lambda: JSONResponse(jsonable_encoder(content)).body, repeat),
+            "json_response": _per_call_us(lambda: FastJSONResponse(content).body, repeat),
+        }
+        if jsoncodec.orjson is not None:
+            jsoncodec.FAST_JSON = True
+            timings["orjson"] = _per_call_us(lambda: FastJSONResponse(content).body, repeat)
+        results[route] = timings
+
+    payload = submissions_page(1)["data"][0]["payload"]
+    jsoncodec.FAST_JSON = False
+    text = jsoncodec.dumps(payload)
+    codec = {"stdlib": _per_call_us(lambda: jsoncodec.loads(jsoncodec.dumps(payload)), repeat * 10)}
+    if jsoncodec.orjson is not None:
+        jsoncodec.FAST_JSON = True
+        codec["orjson"] = _per_call_us(lambda: jsoncodec.loads(jsoncodec.dumps(payload)), repeat * 10)
+    results["db payload (dumps+loads)"] = codec
+    jsoncodec.FAST_JSON = False
+    results["_bytes"] = {route: len(FastJSONResponse(content).body) for route, content in cases.items()}
+    results["_bytes"]["db payload"] = len(text.encode("utf-8"))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    sizes = results.pop("_bytes")
+    print("⏱️  Serialização por requisição (µs, melhor de 5)")
+    print("=" * 60)
+    for case, timings in results.items():
+        base = timings.get("antes", timings.get("stdlib"))
+        cells = "  ".join(f"{name}: {us:8.1f}  ({base / us:4.1f}x)" for name, us in timings.items())
+        print(f"{case:<26} {cells}")
+    print("-" * 60)
+    for case, size in sizes.items():
+        print(f"📦 {case}: {size} bytes")
+    if jsoncodec.orjson is None:
+        print("ℹ️  orjson não instalado: pip install orjson para comparar")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Teste de carga: uma turma inteira usando a plataforma ao mesmo tempo.
+
+Cada "aluno" virtual repete a sessão da página: salva a realidade, calcula o
+futuro (o frontend já pede o Monte Carlo em seguida), às vezes calcula uma meta
+e abre as abas de glossário, dicas e profissões. Cada passo tem uma
+probabilidade (o "peso" no mix), que pode ser trocada com --mix.
+
+Dois alvos:
+- ASGI dentro do processo (padrão): chama o `app` direto, com um banco temporário
+- servidor de verdade: --url http://localhost:8000 (já rodando) ou --uvicorn
+  (sobe um uvicorn local com banco temporário e derruba no fim)
+
+Sai com código 1 se alguma requisição falhar (inclusive 503 do pool de cálculo
+lotado): uma turma de 30 alunos tem que passar sem erros. Referência (1 CPU,
+30 alunos, 15 s): 0 erros, ~700 req/s no processo, p95 < 70 ms em todas as rotas.
+
+Uso:
+    python benchmarks/loadtest.py --users 30 --duration 20
+    python benchmarks/loadtest.py --users 30 --sessions 300 --uvicorn --workers 2
+    python benchmarks/loadtest.py --mix "simulate_montecarlo=0.2,calculate_goal=1" --json resultado.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+NOMES = ["Ana", "Bruno", "Carla", "Davi", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João"]
+PROFISSOES = ["Médico", "Engenheiro", "Professor", "Programador", "Designer"]
+TIPOS = ["conservador", "moderado", "arriscado"]
+
+
+def _reality(rng, aluno):
+    return {"nome": aluno["nome"], "idade": aluno["idade"], "renda_atual": rng.choice([0, 0, 50, 200])}
+
+
+def _future(rng, aluno):
+    return {"nome": aluno["nome"], "idade": aluno["idade"], "profissao_dos_sonhos": rng.choice(PROFISSOES),
+            "faixa_salarial": rng.choice([2000, 3500, 5000, 8000, 12000]),
+            "poupanca_mensal": rng.choice([20, 50, 100, 150, 200, 500]) + rng.choice([0, 0, 0, 0.5]),
+            "investimento_tipo": rng.choice(TIPOS), "tempo_anos": rng.choice([5, 10, 20, 30, 40])}
+
+
+def _goal(rng, aluno):
+    return {"goal_amount": rng.choice([500, 1000, 3000, 5000, 20000]),
+            "monthly_saving": rng.choice([20, 50, 100, 200]), "annual_rate": rng.choice([0.05, 0.08, 0.12])}
+
+
+# Passos da sessão, na ordem: (nome, método, caminho, probabilidade, corpo)
+SESSION = [
+    ("submit_reality", "POST", "/api/submit_reality", 1.0, _reality),
+    ("submit_future", "POST", "/api/submit_future", 1.0, _future),
+    ("simulate_montecarlo", "POST", "/api/simulate_montecarlo", 1.0, _future),
+    ("calculate_goal", "POST", "/api/calculate_goal", 0.6, _goal),
+    ("glossary", "GET", "/api/glossary", 0.8, None),
+    ("tips", "GET", "/api/tips", 0.8, None),
+    ("professions", "GET", "/api/professions", 0.5, None),
+]
+
+
+def parse_mix(text: str) -> dict:
+    """ "simulate_montecarlo=0.2,tips=0" -> {"simulate_montecarlo": 0.2, "tips": 0.0} """
+    known = {name for name, *_ in SESSION}
+    mix = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in known:
+            raise ValueError(f"rota desconhecida no mix: {name!r} (use {', '.join(sorted(known))})")
+        mix[name] = float(weight)
+    return mix
+
+
+def percentile(sorted_values, q: float) -> float:
+    """Percentil por posto mais próximo (q entre 0 e 1)."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(round(q * len(sorted_values), 9)) - 1))
+    return sorted_values[index]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.sessions = 0
+
+    def record(self, route: str, seconds: float, status):
+        self.latencies[route].append(seconds)
+        self.statuses[route][status] += 1
+        if status != 200:
+            self.errors[route] += 1
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for name, *_ in SESSION:
+            values = sorted(self.latencies.get(name, []))
+            if not values:
+                continue
+            routes[name] = {
+                "requests": len(values),
+                "errors": self.errors.get(name, 0),
+                "statuses": {str(k): v for k, v in self.statuses[name].items()},
+                "throughput_rps": len(values) / elapsed,
+                "p50_ms": percentile(values, 0.50) * 1e3,
+                "p95_ms": percentile(values, 0.95) * 1e3,
+                "p99_ms": percentile(values, 0.99) * 1e3,
+                "max_ms": values[-1] * 1e3,
+            }
+        total = sum(route["requests"] for route in routes.values())
+        return {
+            "elapsed_s": elapsed,
+            "sessions": self.sessions,
+            "requests": total,
+            "errors": sum(route["errors"] for route in routes.values()),
+            "throughput_rps": total / elapsed if elapsed else 0.0,
+            "routes": routes,
+        }
+
+
+async def student(client, stats: Stats, rng: random.Random, mix: dict, deadline: float, budget, think: float):
+    while time.perf_counter() < deadline and budget.take():
+        aluno = {"nome": rng.choice(NOMES), "idade": rng.randint(13, 16)}
+        for name, method, path, probability, body in SESSION:
+            if rng.random() >= mix.get(name, probability):
+                continue
+            payload = body(rng, aluno) if body else None
+            t0 = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=payload)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            stats.record(name, time.perf_counter() - t0, status)
+            if think:
+                await asyncio.sleep(rng.uniform(0, 2 * think))
+        stats.sessions += 1
+
+
+class Budget:
+    """Número máximo de sessões somando todos os alunos (None = sem limite, vale só o tempo)."""
+
+    def __init__(self, sessions):
+        self.left = sessions
+
+    def take(self) -> bool:
+        if self.left is None:
+            return True
+        if self.left <= 0:
+            return False
+        self.left -= 1
+        return True
+
+
+async def run_load(client, users: int, duration: float = None, sessions: int = None, mix: dict = None,
+                   think: float = 0.0, seed: int = 0) -> dict:
+    stats = Stats()
+    deadline = time.perf_counter() + duration if duration else float("inf")
+    budget = Budget(sessions)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        student(client, stats, random.Random(seed * 1000 + i), mix or {}, deadline, budget, think)
+        for i in range(users)
+    ))
+    return stats.report(time.perf_counter() - started)
+
+
+async def run_in_process(users: int, **options) -> dict:
+    """Dirige o `app` pela interface ASGI, sem rede, com banco temporário e o lifespan da API."""
+    import app as app_module
+    import db
+    previous_db = app_module.DB_PATH
+    with tempfile.TemporaryDirectory(prefix="load_") as tmp:
+        app_module.DB_PATH = os.path.join(tmp, "data.db")
+        db.init_db(app_module.DB_PATH)
+        try:
+            async with app_module.app.router.lifespan_context(app_module.app):
+                transport = httpx.ASGITransport(app=app_module.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                    return await run_load(client, users, **options)
+        finally:
+            db.close_pools()
+            app_module.DB_PATH = previous_db
+
+
+async def run_against_url(url: str, users: int, **options) -> dict:
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        return await run_load(client, users, **options)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_uvicorn(db_path: str, workers: int = 1, port: int = None, timeout: float = 30.0):
+    """Sobe `uvicorn app:app` em segundo plano e espera responder. Devolve (processo, url)."""
+    port = port or _free_port()
+    env = {**os.environ, "DB_PATH": db_path}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn terminou com código {process.returncode}")
+        try:
+            if httpx.get(url + "/api/tips", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"uvicorn não respondeu em {timeout:.0f}s")
+
+
+def print_report(report: dict, target: str):
+    print(f"👩‍🏫 TESTE DE CARGA ({target})")
+    print("=" * 96)
+    print(f"{'rota':<22}{'req':>7}{'erros':>7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'máx ms':>10}")
+    for name, route in report["routes"].items():
+        print(f"{name:<22}{route['requests']:>7}{route['errors']:>7}{route['throughput_rps']:>9.1f}"
+              f"{route['p50_ms']:>10.1f}{route['p95_ms']:>10.1f}{route['p99_ms']:>10.1f}{route['max_ms']:>10.1f}")
+    print("-" * 96)
+    for name, route in report["routes"].items():
+        failed = {status: n for status, n in route["statuses"].items() if status != "200"}
+        if failed:
+            print(f"⚠️  {name}: " + ", ".join(f"{n}× {status}" for status, n in failed.items()))
+    print(f"📊 {report['requests']} requisições, {report['sessions']} sessões em {report['elapsed_s']:.1f}s "
+          f"= {report['throughput_rps']:.1f} req/s ({report['errors']} erros)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Teste de carga com uma turma de alunos virtuais")
+    parser.add_argument("--users", type=int, default=30, help="alunos usando ao mesmo tempo")
+    parser.add_argument("--duration", type=float, default=None, help="segundos de teste")
+    parser.add_argument("--sessions", type=int, default=None, help="total de sessões (padrão: 10 por aluno)")
+    parser.add_argument("--mix", default="", help='probabilidade de cada passo, ex.: "simulate_montecarlo=0.3"')
+    parser.add_argument("--think", type=float, default=0.0, help="pausa média entre cliques, em segundos")
+    parser.add_argument("--seed", type=int, default=0)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="servidor já rodando, ex.: http://localhost:8000")
+    target.add_argument("--uvicorn", action="store_true", help="sobe um uvicorn local só para o teste")
+    parser.add_argument("--workers", type=int, default=1, help="processos do uvicorn (com --uvicorn)")
+    parser.add_argument("--json", metavar="ARQUIVO", help="salva o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    if args.duration is None and args.sessions is None:
+        args.sessions = 10 * args.users
+    options = dict(duration=args.duration, sessions=args.sessions, mix=parse_mix(args.mix),
+                   think=args.think, seed=args.seed)
+
+    if args.url:
+        report, label = asyncio.run(run_against_url(args.url, args.users, **options)), args.url
+    elif args.uvicorn:
+        with tempfile.TemporaryDirectory(prefix="load_") as tmp:
+            process, url = start_uvicorn(os.path.join(tmp, "data.db"), workers=args.workers)
+            try:
+                report = asyncio.run(run_against_url(url, args.users, **options))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+        label = f"uvicorn, {args.workers} processo(s)"
+    else:
+        report, label = asyncio.run(run_in_process(args.users, **options)), "ASGI no processo"
+
+    print_report(report, label)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
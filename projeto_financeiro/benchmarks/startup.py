@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tempo de startup da API: importação, lifespan, servidor pronto e reposição de worker.
+
+Três medidas, sempre com um banco temporário (DB_PATH) já criado:
+- worker:   processo novo que importa o app e roda o lifespan, como cada worker
+            do uvicorn faz (import_ms, lifespan_ms e o processo inteiro, com o interpretador)
+- cold:     python backend/run_server.py até todos os workers avisarem
+            "Application startup complete." e a primeira resposta 200
+- respawn:  (--workers >= 2) mata um worker com SIGKILL e mede até o uvicorn
+            subir outro pronto (inclui o intervalo de verificação do supervisor)
+
+Uso:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --workers 2 --json startup.json
+"""
+import argparse
+import json
+import os
+import queue
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from loadtest import BACKEND_DIR, _free_port
+
+READY_LINE = "Application startup complete."
+STARTED_LINE = re.compile(r"Started server process \[(\d+)\]")
+
+# Roda num processo novo: mede só o que é do app (o interpretador fica de fora destes números)
+WORKER_PROBE = r"""
+import asyncio, json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+
+async def lifespan():
+    async with app.app.router.lifespan_context(app.app):
+        return time.perf_counter()
+
+ready = asyncio.run(lifespan())
+print(json.dumps({"import_ms": (imported - start) * 1000, "lifespan_ms": (ready - imported) * 1000}))
+"""
+
+
+def measure_worker(db_path: str) -> dict:
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", WORKER_PROBE], cwd=BACKEND_DIR, env={**os.environ, "DB_PATH": db_path},
+                         capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+class _Server:
+    """run_server.py em segundo plano, com as linhas do log marcadas com o horário de chegada."""
+
+    def __init__(self, db_path: str, workers: int):
+        self.port = _free_port()
+        self.workers = workers
+        self.lines = queue.Queue()
+        self.started = time.perf_counter()
+        self.process = subprocess.Popen(
+            [sys.executable, "-u", "run_server.py", "--host", "127.0.0.1", "--port", str(self.port),
+             "--workers", str(workers)],
+            cwd=BACKEND_DIR, env={**os.environ, "DB_PATH": db_path, "PYTHONUNBUFFERED": "1"},
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        threading.Thread(target=self._read, daemon=True).start()
+        self.pids = []
+
+    def _read(self):
+        for line in self.process.stdout:
+            self.lines.put((time.perf_counter(), line))
+        self.lines.put((time.perf_counter(), None))
+
+    def wait_ready(self, count: int, timeout: float) -> float:
+        """Espera `count` avisos de startup completo; devolve o horário do último."""
+        deadline = time.perf_counter() + timeout
+        while count:
+            try:
+                at, line = self.lines.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                raise RuntimeError(f"servidor não ficou pronto em {timeout:.0f}s")
+            if line is None:
+                raise RuntimeError(f"run_server.py terminou com código {self.process.wait()}")
+            started = STARTED_LINE.search(line)
+            if started:
+                self.pids.append(int(started.group(1)))
+            if READY_LINE in line:
+                count -= 1
+        return at
+
+    def first_response(self, timeout: float) -> float:
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            try:
+                if httpx.get(f"http://127.0.0.1:{self.port}/api/tips", timeout=1).status_code == 200:
+                    return time.perf_counter()
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        raise RuntimeError(f"servidor não respondeu em {timeout:.0f}s")
+
+    def stop(self):
+        self.process.send_signal(signal.SIGINT)
+        try:
+            self.process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def measure_server(db_path: str, workers: int, respawn: bool, timeout: float = 60.0) -> dict:
+    server = _Server(db_path, workers)
+    try:
+        ready = server.wait_ready(workers, timeout)
+        responded = server.first_response(timeout)
+        result = {"ready_ms": (ready - server.started) * 1000, "first_response_ms": (responded - server.started) * 1000}
+        if respawn and server.pids:
+            killed = time.perf_counter()
+            os.kill(server.pids[0], signal.SIGKILL)
+            result["respawn_ms"] = (server.wait_ready(1, timeout) - killed) * 1000
+        return result
+    finally:
+        server.stop()
+
+
+def summarize(runs: list) -> dict:
+    keys = runs[0].keys() if runs else ()
+    return {key: {"median_ms": statistics.median(r[key] for r in runs), "min_ms": min(r[key] for r in runs)}
+            for key in keys}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mede o tempo de startup da API")
+    parser.add_argument("--runs", type=int, default=5, help="repetições de cada medida")
+    parser.add_argument("--workers", type=int, default=2, help="workers do uvicorn no cold start/respawn")
+    parser.add_argument("--skip-server", action="store_true", help="só mede o worker (sem subir o uvicorn)")
+    parser.add_argument("--json", help="grava o resultado neste arquivo")
+    args = parser.parse_args(argv)
+
+    respawn = args.workers >= 2 and hasattr(signal, "SIGKILL")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "startup.db")
+        measure_worker(db_path)  # Aquecimento: cria o banco e enche o cache de arquivos do sistema
+        results = {"worker": summarize([measure_worker(db_path) for _ in range(args.runs)])}
+        if not args.skip_server:
+            results["server"] = summarize([measure_server(db_path, args.workers, respawn) for _ in range(args.runs)])
+
+    print(f"🚀 STARTUP DA API (mediana / mínimo de {args.runs} execuções)")
+    print("=" * 60)
+    labels = {
+        "import_ms": "importar o app", "lifespan_ms": "lifespan (startup)", "process_ms": "processo inteiro",
+        "ready_ms": f"run_server.py: {args.workers} workers prontos", "first_response_ms": "primeira resposta 200",
+        "respawn_ms": "worker morto -> novo pronto",
+    }
+    for group in results.values():
+        for key, stats in group.items():
+            print(f"{labels[key]:<34}{stats['median_ms']:>10.1f} ms{stats['min_ms']:>10.1f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"workers": args.workers, "runs": args.runs, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Suíte de benchmarks da plataforma: cálculos, banco de dados e rotas da API.
+
+Tudo roda dentro do processo (sem servidor): as rotas são chamadas pelo
+TestClient do FastAPI, e os bancos de 10 mil / 100 mil / 1 milhão de linhas
+são criados numa pasta temporária.
+
+Uso:
+    python benchmarks/suite.py                          # roda e mostra a tabela
+    python benchmarks/suite.py --save baseline.json     # guarda a referência (JSON)
+    python benchmarks/suite.py --compare baseline.json  # falha (saída 1) se algo piorar além do limite
+    python benchmarks/suite.py --quick -k calc          # só os tamanhos pequenos, só os que têm "calc" no nome
+
+A comparação usa a mediana de cada benchmark: é regressão quando a mediana nova
+passa de (1 + threshold) × referência E a diferença absoluta passa de
+--min-delta (para o ruído de medições de microssegundos não reprovar ninguém).
+Referências só fazem sentido na mesma máquina.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from itertools import count
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np
+
+THRESHOLD = 0.25      # 25% mais lento = regressão
+MIN_DELTA = 50e-6     # ... e pelo menos 50 µs mais lento
+MIN_TIME = 0.3        # Segundos medindo cada benchmark (no mínimo MIN_ROUNDS rodadas)
+MIN_ROUNDS = 5
+MAX_ROUNDS = 2000
+
+DB_ROWS = (10_000, 100_000, 1_000_000)
+DB_ROWS_QUICK = (10_000,)
+MC_SIZES = ((1_000, 10), (10_000, 30), (100_000, 50))
+MC_SIZES_QUICK = ((1_000, 10), (10_000, 30))
+API_DB_ROWS = 10_000
+
+BENCHMARKS = []
+
+
+def benchmark(name: str, group: str, quick: bool = True):
+    """Registra `make(ctx) -> função sem argumentos` (a preparação fica fora da medição)."""
+    def register(make):
+        BENCHMARKS.append({"name": name, "group": group, "quick": quick, "make": make})
+        return make
+    return register
+
+
+def measure(fn, min_time: float = None, min_rounds: int = MIN_ROUNDS, max_rounds: int = MAX_ROUNDS) -> dict:
+    min_time = MIN_TIME if min_time is None else min_time
+    fn()  # Aquecimento (caches do SQLite, imports, pool de processos...)
+    times = []
+    started = time.perf_counter()
+    while len(times) < min_rounds or (time.perf_counter() - started < min_time and len(times) < max_rounds):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return {
+        "median_s": statistics.median(times),
+        "min_s": times[0],
+        "p90_s": times[int(0.9 * (len(times) - 1))],
+        "rounds": len(times),
+    }
+
+
+# ---------------------------------------------------------------- contexto
+
+class Context:
+    """Pasta temporária, bancos já povoados e o cliente da API, criados sob demanda e reaproveitados."""
+
+    def __init__(self):
+        self.stack = ExitStack()
+        self.tmp = self.stack.enter_context(tempfile.TemporaryDirectory(prefix="bench_"))
+        self._dbs = {}
+        self._client = None
+
+    def database(self, rows: int) -> str:
+        if rows not in self._dbs:
+            import db
+            path = os.path.join(self.tmp, f"data_{rows}.db")
+            db.init_db(path)
+            names = [f"Estudante {i}" for i in range(1000)]
+            tipos = ["conservador", "moderado", "arriscado"]
+            for start in range(0, rows, 50_000):
+                db.save_submissions(path, "future", [
+                    {"nome": names[i % 1000], "idade": 14, "investimento_tipo": tipos[i % 3],
+                     "poupanca_mensal": float(50 + i % 500), "tempo_anos": 1 + i % 40}
+                    for i in range(start, min(rows, start + 50_000))
+                ])
+            self._dbs[rows] = path
+        return self._dbs[rows]
+
+    def client(self):
+        if self._client is None:
+            from fastapi.testclient import TestClient
+            import app as app_module
+            app_module.DB_PATH = self.database(API_DB_ROWS)
+            self._client = self.stack.enter_context(TestClient(app_module.app))
+        return self._client
+
+    def close(self):
+        import db
+        self.stack.close()
+        db.close_pools()
+
+
+# ---------------------------------------------------------------- calc
+
+@benchmark("calc.compound_monthly[closed,30y]", "calc")
+def _(ctx):
+    from calc import compound_monthly
+    return lambda: compound_monthly(0, 150, 0.08, 30)
+
+
+@benchmark("calc.compound_monthly[loop,30y]", "calc")
+def _(ctx):
+    from calc import compound_monthly
+    return lambda: compound_monthly(0, 150, 0.08, 30, engine="loop")
+
+
+@benchmark("calc.project_investments[30y]", "calc")
+def _(ctx):
+    from calc import project_investments
+    return lambda: project_investments(monthly=150, years=30, annual_return=0.08)
+
+
+@benchmark("calc.project_investments_batch[200x3,30y]", "calc")
+def _(ctx):
+    from calc import project_investments_batch
+    monthlies, years = [50.0 + i for i in range(200)], [1 + i % 40 for i in range(200)]
+    return lambda: project_investments_batch(monthlies, years, [0.05, 0.08, 0.12])
+
+
+def _register_monte_carlo(n_sims: int, years: int, quick: bool):
+    @benchmark(f"calc.monte_carlo_projection[{n_sims},{years}y]", "calc", quick=quick)
+    def _(ctx):
+        from calc import monte_carlo_projection
+        return lambda: monte_carlo_projection(monthly=150, years=years, n_sims=n_sims, seed=1)
+
+
+for _n_sims, _years in MC_SIZES:
+    _register_monte_carlo(_n_sims, _years, quick=(_n_sims, _years) in MC_SIZES_QUICK)
+
+
+# ---------------------------------------------------------------- db
+
+def _register_db(rows: int, quick: bool):
+    @benchmark(f"db.save_submission[{rows}]", "db", quick=quick)
+    def _(ctx):
+        import db
+        path = ctx.database(rows)
+        return lambda: db.save_submission(path, "future", {"nome": "Bench", "idade": 15, "tempo_anos": 10})
+
+    @benchmark(f"db.get_submissions[nome,{rows}]", "db", quick=quick)
+    def _(ctx):
+        import db
+        path = ctx.database(rows)
+        return lambda: db.get_submissions(path, nome="Estudante 42")
+
+    @benchmark(f"db.get_submissions_page[100,{rows}]", "db", quick=quick)
+    def _(ctx):
+        import db
+        path = ctx.database(rows)
+        return lambda: db.get_submissions_page(path, limit=100, investimento_tipo="moderado")
+
+    @benchmark(f"db.get_analytics[{rows}]", "db", quick=quick)
+    def _(ctx):
+        import db
+        path = ctx.database(rows)
+        return lambda: db.get_analytics(path)
+
+
+for _rows in DB_ROWS:
+    _register_db(_rows, quick=_rows in DB_ROWS_QUICK)
+
+
+# ---------------------------------------------------------------- api
+
+FUTURE_FORM = {"nome": "Bench", "idade": 15, "profissao_dos_sonhos": "Programador", "faixa_salarial": 8000,
+               "poupanca_mensal": 150, "investimento_tipo": "moderado", "tempo_anos": 30}
+
+
+def _route(method: str, url: str, body=None, vary: str = None):
+    """Chamada de rota; `vary` muda esse campo a cada chamada (para medir o cálculo, não o cache)."""
+    def make(ctx):
+        client = ctx.client()
+        counter = count(1)
+
+        def call():
+            payload = body
+            if vary is not None:
+                payload = {**body, vary: body[vary] + next(counter) / 100}
+            response = client.request(method, url, json=payload)
+            if response.status_code != 200:
+                raise RuntimeError(f"{method} {url}: {response.status_code} {response.text[:200]}")
+            return response.content
+        return call
+    return make
+
+
+# Leituras primeiro: as rotas que gravam aumentam o banco, e as leituras medem sempre os mesmos API_DB_ROWS
+_API_ROUTES = [
+    ("GET", "/api/submissions", None, None),
+    ("GET", "/api/submissions/stream", None, None),
+    ("GET", "/api/analytics", None, None),
+    ("GET", "/api/glossary", None, None),
+    ("GET", "/api/tips", None, None),
+    ("GET", "/api/professions", None, None),
+    ("POST", "/api/calculate_goal", {"goal_amount": 10000, "monthly_saving": 150, "annual_rate": 0.05},
+     "goal_amount"),
+    ("POST", "/api/calculate_goal/batch",
+     {"goals": [{"goal_amount": 1000 * i, "monthly_saving": 150, "annual_rate": 0.05} for i in range(1, 31)]}, None),
+    ("POST", "/api/simulate_montecarlo", {**FUTURE_FORM, "investimento_tipo": "arriscado"}, "poupanca_mensal"),
+    ("POST", "/api/simulate_montecarlo/stream",
+     {**FUTURE_FORM, "investimento_tipo": "arriscado", "n_sims": 20_000}, "poupanca_mensal"),
+    ("POST", "/api/submit_reality", {"nome": "Bench", "idade": 15, "renda_atual": 0}, None),
+    ("POST", "/api/submit_future", FUTURE_FORM, "poupanca_mensal"),
+    ("POST", "/api/batch/submit_future", [FUTURE_FORM] * 30, None),
+]
+
+for _method, _url, _body, _vary in _API_ROUTES:
+    benchmark(f"api.{_method} {_url}", "api")(_route(_method, _url, _body, _vary))
+
+
+# ---------------------------------------------------------------- runner
+
+def run(selected, quick: bool = False, progress=print) -> dict:
+    ctx = Context()
+    results = {}
+    try:
+        for bench in selected:
+            if quick and not bench["quick"]:
+                continue
+            fn = bench["make"](ctx)
+            results[bench["name"]] = {"group": bench["group"], **measure(fn)}
+            if progress:
+                progress(_format_row(bench["name"], results[bench["name"]]))
+    finally:
+        ctx.close()
+    return results
+
+
+def metadata() -> dict:
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD, min_delta: float = MIN_DELTA) -> list:
+    """Lista de (nome, referência, atual, razão) dos benchmarks que ficaram lentos demais."""
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        before, after = reference["median_s"], current["median_s"]
+        if after > before * (1 + threshold) and after - before > min_delta:
+            regressions.append((name, before, after, after / before))
+    return regressions
+
+
+def _format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds:8.3f} s "
+
+
+def _format_row(name: str, result: dict) -> str:
+    return (f"{name:<52} {_format_time(result['median_s'])}  (min {_format_time(result['min_s']).strip()}, "
+            f"{result['rounds']} rodadas)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de cálculos, banco e API")
+    parser.add_argument("-k", dest="keyword", default="", help="só benchmarks com este texto no nome")
+    parser.add_argument("--quick", action="store_true", help="pula os tamanhos grandes (100k/1M linhas, 100k simulações)")
+    parser.add_argument("--save", metavar="ARQUIVO", help="guarda os resultados como referência (JSON)")
+    parser.add_argument("--compare", metavar="ARQUIVO", help="compara com uma referência salva")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="piora relativa tolerada (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA, help="piora absoluta mínima, em segundos")
+    parser.add_argument("--list", action="store_true", help="só lista os benchmarks")
+    args = parser.parse_args(argv)
+
+    selected = [b for b in BENCHMARKS if args.keyword in b["name"]]
+    if args.list:
+        for bench in selected:
+            print(bench["name"] + ("" if bench["quick"] else "  (completo)"))
+        return 0
+
+    print("⏱️  BENCHMARKS (mediana por chamada)")
+    print("=" * 90)
+    results = run(selected, quick=args.quick)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"💾 Referência salva em {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        print("-" * 90)
+        for name, result in results.items():
+            if name in baseline:
+                ratio = result["median_s"] / baseline[name]["median_s"]
+                print(f"{name:<52} {ratio:5.2f}x da referência")
+        if regressions:
+            print(f"❌ {len(regressions)} regressão(ões) acima de {args.threshold:.0%}:")
+            for name, before, after, ratio in regressions:
+                print(f"   {name}: {_format_time(before).strip()} -> {_format_time(after).strip()} ({ratio:.2f}x)")
+            return 1
+        print("✅ Nenhuma regressão")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
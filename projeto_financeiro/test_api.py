@@ -0,0 +1,365 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes da API rodando dentro do processo (sem servidor: python -m pytest test_api.py)
+"""
+import asyncio
+import json
+import os
+import sys
+
+# Adiciona o diretório backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+import db
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.db")
+    db.init_db(path)
+    monkeypatch.setattr(app_module, "DB_PATH", path)
+    with TestClient(app_module.app) as c:
+        yield c
+    db.close_pools()
+
+
+def _seed(client, n_reality, n_future):
+    for i in range(n_reality):
+        client.post('/api/submit_reality', json={"nome": f"r{i}", "idade": 15, "renda_atual": 0})
+    for i in range(n_future):
+        db.save_submission(app_module.DB_PATH, 'future', {"nome": f"f{i}"})
+
+
+def test_submissions_keyset_pagination(client):
+    _seed(client, 7, 8)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get('/api/submissions', params=params).json()
+        seen.extend(row["id"] for row in page["data"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen, reverse=True) == seen
+    assert len(set(seen)) == 15
+
+
+def test_submissions_filters_and_stream(client):
+    _seed(client, 3, 5)
+    page = client.get('/api/submissions', params={"kind": "future"}).json()
+    assert page["count"] == 5
+    assert {row["kind"] for row in page["data"]} == {"future"}
+    assert client.get('/api/submissions', params={"until": "2000-01-01"}).json()["count"] == 0
+
+    response = client.get('/api/submissions/stream', params={"kind": "reality"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["payload"]["nome"] for row in rows] == ["r2", "r1", "r0"]
+
+
+def _asgi_get(path, disconnect=False):
+    """Chama o app ASGI direto (o TestClient junta o corpo inteiro): devolve os pedaços enviados"""
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+             "headers": [], "client": ("test", 1), "server": ("test", 80)}
+    bodies = []
+
+    async def receive():
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if disconnect:
+            raise OSError("conexão fechada")  # Cliente sumiu antes do corpo começar
+        if message["type"] == "http.response.body" and message.get("body"):
+            bodies.append(message["body"])
+
+    try:
+        asyncio.run(app_module.app(scope, receive, send))
+    except OSError:
+        assert disconnect
+    return bodies
+
+
+def test_stream_sends_one_chunk_per_batch(client):
+    total = 2 * db.STREAM_CHUNK_SIZE + 3
+    db.save_submissions(app_module.DB_PATH, 'future', [{"nome": f"f{i}"} for i in range(total)])
+    bodies = _asgi_get('/api/submissions/stream')
+    assert [body.count(b"\n") for body in bodies] == [db.STREAM_CHUNK_SIZE, db.STREAM_CHUNK_SIZE, 3]
+    assert db.get_pool(app_module.DB_PATH).metrics()["in_use"] == 0
+
+
+def test_stream_exports_are_capped_and_release_their_slot(client, monkeypatch):
+    import threading
+    _seed(client, 2, 0)
+    monkeypatch.setattr(app_module, "_export_slots", threading.BoundedSemaphore(1))
+    _asgi_get('/api/submissions/stream', disconnect=True)  # Cliente sumiu antes do corpo começar
+    assert client.get('/api/submissions/stream').status_code == 200
+    assert client.get('/api/submissions/stream').status_code == 200  # A vaga volta a cada resposta
+
+    assert app_module._export_slots.acquire(blocking=False)  # Ocupa a única vaga
+    response = client.get('/api/submissions/stream')
+    assert response.status_code == 503 and response.headers["retry-after"] == "5"
+
+
+def test_busy_database_pool_returns_503(client, monkeypatch):
+    def busy(path):
+        raise db.PoolTimeout("nenhuma conexão livre em 30s")
+    monkeypatch.setattr(app_module, "get_analytics", busy)
+    response = client.get('/api/analytics')
+    assert response.status_code == 503 and "retry-after" in response.headers
+
+
+def test_submissions_rejects_bad_cursor_and_dates(client):
+    assert client.get('/api/submissions', params={"cursor": "???"}).status_code == 400
+    assert client.get('/api/submissions', params={"since": "ontem"}).status_code == 400
+
+
+def test_analytics_endpoint(client):
+    _seed(client, 2, 3)
+    stats = client.get('/api/analytics').json()
+    assert stats["total"] == 5
+    assert stats["by_kind"] == {"future": 3, "reality": 2}
+
+
+def test_projections_are_cached_on_normalized_inputs(client):
+    app_module.projection_cache.clear()
+    form = {"nome": "Ana", "idade": 15, "profissao_dos_sonhos": "Médica", "faixa_salarial": 8000,
+            "poupanca_mensal": 100, "investimento_tipo": "moderado", "tempo_anos": 10}
+    first = client.post('/api/submit_future', json=form).json()
+    second = client.post('/api/submit_future', json=dict(form, poupanca_mensal=100.001)).json()
+    assert first["projections"] == second["projections"]
+    stats = app_module.projection_cache.stats()["memory"]
+    assert stats["hits"] == 3 and stats["size"] == 3
+
+
+def test_seeded_monte_carlo_is_deterministic_and_cached(client):
+    app_module.montecarlo_cache.clear()
+    form = {"nome": "Ana", "idade": 15, "profissao_dos_sonhos": "Investidora", "faixa_salarial": 10000,
+            "poupanca_mensal": 1000, "investimento_tipo": "arriscado", "tempo_anos": 5, "seed": 7}
+    first = client.post('/api/simulate_montecarlo', json=form).json()["montecarlo"]
+    second = client.post('/api/simulate_montecarlo', json=form).json()["montecarlo"]
+    assert first == second
+    assert app_module.montecarlo_cache.stats()["memory"]["hits"] == 1
+
+
+def test_goal_batch_reports_per_item_errors(client):
+    goals = [{"goal_amount": 10000, "monthly_saving": 500, "annual_rate": 0.05},
+             {"goal_amount": 10000, "monthly_saving": 0}]
+    results = client.post('/api/calculate_goal/batch', json={"goals": goals}).json()["results"]
+    assert results[0] == client.post('/api/calculate_goal', json=goals[0]).json()
+    assert "error" in results[1]
+
+    # Meta gigante: só ela dá erro na lista; sozinha, é recusada na validação (não trava nem dá 500)
+    huge = {"goal_amount": 1e308, "monthly_saving": 0.01, "annual_rate": 0}
+    results = client.post('/api/calculate_goal/batch', json={"goals": [huge, goals[0]]}).json()["results"]
+    assert "error" in results[0] and results[1]["months_needed"] > 0
+    assert client.post('/api/calculate_goal', json=dict(huge, goal_amount=1e18)).status_code == 422
+    exact = client.post('/api/calculate_goal', json=dict(huge, goal_amount=1e12)).json()
+    assert exact["months_needed"] == 10**14 and exact["final_amount"] >= 1e12
+
+
+def test_batch_submit_future_matches_single_calls_and_saves_once(client):
+    form = {"nome": "Ana", "idade": 15, "profissao_dos_sonhos": "Médica", "faixa_salarial": 8000,
+            "poupanca_mensal": 100, "investimento_tipo": "moderado", "tempo_anos": 10}
+    items = [form, dict(form, nome="Bia", poupanca_mensal=50, tempo_anos=20), dict(form, tempo_anos=0), "x"]
+    body = client.post('/api/batch/submit_future', json=items).json()
+    assert (body["ok"], body["errors"]) == (2, 2)
+    assert body["results"][0]["projections"] == client.post('/api/submit_future', json=form).json()["projections"]
+    assert body["results"][2]["status"] == "error"
+    assert body["results"][2]["errors"][0]["loc"] == ["tempo_anos"]
+    assert db.get_analytics(app_module.DB_PATH)["by_kind"] == {"future": 3}
+
+
+def test_empty_batch_skips_the_compute_pool(client, monkeypatch):
+    from executor import ComputePool
+    monkeypatch.setattr(app_module, "compute_pool", ComputePool(workers=0, max_pending=0))  # Lotado: daria 503
+    body = client.post('/api/batch/submit_future', json=[]).json()
+    assert (body["count"], body["ok"], body["results"]) == (0, 0, [])
+    assert client.post('/api/batch/submit_future', json=["x"]).json()["errors"] == 1
+
+
+def test_saturated_compute_pool_returns_503(client, monkeypatch):
+    from executor import ComputePool
+    monkeypatch.setattr(app_module, "compute_pool", ComputePool(workers=0, max_pending=0, retry_after=3))
+    form = {"nome": "Ana", "idade": 15, "profissao_dos_sonhos": "Investidora", "faixa_salarial": 10000,
+            "poupanca_mensal": 1000, "investimento_tipo": "arriscado", "tempo_anos": 5}
+    response = client.post('/api/simulate_montecarlo', json=form)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert client.get('/api/glossary').status_code == 200
+    # Projeções não usam o pool: continuam respondendo com ele lotado
+    assert client.post('/api/submit_future', json=form).status_code == 200
+    assert client.post('/api/batch/submit_future', json=[form]).json()["ok"] == 1
+
+
+def test_large_monte_carlo_is_sharded_across_the_pool(client):
+    from calc import monte_carlo_projection
+    form = {"nome": "Ana", "idade": 15, "profissao_dos_sonhos": "Investidora", "faixa_salarial": 10000,
+            "poupanca_mensal": 100, "investimento_tipo": "arriscado", "tempo_anos": 10,
+            "seed": 3, "n_sims": 30_000}
+    body = client.post('/api/simulate_montecarlo', json=form).json()
+    assert body["montecarlo"] == monte_carlo_projection(monthly=100, years=10, n_sims=30_000, seed=3)
+
+
+def test_monte_carlo_fan_chart_bands(client, monkeypatch):
+    form = {"nome": "Ana", "idade": 15, "profissao_dos_sonhos": "Investidora", "faixa_salarial": 10000,
+            "poupanca_mensal": 100, "investimento_tipo": "arriscado", "tempo_anos": 10,
+            "seed": 5, "bands": [0.1, 0.5, 0.9]}
+    sims = client.post('/api/simulate_montecarlo', json=form).json()["montecarlo"]
+    assert sims["bands"]["years"] == list(range(11))
+    assert sims["bands"]["percentis"]["p90"][-1] == sims["p90"]
+    assert client.post('/api/simulate_montecarlo', json={**form, "bands": [0.5, 1.5]}).status_code == 422
+
+    monkeypatch.setattr(app_module, "MC_BANDS_MAX_CELLS", 1000)
+    assert client.post('/api/simulate_montecarlo', json=form).status_code == 400
+    sketch = client.post('/api/simulate_montecarlo', json={**form, "percentiles": "sketch"})
+    assert sketch.status_code == 200
+
+
+def test_monte_carlo_stream_refines_to_the_same_result(client):
+    from calc import monte_carlo_projection
+    form = {"nome": "Ana", "idade": 15, "profissao_dos_sonhos": "Investidora", "faixa_salarial": 10000,
+            "poupanca_mensal": 100, "investimento_tipo": "arriscado", "tempo_anos": 10,
+            "seed": 8, "n_sims": 25_000}
+    response = client.post('/api/simulate_montecarlo/stream', json=form)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["done"] for e in events[:-1]] == [10_000, 20_000, 25_000]
+    assert all(e["event"] == "progress" and e["parcial"]["p50"] > 0 for e in events[:-1])
+    assert events[-1] == {"event": "result",
+                          "montecarlo": monte_carlo_projection(monthly=100, years=10, n_sims=25_000, seed=8)}
+
+    sse = client.post('/api/simulate_montecarlo/stream', json=form, headers={"Accept": "text/event-stream"})
+    assert sse.headers["content-type"].startswith("text/event-stream")
+    # Com semente, a segunda vez já vem do cache: só o resultado
+    assert sse.text.startswith("event: result\ndata: ")
+
+
+def test_monte_carlo_stream_cancellation_stops_pending_chunks(monkeypatch):
+    import asyncio
+    from executor import ComputePool
+    pool = ComputePool(workers=0, max_pending=10)
+    monkeypatch.setattr(app_module, "compute_pool", pool)
+
+    async def first_event_then_disconnect():
+        events = app_module._monte_carlo_events(100, 10, 0.12, 0.25, 500_000, 1)
+        first = await events.__anext__()
+        await events.aclose()
+        return first
+
+    first = asyncio.run(first_event_then_disconnect())
+    pool.shutdown()
+    assert first["done"] == 10_000
+    assert pool.metrics()["completed_total"] < 5
+
+
+def test_monte_carlo_stream_cancels_first_chunk_when_client_leaves_early(monkeypatch):
+    import time
+    from executor import ComputePool
+    pool = ComputePool(workers=0, max_pending=4)
+    monkeypatch.setattr(app_module, "compute_pool", pool)
+    monkeypatch.setattr(app_module, "monte_carlo_work", lambda percentiles, bands: lambda *args: time.sleep(0.5))
+    body = json.dumps({"nome": "Ana", "idade": 15, "profissao_dos_sonhos": "Investidora", "faixa_salarial": 10000,
+                       "poupanca_mensal": 100, "investimento_tipo": "arriscado", "tempo_anos": 10}).encode()
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+             "scheme": "http", "path": "/api/simulate_montecarlo/stream", "raw_path": b"/api/simulate_montecarlo/stream",
+             "root_path": "", "query_string": b"", "headers": [(b"content-type", b"application/json")],
+             "client": ("test", 1), "server": ("test", 80)}
+    messages = iter([{"type": "http.request", "body": body, "more_body": False}])
+
+    async def receive():
+        return next(messages, {"type": "http.disconnect"})
+
+    async def send(message):
+        raise OSError("conexão fechada")  # Cliente sumiu antes do corpo começar: o gerador nem roda
+
+    async def leave_early():
+        with pytest.raises(OSError):
+            await app_module.app(scope, receive, send)
+        await asyncio.sleep(0.05)
+        return pool.metrics()["pending"]
+
+    try:
+        assert asyncio.run(leave_early()) == 0  # O pedaço já agendado não segura a vaga no pool
+    finally:
+        pool.shutdown()
+
+
+def test_monte_carlo_stream_reports_unexpected_errors_as_event(client, monkeypatch, caplog):
+    def broken_merge(*args):
+        raise RuntimeError("memória esgotada")
+    monkeypatch.setattr(app_module, "merge_monte_carlo_parts", broken_merge)
+    form = {"nome": "Ana", "idade": 15, "profissao_dos_sonhos": "Investidora", "faixa_salarial": 10000,
+            "poupanca_mensal": 100, "investimento_tipo": "arriscado", "tempo_anos": 10, "n_sims": 20_000}
+
+    sse = client.post('/api/simulate_montecarlo/stream', json=form, headers={"Accept": "text/event-stream"})
+    assert sse.status_code == 200
+    last = sse.text.strip().split("\n\n")[-1]
+    assert last.startswith("event: error\ndata: ")
+    assert json.loads(last.split("data: ", 1)[1]) == {"event": "error", "detail": "memória esgotada"}
+    assert "falha no Monte Carlo em streaming" in caplog.text
+
+
+@pytest.mark.parametrize("route", ['/api/glossary', '/api/tips', '/api/professions'])
+def test_static_catalogs_use_etag_and_304(client, route):
+    first = client.get(route)
+    assert first.status_code == 200
+    assert first.headers["cache-control"].startswith("public, max-age=")
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    again = client.get(route, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert client.get(route, headers={"If-None-Match": f'"outro", W/{etag}'}).status_code == 304
+    assert client.get(route, headers={"If-None-Match": '"outro"'}).status_code == 200
+
+    # O ETag da variante gzip não vale para a resposta sem compressão (e vice-versa)
+    gzip_etag = client.get(route, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    assert gzip_etag != etag
+    assert client.get(route, headers={"Accept-Encoding": "identity", "If-None-Match": gzip_etag}).status_code == 200
+    assert client.get(route, headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag}).status_code == 304
+
+
+def test_static_catalogs_keep_their_content(client):
+    assert "Juros Compostos" in client.get('/api/glossary').json()
+    assert len(client.get('/api/tips').json()["tips"]) == 10
+    assert client.get('/api/professions').json()["Médico"]["education"] == "Graduação + Residência"
+
+
+def test_catalogs_and_frontend_are_served_precompressed(client):
+    import gzip
+    with client.stream("GET", '/api/glossary', headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert json.loads(gzip.decompress(raw)) == client.get('/api/glossary', headers={"Accept-Encoding": "identity"}).json()
+    assert client.get('/', headers={"Accept-Encoding": "identity"}).headers["content-type"].startswith("text/html")
+
+
+def test_importing_app_has_no_side_effects(tmp_path):
+    import subprocess
+    path = tmp_path / "novo.db"
+    subprocess.run([sys.executable, "-c", "import app"], cwd=os.path.dirname(app_module.__file__),
+                   env={**os.environ, "DB_PATH": str(path)}, check=True)
+    assert not path.exists()  # O banco só é criado no lifespan
+
+
+def test_catalog_preload_and_first_request_share_one_load(tmp_path, monkeypatch):
+    from catalog import CatalogStore
+    store = CatalogStore()
+    reads = []
+    original = store._read_all
+    monkeypatch.setattr(store, "_read_all", lambda: reads.append(1) or original())
+    thread = store.preload()
+    assert store.get("glossary").name == "glossary"
+    thread.join()
+    assert len(reads) == 1
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do executor de benchmarks (não medem desempenho: python -m pytest test_benchmarks.py)
+"""
+import json
+import os
+import sys
+
+# Adiciona o diretório benchmarks ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+import suite
+
+
+def test_measure_respects_minimum_rounds():
+    calls = []
+    result = suite.measure(lambda: calls.append(1), min_time=0, min_rounds=7)
+    assert result["rounds"] == 7
+    assert len(calls) == 8  # + aquecimento
+    assert result["min_s"] <= result["median_s"] <= result["p90_s"]
+
+
+def test_compare_needs_relative_and_absolute_slowdown():
+    baseline = {"a": {"median_s": 1e-3}, "b": {"median_s": 1e-5}, "c": {"median_s": 1e-3}}
+    results = {"a": {"median_s": 2e-3}, "b": {"median_s": 3e-5}, "c": {"median_s": 1.1e-3}, "novo": {"median_s": 1}}
+    regressions = suite.compare(results, baseline, threshold=0.25, min_delta=50e-6)
+    assert [name for name, *_ in regressions] == ["a"]
+
+
+def test_every_api_route_is_benchmarked():
+    import app as app_module
+    routes = {f"api.{method} {route.path}" for route in app_module.app.routes
+              for method in getattr(route, "methods", ()) if route.path.startswith("/api/")}
+    assert routes <= {b["name"] for b in suite.BENCHMARKS}
+
+
+def test_save_and_compare_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(suite, "BENCHMARKS", [])
+    suite.benchmark("calc.rapido", "calc")(lambda ctx: (lambda: sum(range(10))))
+    monkeypatch.setattr(suite, "MIN_TIME", 0)
+    baseline = tmp_path / "baseline.json"
+    assert suite.main(["--save", str(baseline)]) == 0
+    saved = json.loads(baseline.read_text())
+    assert set(saved["results"]) == {"calc.rapido"} and "python" in saved["meta"]
+
+    saved["results"]["calc.rapido"]["median_s"] = 1e-9  # Referência impossível de alcançar
+    baseline.write_text(json.dumps(saved))
+    assert suite.main(["--compare", str(baseline), "--min-delta", "0"]) == 1
+
+
+def test_startup_worker_probe_reports_import_and_lifespan(tmp_path):
+    import startup
+    result = startup.measure_worker(str(tmp_path / "startup.db"))
+    assert set(result) == {"import_ms", "lifespan_ms", "process_ms"}
+    assert 0 < result["import_ms"] + result["lifespan_ms"] < result["process_ms"]
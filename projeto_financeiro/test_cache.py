@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do cache de resultados (rodam sem servidor: python -m pytest test_cache.py)
+"""
+import asyncio
+import os
+import sys
+import threading
+
+# Adiciona o diretório backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import db
+from cache import MISSING, LRUCache, ResultCache, money_key
+
+
+def test_lru_counts_hits_misses_and_evictions():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" vira o mais recente
+    cache.set("c", 3)           # despeja "b"
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 1, "evictions": 1}
+
+
+def test_disk_tier_survives_a_new_cache_instance(tmp_path):
+    path = str(tmp_path / "cache.db")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"final": 7347.69, "balances": [0.0, 1244.99]}
+
+    try:
+        first = ResultCache("project_investments", maxsize=8, disk_path=path)
+        assert first.get_or_compute((100.0, 5, 0.08), compute) == compute()
+        restarted = ResultCache("project_investments", maxsize=8, disk_path=path)
+        assert restarted.get_or_compute((100.0, 5, 0.08), compute)["final"] == 7347.69
+        assert len(calls) == 2  # só a chamada explícita acima, nenhum recálculo
+        assert restarted.stats()["disk"]["hits"] == 1
+    finally:
+        db.close_pools()
+
+
+def test_disk_tier_is_created_on_first_use(tmp_path):
+    path = tmp_path / "cache.db"
+    try:
+        cache = ResultCache("project_investments", disk_path=str(path))
+        assert not path.exists()  # Importar o app não abre o arquivo
+        assert cache.get_or_compute((1.0,), lambda: 2) == 2
+        assert path.exists() and cache.stats()["disk"]["size"] == 1
+    finally:
+        db.close_pools()
+
+
+def test_async_lookup_and_store_keep_sqlite_off_the_event_loop(tmp_path):
+    cache = ResultCache("proj", maxsize=8, disk_path=str(tmp_path / "cache.db"))
+    threads = []
+    for name in ("get", "set"):
+        method = getattr(cache.disk, name)
+
+        def spy(*args, method=method):
+            threads.append(threading.get_ident())
+            return method(*args)
+        setattr(cache.disk, name, spy)
+
+    async def route():
+        assert await cache.alookup((1,)) is MISSING
+        await cache.astore((1,), {"final": 10})
+        return await cache.alookup((1,))  # Acerto na memória: nem passa pela thread
+
+    try:
+        assert asyncio.run(route()) == {"final": 10}
+        assert len(threads) == 2 and threading.get_ident() not in threads
+        assert ResultCache("proj", disk_path=str(tmp_path / "cache.db")).lookup((1,)) == {"final": 10}
+    finally:
+        db.close_pools()
+
+
+def test_money_key_normalizes_equivalent_inputs():
+    assert money_key(100) == money_key(100.0) == money_key(100.001)
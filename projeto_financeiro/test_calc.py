@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes dos cálculos financeiros (rodam sem servidor: python -m pytest test_calc.py)
+"""
+import os
+import sys
+
+# Adiciona o diretório backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import itertools
+
+import numpy as np
+import pytest
+
+from calc import (
+    compound_monthly,
+    compound_monthly_closed,
+    compound_monthly_loop,
+    compound_monthly_vectorized,
+    goal_projection,
+    goal_projection_batch,
+    goal_projection_loop,
+    monte_carlo_projection,
+    monte_carlo_projection_sharded,
+    project_investments,
+    split_shards,
+)
+
+# Grade de paridade: taxas, prazos e valores iniciais
+PARITY_RATES = [0.0, 0.01, 0.05, 0.06, 0.08, 0.10, 0.12]
+PARITY_YEARS = [1, 5, 10, 20, 30, 50, 100]
+PARITY_INITIALS = [0.0, 100.0, 1000.0, 12345.67, 50000.0]
+PARITY_MONTHLY = [0.0, 1.0, 50.0, 100.0, 333.33, 1000.0]
+
+
+@pytest.mark.parametrize("closed_form", [compound_monthly_closed, compound_monthly_vectorized])
+def test_closed_form_matches_monthly_loop(closed_form):
+    for rate, years, initial, monthly in itertools.product(PARITY_RATES, PARITY_YEARS, PARITY_INITIALS, PARITY_MONTHLY):
+        expected = compound_monthly_loop(initial, monthly, rate, years)
+        assert closed_form(initial, monthly, rate, years) == expected, (rate, years, initial, monthly)
+
+
+@pytest.mark.parametrize("closed_form", [compound_monthly_closed, compound_monthly_vectorized])
+def test_closed_form_within_a_cent_for_huge_balances(closed_form):
+    # Acima de dezenas de milhões o próprio laço mês a mês já acumula erro de
+    # ponto flutuante na casa dos centavos, então aqui a paridade é de 1 centavo.
+    for rate, years in itertools.product([0.15, 0.30], [50, 100]):
+        expected = compound_monthly_loop(1000.0, 2500.0, rate, years)
+        got = closed_form(1000.0, 2500.0, rate, years)
+        assert got == pytest.approx(expected, rel=1e-12, abs=0.01)
+
+
+@pytest.mark.parametrize("closed_form", [compound_monthly_closed, compound_monthly_vectorized])
+def test_closed_form_within_a_cent_at_api_reachable_balances(closed_form):
+    # Entradas que a API aceita (até 100 anos): saldos de dezenas de milhões em que
+    # o arredondamento pode cair do outro lado do meio centavo
+    cases = [(14168.85, 2716.78, 0.08, 78), (0.0, 1000.0, 0.12, 100), (50000.0, 3000.0, 0.12, 100)]
+    for initial, monthly, rate, years in cases:
+        expected = compound_monthly_loop(initial, monthly, rate, years)
+        got = closed_form(initial, monthly, rate, years)
+        assert max(expected) > 9_600_000
+        assert max(round(abs(a - b) * 100) for a, b in zip(got, expected)) <= 1, (initial, monthly, rate, years)  # centavos
+
+
+def test_project_investments_engines_agree():
+    results = [project_investments(monthly=100, years=30, annual_return=0.08, engine=engine)
+               for engine in ("closed", "numpy", "loop")]
+    assert results[0] == results[1] == results[2]
+    assert results[0]["years"] == list(range(31))
+    assert results[0]["final"] == results[0]["balances"][-1]
+
+
+def test_compound_monthly_rejects_unknown_engine():
+    with pytest.raises(ValueError):
+        compound_monthly(0, 100, 0.05, 10, engine="fortran")
+
+
+def test_monte_carlo_engines_agree_statistically():
+    kwargs = dict(monthly=100, years=10, mu=0.12, sigma=0.25, n_sims=4000, seed=2024)
+    fast = monte_carlo_projection(engine="numpy", **kwargs)
+    ref = monte_carlo_projection(engine="python", **kwargs)
+
+    assert set(fast) == set(ref)
+    for key in ("p10", "p50", "p90", "media"):
+        assert fast[key] == pytest.approx(ref[key], rel=0.10)
+
+
+def test_monte_carlo_without_volatility_is_deterministic():
+    fast = monte_carlo_projection(monthly=50, years=5, mu=0.08, sigma=0.0, n_sims=10, engine="numpy")
+    ref = monte_carlo_projection(monthly=50, years=5, mu=0.08, sigma=0.0, n_sims=10, engine="python")
+    assert fast["p50"] == pytest.approx(ref["p50"], abs=0.01)
+    assert fast["p10"] == fast["p90"]
+
+
+@pytest.mark.parametrize("engine", ["numpy", "python"])
+def test_monte_carlo_seed_is_reproducible_and_isolated(engine):
+    import random
+    random.seed(1)
+    before = random.random()
+    random.seed(1)
+    first = monte_carlo_projection(monthly=100, years=10, n_sims=200, engine=engine, seed=42)
+    assert random.random() == before  # o random global não foi tocado
+    second = monte_carlo_projection(monthly=100, years=10, n_sims=200, engine=engine, seed=42)
+    other = monte_carlo_projection(monthly=100, years=10, n_sims=200, engine=engine, seed=43)
+    assert first == second
+    assert first != other
+
+
+def test_sharded_monte_carlo_matches_single_process_for_same_seed():
+    kwargs = dict(monthly=100, years=20, n_sims=25_001, seed=99)
+    single = monte_carlo_projection(engine="numpy", **kwargs)
+    for workers in (1, 2, 3):
+        assert monte_carlo_projection_sharded(workers=workers, **kwargs) == single
+
+
+def test_split_shards_keeps_order_and_everything():
+    chunks = list(range(7))
+    for n in (1, 2, 3, 7, 20):
+        shards = split_shards(chunks, n)
+        assert [c for shard in shards for c in shard] == chunks
+        assert len(shards) == min(n, 7)
+
+
+def test_monte_carlo_bands_match_sorted_year_balances():
+    from calc import monte_carlo_chunks, monte_carlo_year_balances
+    bands = [0.05, 0.25, 0.5, 0.75, 0.95]
+    result = monte_carlo_projection(monthly=100, years=8, n_sims=2_500, seed=7, bands=bands)
+    plain = monte_carlo_projection(monthly=100, years=8, n_sims=2_500, seed=7)
+    assert {k: v for k, v in result.items() if k != "bands"} == plain
+
+    matrix = monte_carlo_year_balances(100, 8, 0.12, 0.25, monte_carlo_chunks(2_500, 7))
+    ordered = np.sort(matrix, axis=0)
+    assert result["bands"]["years"] == list(range(9))
+    assert list(result["bands"]["percentis"]) == ["p5", "p25", "p50", "p75", "p95"]
+    for q in bands:
+        expected = [round(float(v), 2) for v in ordered[int(q * 2_500)]]
+        assert result["bands"]["percentis"][f"p{q * 100:g}"] == expected
+    assert result["bands"]["percentis"]["p50"][-1] == result["p50"]
+    assert result["bands"]["percentis"]["p50"][0] == 0.0
+
+
+@pytest.mark.parametrize("percentiles", ["exact", "sketch"])
+def test_sharded_monte_carlo_bands_match_single_process(percentiles):
+    kwargs = dict(monthly=100, years=5, n_sims=25_001, seed=11, percentiles=percentiles, bands=[0.1, 0.9])
+    single = monte_carlo_projection(engine="numpy", **kwargs)
+    assert monte_carlo_projection_sharded(workers=2, **kwargs) == single
+
+
+def test_monte_carlo_bands_are_validated():
+    with pytest.raises(ValueError):
+        monte_carlo_projection(monthly=50, years=5, n_sims=100, bands=[0.5, 1.0])
+    with pytest.raises(ValueError):
+        monte_carlo_projection(monthly=50, years=5, n_sims=100, engine="python", bands=[0.5])
+
+
+def test_monte_carlo_rejects_unknown_engine():
+    with pytest.raises(ValueError):
+        monte_carlo_projection(monthly=50, years=5, engine="fortran")
+
+
+GOAL_GRID = list(itertools.product(
+    [0, 1, 100, 999.99, 1000, 5000, 10000, 12345.67, 100000, 1e6],
+    [1, 10, 50, 100, 333.33, 500, 1000],
+    [0, 0.01, 0.03, 0.05, 0.08, 0.12, 0.2, 0.5, 1.0],
+))
+
+
+def test_goal_solver_matches_monthly_loop():
+    for goal, monthly, rate in GOAL_GRID:
+        expected = goal_projection_loop(goal, monthly, rate, max_months=10**7)
+        assert goal_projection(goal, monthly, rate) == expected, (goal, monthly, rate)
+
+
+def test_goal_batch_matches_single_solver():
+    assert goal_projection_batch(GOAL_GRID) == [goal_projection(*g) for g in GOAL_GRID]
+    assert goal_projection_batch([]) == []
+
+
+# Metas grandes e mensais pequenos (razão meta/mensal até 1e14): longe demais para o laço mês a mês
+BIG_GOAL_GRID = list(itertools.product(
+    [1e7, 123456789.01, 1e9, 1e11, 1e12],
+    [0.01, 0.07, 1, 333.33],
+    [0, 1e-6, 0.0001, 0.05, 1.0],
+))
+
+
+def test_goal_solver_is_exact_for_large_goals():
+    import calc
+    for goal, monthly, rate in BIG_GOAL_GRID:
+        result = goal_projection(goal, monthly, rate)
+        months, m = result["months_needed"], rate / 12
+        assert result["final_amount"] >= goal, (goal, monthly, rate)
+        assert calc._saved_after(months - 1, monthly, m) < goal - calc.GOAL_TOLERANCE, (goal, monthly, rate)
+        if rate == 0:  # Sem juros: conta exata em centavos
+            assert months == -(-round(goal * 100) // round(monthly * 100))
+    assert goal_projection(1e12, 0.01, 0.0)["months_needed"] == 10**14
+    assert goal_projection_batch(BIG_GOAL_GRID) == [goal_projection(*g) for g in BIG_GOAL_GRID]
+
+
+def test_goal_solver_rejects_goals_it_cannot_represent():
+    for goal in (1e308, float("inf"), float("nan")):
+        with pytest.raises(ValueError):
+            goal_projection(goal, 0.01, 0.0)
+    results = goal_projection_batch([(1e308, 0.01, 0.0), (1000, 100, 0.05), (1000, 0, 0.05)])
+    assert "error" in results[0] and "error" in results[2]
+    assert results[1] == goal_projection(1000, 100, 0.05)
+
+
+def test_goal_solver_goes_past_fifty_years_unless_capped():
+    result = goal_projection(1_000_000, 100, 0.05)
+    assert result["months_needed"] > 600
+    assert goal_projection(1_000_000, 100, 0.05, max_months=600) == goal_projection_loop(1_000_000, 100, 0.05)
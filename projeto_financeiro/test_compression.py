@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes da compressão das respostas (rodam sem servidor: python -m pytest test_compression.py)
+"""
+import gzip
+import json
+import os
+import sys
+
+# Adiciona o diretório backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+import compression
+from compression import CompressionMiddleware, PrecompressedStaticFiles, choose_encoding, precompress_directory
+
+
+def _raw_get(client, url, accept_encoding):
+    """GET sem o httpx descomprimir: devolve (resposta, bytes crus)"""
+    with client.stream("GET", url, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.fixture
+def small_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, encodings=["gzip"])
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse("x" * 5000)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("pouco")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((json.dumps({"i": i}) + "\n" for i in range(3)), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+
+def test_choose_encoding_follows_q_values():
+    assert choose_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("br;q=0.5, gzip", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("br;q=0, *", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("identity", ["br", "gzip"]) is None
+    assert choose_encoding("", ["gzip"]) is None
+
+
+def test_middleware_compresses_only_above_minimum_size(small_app):
+    response, raw = _raw_get(small_app, "/big", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(raw)
+    assert gzip.decompress(raw) == b"x" * 5000
+
+    response, raw = _raw_get(small_app, "/small", "gzip")
+    assert "content-encoding" not in response.headers
+    assert raw == b"pouco"
+
+    response, raw = _raw_get(small_app, "/big", "identity")
+    assert "content-encoding" not in response.headers
+
+
+def test_middleware_compresses_streams_chunk_by_chunk(small_app):
+    response, raw = _raw_get(small_app, "/stream", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert [json.loads(line)["i"] for line in lines] == [0, 1, 2]
+
+
+def test_brotli_when_installed():
+    brotli = pytest.importorskip("brotli")
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=10, encodings=["br", "gzip"])
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse("y" * 2000)
+
+    response, raw = _raw_get(TestClient(app), "/big", "gzip, br")
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(raw) == b"y" * 2000
+
+
+def test_precompressed_static_files(tmp_path):
+    (tmp_path / "app.js").write_text("console.log('oi');\n" * 200)
+    (tmp_path / "tiny.css").write_text("a{}")
+    written = precompress_directory(str(tmp_path), minimum_size=100)
+    assert str(tmp_path / "app.js.gz") in written
+    assert not (tmp_path / "tiny.css.gz").exists()
+
+    app = FastAPI()
+    app.mount("/", PrecompressedStaticFiles(directory=str(tmp_path), encodings=["gzip"]), name="static")
+    client = TestClient(app)
+    response, raw = _raw_get(client, "/app.js", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith(("text/javascript", "application/javascript"))
+    assert raw == (tmp_path / "app.js.gz").read_bytes()
+
+    again = client.get("/app.js", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+    assert again.status_code == 304
+
+    response, raw = _raw_get(client, "/app.js", "identity")
+    assert "content-encoding" not in response.headers
+    assert raw == (tmp_path / "app.js").read_bytes()
+
+
+def test_available_encodings_setting():
+    assert compression.available_encodings("off") == []
+    assert compression.available_encodings(" gzip ") == ["gzip"]
+    expected = ["br", "gzip"] if compression.brotli is not None else ["gzip"]
+    assert compression.available_encodings("br,gzip") == expected
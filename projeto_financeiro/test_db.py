@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes da camada de banco de dados (rodam sem servidor: python -m pytest test_db.py)
+"""
+import os
+import sys
+import threading
+import time
+
+# Adiciona o diretório backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import pytest
+
+import db
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "data.db")
+    db.init_db(path)
+    yield path
+    db.close_pools()
+
+
+def test_save_and_get_roundtrip(db_path):
+    db.save_submission(db_path, 'reality', {"nome": "João", "idade": 15})
+    db.save_submission(db_path, 'future', {"nome": "Maria", "poupanca_mensal": 100.0})
+
+    rows = db.get_submissions(db_path)
+    assert len(rows) == 2
+    assert {r["kind"] for r in rows} == {"reality", "future"}
+    assert {r["payload"]["nome"] for r in rows} == {"João", "Maria"}
+
+
+def test_pool_uses_wal_and_reuses_connections(db_path):
+    pool = db.get_pool(db_path)
+    with pool.connection() as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+
+    for _ in range(20):
+        db.save_submission(db_path, 'reality', {"nome": "x"})
+    metrics = pool.metrics()
+    assert metrics["created"] == 1
+    assert metrics["in_use"] == 0
+    assert metrics["acquired_total"] >= 21
+
+
+def test_stream_batches_use_their_own_connection_and_close_it(db_path):
+    import contextlib
+    import sqlite3
+    db.save_submissions(db_path, 'future', [{"nome": f"f{i}"} for i in range(7)])
+    pool = db.get_pool(db_path)
+
+    with contextlib.ExitStack() as stack:  # Todas as conexões do pool ocupadas: a exportação não depende delas
+        for _ in range(db.POOL_SIZE):
+            stack.enter_context(pool.connection())
+        assert [len(b) for b in db.iter_submission_batches(db_path, chunk_size=3)] == [3, 3, 1]
+
+    batches = db.iter_submission_batches(db_path, chunk_size=3)
+    next(batches)
+    conn = batches.gi_frame.f_locals["conn"]
+    batches.close()  # Parou no meio: a conexão fecha sem esperar o coletor de lixo
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_pool_is_bounded_under_concurrency(db_path):
+    def worker():
+        for _ in range(25):
+            db.save_submission(db_path, 'future', {"nome": "y"})
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(db.get_submissions(db_path)) == 16 * 25
+    assert db.get_pool(db_path).metrics()["created"] <= db.POOL_SIZE
+
+
+def test_write_behind_batches_and_flushes_on_close(db_path):
+    writer = db.enable_write_behind(db_path, batch_size=10, flush_ms=50)
+    for i in range(35):
+        db.save_submission(db_path, 'future', {"nome": f"aluno {i}"})
+    assert writer.flush(timeout=5)
+    assert len(db.get_submissions(db_path)) == 35
+    assert writer.metrics()["batches_total"] < 35
+
+    for i in range(5):
+        db.save_submission(db_path, 'reality', {"nome": f"aluno {i}"})
+    db.disable_write_behind(db_path)
+    assert len(db.get_submissions(db_path)) == 40
+
+
+def test_write_behind_applies_backpressure(db_path):
+    writer = db.SubmissionWriter(db_path, batch_size=1, max_queue=1, put_timeout=0.05)
+    pool = db.get_pool(db_path)
+    # Segura todas as conexões para o writer não conseguir esvaziar a fila
+    held = [pool._get() for _ in range(pool.max_size)]
+    try:
+        with pytest.raises(db.WriteQueueFull):
+            for _ in range(5):
+                writer.submit('future', {"nome": "z"})
+    finally:
+        for conn in held:
+            pool._idle.put(conn)
+    writer.close()
+    assert writer.metrics()["written_total"] == writer.metrics()["enqueued_total"]
+
+
+def test_write_behind_keeps_retrying_and_dead_letters_on_close(tmp_path, caplog):
+    import json
+    path = str(tmp_path / "sem_tabelas.db")  # Sem init_db: todo INSERT falha
+    writer = db.SubmissionWriter(path, batch_size=5, flush_ms=10, max_queue=5, put_timeout=0.05)
+    try:
+        for i in range(5):
+            writer.submit('future', {"nome": f"aluno {i}"})
+        assert not writer.flush(timeout=0.5)  # Nada gravado e nada descartado: segue tentando
+        with pytest.raises(db.WriteQueueFull):  # Fila cheia: o produtor fica sabendo (503 na API)
+            for i in range(10):
+                writer.submit('future', {"nome": f"extra {i}"})
+        assert writer.metrics()["errors_total"] >= 2
+
+        start = time.monotonic()
+        writer.close(timeout=0.5)
+        assert time.monotonic() - start < 2
+        metrics = writer.metrics()
+        assert metrics["written_total"] == 0 and metrics["dead_letter_total"] == metrics["enqueued_total"] >= 5
+        with open(writer.dead_letter_path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        assert [r["payload"]["nome"] for r in rows[:5]] == [f"aluno {i}" for i in range(5)]
+        assert "no such table: submissions" in caplog.text  # O erro real do banco vai para o log
+    finally:
+        db.close_pools()
+
+
+def _init_db_together(path, barrier, errors):
+    barrier.wait()
+    try:
+        db.init_db(path)
+    except Exception as exc:
+        errors.put(repr(exc))
+
+
+@pytest.mark.parametrize("legacy", [False, True])
+def test_workers_starting_together_apply_each_migration_once(tmp_path, legacy):
+    import multiprocessing
+    import sqlite3
+    path = str(tmp_path / "data.db")
+    if legacy:
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE submissions (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, payload TEXT, "
+                     "created_at DATETIME DEFAULT (datetime('now','localtime')))")
+        conn.execute("INSERT INTO submissions (kind, payload) VALUES ('future', '{\"nome\": \"Ana\"}')")
+        conn.commit()
+        conn.close()
+
+    ctx = multiprocessing.get_context("spawn")
+    barrier, errors = ctx.Barrier(6), ctx.Queue()
+    workers = [ctx.Process(target=_init_db_together, args=(path, barrier, errors)) for _ in range(6)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(60)
+    assert [w.exitcode for w in workers] == [0] * 6
+    assert errors.empty(), errors.get()
+
+    try:
+        with db.get_pool(path).connection() as conn:
+            assert conn.execute('PRAGMA user_version').fetchone()[0] == db.SCHEMA_VERSION
+            indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+            assert {'idx_submissions_created', 'idx_submissions_nome'} <= indexes
+            assert conn.execute("SELECT n FROM analytics_kind WHERE kind = 'future'").fetchall() == \
+                ([(1,)] if legacy else [])
+    finally:
+        db.close_pools()
+
+
+def test_analytics_summary_tables_follow_inserts_and_backfill(db_path):
+    db.save_submission(db_path, 'reality', {"nome": "Ana", "idade": 15})
+    db.save_submission(db_path, 'future', {"nome": "Ana", "investimento_tipo": "moderado",
+                                           "poupanca_mensal": 100.0, "tempo_anos": 10})
+    db.save_submission(db_path, 'future', {"nome": "Bia", "investimento_tipo": "arriscado",
+                                           "poupanca_mensal": 50.0, "tempo_anos": 20})
+    with db.get_pool(db_path).connection() as conn:
+        # Simula uma linha antiga, ainda sem as colunas tipadas, sendo preenchida depois
+        conn.execute("INSERT INTO submissions (kind, payload) VALUES ('future', ?)",
+                     ('{"investimento_tipo": "moderado", "poupanca_mensal": 30, "tempo_anos": 30}',))
+        conn.execute("UPDATE submissions SET investimento_tipo = 'moderado', poupanca_mensal = 30, tempo_anos = 30 "
+                     "WHERE investimento_tipo IS NULL AND kind = 'future'")
+        conn.execute("DELETE FROM submissions WHERE kind = 'reality'")
+        conn.commit()
+
+    stats = db.get_analytics(db_path)
+    assert stats["total"] == 3
+    assert stats["by_kind"] == {"future": 3}
+    assert stats["by_investimento_tipo"] == {"arriscado": 1, "moderado": 2}
+    assert stats["avg_poupanca_mensal"] == 60.0
+    assert stats["avg_tempo_anos"] == 20.0
+    assert sum(stats["by_day"].values()) == 3
+    assert sum(stats["by_hour"].values()) == 3
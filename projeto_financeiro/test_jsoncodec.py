@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do JSON rápido opcional (rodam sem servidor: python -m pytest test_jsoncodec.py)
+"""
+import os
+import sys
+
+# Adiciona o diretório backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import jsoncodec
+from calc import project_investments
+
+SAMPLES = [
+    {"status": "ok", "projections": {"moderado": project_investments(monthly=150, years=30, annual_return=0.08)}},
+    {"count": 1, "data": [{"id": 7, "kind": "future", "created_at": "2025-03-10 14:30:00",
+                           "payload": {"nome": "João Conceição", "poupanca_mensal": 99.99, "tempo_anos": 5}}],
+     "next_cursor": None},
+    {"dicas": ["💰 Guarde pelo menos R$ 1 por dia", "📈 Comece cedo"], "vazio": [], "negativo": -0.5},
+]
+
+
+@pytest.mark.parametrize("sample", SAMPLES)
+def test_stdlib_path_matches_fastapi_default(sample, monkeypatch):
+    monkeypatch.setattr(jsoncodec, "FAST_JSON", False)
+    assert jsoncodec.FastJSONResponse(sample).body == JSONResponse(jsonable_encoder(sample)).body
+
+
+@pytest.mark.parametrize("sample", SAMPLES)
+def test_orjson_path_produces_the_same_bytes(sample, monkeypatch):
+    pytest.importorskip("orjson")
+    monkeypatch.setattr(jsoncodec, "FAST_JSON", False)
+    slow_body, slow_text = jsoncodec.dumps_bytes(sample), jsoncodec.dumps(sample)
+    monkeypatch.setattr(jsoncodec, "FAST_JSON", True)
+    assert jsoncodec.fast_enabled()
+    assert jsoncodec.dumps_bytes(sample) == slow_body
+    assert jsoncodec.dumps(sample) == slow_text
+    assert jsoncodec.loads(slow_text) == sample
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_nan_and_infinity_become_null(fast, monkeypatch):
+    if fast:
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(jsoncodec, "FAST_JSON", fast)
+    sample = {"p50": float("nan"), "faixa": [1.5, float("inf"), -float("inf")], "ok": (2.0,)}
+    assert jsoncodec.dumps(sample) == '{"p50":null,"faixa":[1.5,null,null],"ok":[2.0]}'
+    assert jsoncodec.dumps_bytes(sample) == jsoncodec.dumps(sample).encode("utf-8")
+
+
+def test_db_payloads_round_trip_with_either_codec(tmp_path, monkeypatch):
+    import db
+    path = str(tmp_path / "data.db")
+    db.init_db(path)
+    payload = {"nome": "Lúcia", "idade": 15, "poupanca_mensal": 120.5}
+    for fast in (False, True):
+        monkeypatch.setattr(jsoncodec, "FAST_JSON", fast)
+        db.save_submission(path, "future", payload)
+    for fast in (False, True):
+        monkeypatch.setattr(jsoncodec, "FAST_JSON", fast)
+        assert [row["payload"] for row in db.get_submissions(path)] == [payload, payload]
+    db.close_pools()
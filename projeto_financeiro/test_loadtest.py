@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do gerador de carga (rodam sem servidor: python -m pytest test_loadtest.py)
+"""
+import asyncio
+import os
+import sys
+
+# Adiciona o diretório benchmarks ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+import pytest
+
+import loadtest
+
+
+def test_percentile_nearest_rank():
+    values = sorted(range(1, 101))
+    assert loadtest.percentile(values, 0.50) == 50
+    assert loadtest.percentile(values, 0.95) == 95
+    assert loadtest.percentile(values, 0.99) == 99
+    assert loadtest.percentile([7], 0.99) == 7
+    assert loadtest.percentile([], 0.5) == 0.0
+
+
+def test_parse_mix_rejects_unknown_routes():
+    assert loadtest.parse_mix("simulate_montecarlo=0.2, tips=0") == {"simulate_montecarlo": 0.2, "tips": 0.0}
+    with pytest.raises(ValueError):
+        loadtest.parse_mix("rota_que_nao_existe=1")
+
+
+def test_in_process_class_session(monkeypatch):
+    import app as app_module
+    from executor import ComputePool
+    # Limite padrão de pendências (COMPUTE_MAX_PENDING): uma turma de 30 clicando junto não pode levar 503
+    monkeypatch.setattr(app_module, "compute_pool", ComputePool(workers=0))
+    real_db = app_module.DB_PATH
+
+    report = asyncio.run(loadtest.run_in_process(users=30, sessions=30, mix={"calculate_goal": 1.0, "tips": 0.0}))
+    assert app_module.DB_PATH == real_db  # O teste usa um banco temporário e devolve o original
+
+    routes = report["routes"]
+    assert report["sessions"] == 30 and report["errors"] == 0
+    for name in ("submit_reality", "submit_future", "simulate_montecarlo", "calculate_goal"):
+        assert routes[name]["requests"] == 30
+        assert routes[name]["p50_ms"] <= routes[name]["p95_ms"] <= routes[name]["p99_ms"] <= routes[name]["max_ms"]
+    assert "tips" not in routes
+    assert report["requests"] == sum(route["requests"] for route in routes.values())
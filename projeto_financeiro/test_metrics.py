@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes das métricas no formato do Prometheus (rodam sem servidor: python -m pytest test_metrics.py)
+"""
+import asyncio
+import os
+import sys
+
+# Adiciona o diretório backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+import db
+from executor import ComputePool
+from metrics import Registry, CONTENT_TYPE
+
+
+def _samples(text: str) -> dict:
+    """{'nome{rótulos}': valor} das linhas de amostra (ignora # HELP/# TYPE)."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            out[name] = float(value)
+    return out
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.db")
+    db.init_db(path)
+    monkeypatch.setattr(app_module, "DB_PATH", path)
+    with TestClient(app_module.app) as c:
+        yield c
+    db.close_pools()
+
+
+def test_render_text_exposition_format():
+    registry = Registry()
+    requests = registry.counter("reqs_total", "Requisições", ("route",))
+    latency = registry.histogram("lat_seconds", "Latência", buckets=(0.1, 1.0))
+    requests.inc(('/a"b',))
+    requests.inc(('/a"b',), 2)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert "# TYPE reqs_total counter" in text and "# TYPE lat_seconds histogram" in text
+    samples = _samples(text)
+    assert samples['reqs_total{route="/a\\"b"}'] == 3
+    assert samples['lat_seconds_bucket{le="0.1"}'] == 2  # Limite inclusivo
+    assert samples['lat_seconds_bucket{le="1.0"}'] == 3
+    assert samples['lat_seconds_bucket{le="+Inf"}'] == samples["lat_seconds_count"] == 4
+    assert samples["lat_seconds_sum"] == pytest.approx(3.65)
+    assert registry.counter("reqs_total", "Requisições", ("route",)) is requests
+    with pytest.raises(ValueError):
+        requests.inc(())
+
+
+def test_broken_collector_does_not_break_the_scrape():
+    registry = Registry()
+    registry.gauge("ok", "Funciona").set(1)
+    registry.add_collector(lambda: 1 / 0)
+    registry.add_collector(lambda: [("extra", "gauge", "Coletado", [({"x": "1"}, 2.5)])])
+    assert _samples(registry.render()) == {"ok": 1, 'extra{x="1"}': 2.5}
+
+
+def test_metrics_endpoint_counts_routes_db_and_caches(client):
+    goal = {"goal_amount": 1000, "monthly_saving": 100, "annual_rate": 0.1}
+    before = _samples(client.get("/metrics").text)
+    client.post("/api/calculate_goal", json=goal)
+    client.post("/api/calculate_goal", json=goal)
+    client.post("/api/calculate_goal", json={**goal, "monthly_saving": 0})
+    client.post("/api/submit_reality", json={"nome": "Ana", "idade": 14, "renda_atual": 0})
+    client.get("/api/nao-existe")
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"] == CONTENT_TYPE
+    after = _samples(response.text)
+
+    def delta(key):
+        return after.get(key, 0) - before.get(key, 0)
+
+    route = 'method="POST",route="/api/calculate_goal"'
+    assert delta(f'http_requests_total{{{route},status="200"}}') == 2
+    assert delta(f'http_requests_total{{{route},status="400"}}') == 1
+    assert delta(f"http_request_duration_seconds_count{{{route}}}") == 3
+    assert after[f"http_requests_in_flight{{{route}}}"] == 0
+    assert after['http_requests_in_flight{method="GET",route="/metrics"}'] == 1
+    assert not any("nao-existe" in key for key in after)  # Rótulo da rota, nunca a URL crua
+    assert delta('calc_duration_seconds_count{function="goal_projection"}') >= 1
+    assert delta('result_cache_hits_total{cache="calculate_goal:v2",layer="memory"}') >= 1
+    assert delta('db_operation_duration_seconds_count{operation="save_submission"}') == 1
+    assert after[f'db_pool_acquired_total{{path="{app_module.DB_PATH}"}}'] >= 1
+
+
+def test_compute_pool_reports_queue_and_run_time():
+    pool = ComputePool(workers=0)
+    seen = []
+    pool.add_timing_hook(lambda *timing: seen.append(timing))
+    assert asyncio.run(pool.run(sum, [1, 2, 3])) == 6
+    pool.shutdown()
+    [(name, queued_s, run_s)] = seen
+    assert name == "sum" and queued_s >= 0 and run_s >= 0
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do perfilamento das requisições lentas (rodam sem servidor: python -m pytest test_profiling.py)
+"""
+import os
+import pstats
+import sys
+
+# Adiciona o diretório backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+import db
+from executor import ComputePool
+from profiling import ProfileStore, StackSampler
+
+FORM = {"nome": "Ana", "idade": 15, "profissao_dos_sonhos": "Investidora", "faixa_salarial": 10000,
+        "poupanca_mensal": 1000, "investimento_tipo": "arriscado", "tempo_anos": 5, "n_sims": 20_000}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.db")
+    db.init_db(path)
+    monkeypatch.setattr(app_module, "DB_PATH", path)
+    monkeypatch.setattr(app_module, "compute_pool", ComputePool(workers=0))
+    profiler = app_module.profiler
+    monkeypatch.setattr(profiler, "enabled", True)
+    monkeypatch.setattr(profiler, "slow_ms", 0)
+    monkeypatch.setattr(profiler, "token", "")
+    monkeypatch.setattr(profiler, "store", ProfileStore(str(tmp_path / "profiles"), max_files=3))
+    with TestClient(app_module.app) as c:
+        yield c
+    app_module.compute_pool.shutdown()
+    db.close_pools()
+
+
+def test_debug_header_profiles_compute_and_request(client):
+    response = client.post('/api/simulate_montecarlo', json=FORM, headers={"X-Debug-Profile": "1"})
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    [summary] = client.get('/admin/profiles').json()["data"]
+    assert summary["id"] == profile_id and summary["reason"] == "header" and summary["pstats"]
+    assert summary["path"] == "/api/simulate_montecarlo" and summary["status"] == 200
+
+    profile = client.get(f'/admin/profiles/{profile_id}').json()
+    assert {task["function"] for task in profile["compute"]["tasks"]} == {"monte_carlo_finals"}
+    assert any("_simulate_chunk" in row["function"] for row in profile["compute"]["top"])
+
+    prof = client.get(f'/admin/profiles/{profile_id}', params={"format": "pstats"})
+    path = os.path.join(app_module.profiler.store.directory, "copia.prof")
+    with open(path, "wb") as f:
+        f.write(prof.content)
+    assert pstats.Stats(path).total_calls > 0
+
+    folded = client.get(f'/admin/profiles/{profile_id}', params={"format": "folded"}).text
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded.splitlines())
+
+
+def test_only_slow_requests_are_kept_without_header(client, monkeypatch):
+    client.get('/api/glossary')
+    assert client.get('/admin/profiles').json()["count"] == 0  # slow_ms=0: só com o cabeçalho
+
+    monkeypatch.setattr(app_module.profiler, "slow_ms", 1e-6)
+    client.get('/api/glossary')
+    [summary] = client.get('/admin/profiles').json()["data"]
+    assert summary["reason"] == "slow" and summary["path"] == "/api/glossary"
+    assert "x-profile-id" not in client.get('/api/tips').headers
+
+
+def test_ring_buffer_keeps_newest_files(tmp_path):
+    store = ProfileStore(str(tmp_path), max_files=3)
+    ids = [store.new_id() for _ in range(5)]
+    for profile_id in ids:
+        store.save({"id": profile_id, "sampler": {"samples": 0, "stacks": []}, "compute": {}})
+    assert store.ids() == ids[::-1][:3]
+    assert len(os.listdir(tmp_path)) == 3
+    with pytest.raises(ValueError):
+        store.path("../../data")
+
+
+def test_admin_routes_need_profiling_and_token(client, monkeypatch):
+    monkeypatch.setattr(app_module.profiler, "token", "segredo")
+    assert client.get('/admin/profiles').status_code == 403
+    assert client.get('/admin/profiles', headers={"X-Profile-Token": "segredo"}).status_code == 200
+    response = client.get('/api/glossary', headers={"X-Debug-Profile": "1"})  # Sem o token não perfila
+    assert "x-profile-id" not in response.headers
+
+    monkeypatch.setattr(app_module.profiler, "enabled", False)
+    assert client.get('/admin/profiles', headers={"X-Profile-Token": "segredo"}).status_code == 404
+
+
+def test_sampler_skips_idle_threads():
+    import threading
+    stop = threading.Event()
+    idle = threading.Thread(target=stop.wait)
+    idle.start()
+    try:
+        stacks = StackSampler.sample()
+    finally:
+        stop.set()
+        idle.join()
+    assert any("test_sampler_skips_idle_threads" in s for s in stacks)
+    assert not any(s.rsplit(";", 1)[-1].startswith("wait (threading.py") for s in stacks)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Testes do sketch de percentis (rodam sem servidor: python -m pytest test_quantiles.py)
+"""
+import os
+import sys
+
+# Adiciona o diretório backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import numpy as np
+import pytest
+
+from calc import MC_CHUNK_SIZE, monte_carlo_projection, monte_carlo_projection_sharded
+from quantiles import QuantileSketch
+
+
+def _rank_error(values_sorted, estimate, q):
+    n = len(values_sorted)
+    lo = np.searchsorted(values_sorted, estimate, side="left")
+    hi = np.searchsorted(values_sorted, estimate, side="right")
+    target = int(q * n)
+    return 0 if lo <= target < hi else min(abs(lo - target), abs(hi - 1 - target)) / n
+
+
+@pytest.mark.parametrize("n_chunks", [1, 5, 37])
+def test_sketch_rank_error_within_documented_bound(n_chunks):
+    rng = np.random.default_rng(0)
+    data = rng.lognormal(0, 1.5, size=n_chunks * 4096 + 123)
+    sketch = QuantileSketch(k=256, chunk_size=4096)
+    for start in range(0, len(data), 4096):
+        sketch.add(data[start:start + 4096])
+
+    ordered = np.sort(data)
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        assert _rank_error(ordered, sketch.quantiles([q])[0], q) <= 2 / sketch.k
+    assert sketch.mean() == pytest.approx(data.mean())
+    assert sketch.nbytes() < data.nbytes / 4
+
+
+def test_merged_sketches_equal_one_sketch_fed_in_the_same_order():
+    rng = np.random.default_rng(1)
+    chunks = [rng.normal(size=1024) for _ in range(8)]
+    whole = QuantileSketch(k=128, chunk_size=1024)
+    left, right = QuantileSketch(k=128, chunk_size=1024), QuantileSketch(k=128, chunk_size=1024)
+    for i, chunk in enumerate(chunks):
+        whole.add(chunk)
+        (left if i < 4 else right).add(chunk)
+    qs = [0.1, 0.5, 0.9]
+    assert left.merge(right).quantiles(qs) == whole.quantiles(qs)
+
+
+def test_monte_carlo_sketch_mode_is_close_to_exact():
+    kwargs = dict(monthly=100, years=20, n_sims=MC_CHUNK_SIZE * 6 + 7, seed=11)
+    exact = monte_carlo_projection(**kwargs)
+    approx = monte_carlo_projection(percentiles="sketch", **kwargs)
+    sharded = monte_carlo_projection_sharded(workers=3, percentiles="sketch", **kwargs)
+    assert approx["media"] == pytest.approx(exact["media"])
+    for key in ("p10", "p50", "p90"):
+        assert approx[key] == pytest.approx(exact[key], rel=0.01)
+        assert sharded[key] == pytest.approx(exact[key], rel=0.01)